@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Stand-in for the `claude` CLI that answers ingredient-line batches locally.
+
+Reads a LINE_PARSE_PROMPT batch on stdin, as haiku_parser sends it, and
+prints a JSON object with an entry for each numbered line, after a simulated
+delay. Any other prompt gets an empty JSON object. Command-line arguments
+(`--model haiku -p`) are ignored. Behaviour is set through environment
+variables:
+
+    FAKE_CLAUDE_LATENCY         seconds per call (default 0.2)
+    FAKE_CLAUDE_LATENCY_PER_LINE extra seconds per line (default 0.01)
+    FAKE_CLAUDE_JITTER          sigma of a log-normal factor on the delay (default 0.3)
+    FAKE_CLAUDE_FAIL_RATE       chance a call exits 1, like throttling (default 0)
+    FAKE_CLAUDE_MALFORMED_RATE  chance the answer is cut off mid-JSON (default 0)
+    FAKE_CLAUDE_SLOW_RATE       chance a call stalls for FAKE_CLAUDE_SLOW_SECONDS (default 0)
+    FAKE_CLAUDE_SLOW_SECONDS    length of a stall (default 30)
+    FAKE_CLAUDE_POISON_RATE     share of lines that are never answered (default 0)
+
+Failures, stalls and cut-off answers are drawn afresh for every call, so
+retries can succeed. Poisoned lines are chosen by a hash of their text, so
+the same line is missed on every call, as a line that confuses the model
+would be. Only the standard library is used, to keep start-up cheap.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import sys
+import time
+import zlib
+
+LINE_RE = re.compile(r"^(\d+): (.*)$", re.MULTILINE)
+
+
+def _env(name: str, default: float) -> float:
+    return float(os.environ.get(f"FAKE_CLAUDE_{name}", default))
+
+
+def answer(prompt: str) -> dict:
+    poison = _env("POISON_RATE", 0)
+    result = {}
+    for number, text in LINE_RE.findall(prompt):
+        if zlib.crc32(text.encode()) / 2**32 < poison:
+            continue
+        result[number] = {"qty": 1, "unit": None, "item": text.strip(), "notes": None}
+    return result
+
+
+def main() -> int:
+    prompt = sys.stdin.read()
+    rng = random.Random()
+
+    lines = len(LINE_RE.findall(prompt))
+    delay = _env("LATENCY", 0.2) + lines * _env("LATENCY_PER_LINE", 0.01)
+    delay *= rng.lognormvariate(0, _env("JITTER", 0.3))
+    if rng.random() < _env("SLOW_RATE", 0):
+        delay += _env("SLOW_SECONDS", 30)
+    time.sleep(delay)
+
+    if rng.random() < _env("FAIL_RATE", 0):
+        print("Error: rate limited, please retry", file=sys.stderr)
+        return 1
+
+    text = json.dumps(answer(prompt))
+    if rng.random() < _env("MALFORMED_RATE", 0):
+        text = text[: rng.randrange(len(text))]
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
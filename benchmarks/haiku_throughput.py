@@ -0,0 +1,171 @@
+"""Throughput of the Haiku ingredient pipeline against a stand-in claude CLI.
+
+Builds a synthetic vault whose recipes mix lines the local parser handles
+with lines it is unsure of, puts benchmarks/fake_claude.py on PATH as
+`claude`, and runs parse_all_ingredients over a fresh copy of the vault for
+each combination of --workers and --batch-tokens. Reports recipes/s, wall
+time, CLI calls, retries after CLI errors, bisection calls for missed lines
+and recipes left unparsed. The fake's latency and failure knobs are
+exposed as options (see fake_claude.py).
+
+    uv run python benchmarks/haiku_throughput.py --recipes 500 --workers 1 4 8
+    uv run python benchmarks/haiku_throughput.py --fail-rate 0.1 --poison-rate 0.01
+
+With --min-rate, exits non-zero if any run is slower, for use in CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from meal_planner.haiku_parser import ParseStats, parse_all_ingredients
+from meal_planner.indexer import discover_recipe_files, parse_recipe_files
+
+FAKE_CLAUDE = Path(__file__).with_name("fake_claude.py")
+
+ITEMS = [
+    "olive oil", "garlic", "onion", "salt", "black pepper", "butter", "flour",
+    "chicken breast", "ground beef", "rice", "eggs", "milk", "tomatoes",
+    "lemon juice", "cumin", "paprika", "parmesan", "spinach", "carrots",
+]
+CONFIDENT = ["2 cups {}", "1 tbsp {}", "3 cloves {}", "200 g {}", "1/2 tsp {}"]
+UNCERTAIN = [
+    "{} cup + {} tbsp {}", "juice of {} lime, {} wedges and {}", "{} heaping {} spoonfuls {}",
+]
+
+
+def _ingredient_lines(rng: random.Random, uncertain: int) -> list[str]:
+    lines = [rng.choice(CONFIDENT).format(rng.choice(ITEMS)) for _ in range(rng.randint(4, 10))]
+    for _ in range(uncertain):
+        template = rng.choice(UNCERTAIN)
+        lines.append(template.format(rng.randint(1, 9), rng.randint(1, 15), rng.choice(ITEMS)))
+    rng.shuffle(lines)
+    return lines
+
+
+def build_vault(path: Path, n: int, uncertain: int, seed: int = 0) -> None:
+    """Write n recipe notes, each with `uncertain` lines the local parser flags."""
+    rng = random.Random(seed)
+    path.mkdir(parents=True, exist_ok=True)
+    for i in range(n):
+        lines = _ingredient_lines(rng, uncertain)
+        (path / f"Recipe {i:05d}.md").write_text(
+            "---\ntype: recipe\nmeal_type: dinner\nservings: 4\n---\n\n"
+            "## Ingredients\n\n" + "".join(f"- {line}\n" for line in lines)
+        )
+
+
+def install_fake_claude(bin_dir: Path) -> None:
+    """Put an executable `claude` that runs fake_claude.py first on PATH."""
+    shim = bin_dir / "claude"
+    shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CLAUDE}" "$@"\n')
+    shim.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+
+
+def run_case(vault: Path, workers: int, batch_tokens: int, rate: float) -> dict:
+    """Parse a fresh copy of `vault` and return timings and ParseStats counters."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cooking = Path(tmp) / "vault"
+        shutil.copytree(vault, cooking)
+        recipes = [
+            r for r in parse_recipe_files(discover_recipe_files(cooking)) if r is not None
+        ]
+        stats = ParseStats()
+        start = time.perf_counter()
+        parse_all_ingredients(
+            recipes,
+            cooking,
+            batch_tokens=batch_tokens,
+            max_workers=workers,
+            rate=rate,
+            stats=stats,
+        )
+        wall = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "batch_tokens": batch_tokens,
+        "wall_s": round(wall, 3),
+        "recipes_per_s": round(len(recipes) / wall, 2),
+        "recipes": len(recipes),
+        "lines_sent": stats.lines_sent,
+        "calls": stats.calls,
+        "retries": stats.retries,
+        "bisect_calls": stats.bisect_calls,
+        "incomplete_batches": stats.incomplete_batches,
+        "failed": stats.failed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=200)
+    parser.add_argument("--uncertain", type=int, default=3, help="Uncertain lines per recipe")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--batch-tokens", nargs="+", type=int, default=[500, 2000])
+    parser.add_argument("--rate", type=float, default=0, help="Calls started per second")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--latency-per-line", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--fail-rate", type=float, default=0)
+    parser.add_argument("--malformed-rate", type=float, default=0)
+    parser.add_argument("--slow-rate", type=float, default=0)
+    parser.add_argument("--slow-seconds", type=float, default=30)
+    parser.add_argument("--poison-rate", type=float, default=0)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per run")
+    parser.add_argument(
+        "--min-rate", type=float, default=None, help="Fail if any run is below this recipes/s"
+    )
+    args = parser.parse_args()
+
+    for name in (
+        "latency", "latency_per_line", "jitter", "fail_rate",
+        "malformed_rate", "slow_rate", "slow_seconds", "poison_rate",
+    ):
+        os.environ[f"FAKE_CLAUDE_{name.upper()}"] = str(getattr(args, name))
+    # Keep the progress bar and per-run summaries out of the report
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("meal_planner").setLevel(logging.ERROR)
+
+    slow = []
+    with tempfile.TemporaryDirectory() as tmp:
+        install_fake_claude(Path(tmp))
+        vault = Path(tmp) / "vault"
+        build_vault(vault, args.recipes, args.uncertain)
+
+        if not args.json:
+            print(
+                f"{'workers':>7} {'batch':>6} {'wall s':>8} {'recipes/s':>10} "
+                f"{'calls':>6} {'retries':>7} {'bisect':>6} {'failed':>6}"
+            )
+        for workers in args.workers:
+            for batch_tokens in args.batch_tokens:
+                result = run_case(vault, workers, batch_tokens, args.rate)
+                if args.json:
+                    print(json.dumps(result))
+                else:
+                    print(
+                        f"{workers:>7} {batch_tokens:>6} {result['wall_s']:>8.2f} "
+                        f"{result['recipes_per_s']:>10.1f} {result['calls']:>6} "
+                        f"{result['retries']:>7} {result['bisect_calls']:>6} "
+                        f"{result['failed']:>6}"
+                    )
+                if args.min_rate is not None and result["recipes_per_s"] < args.min_rate:
+                    slow.append(result)
+
+    if slow:
+        print(f"{len(slow)} runs below {args.min_rate} recipes/s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Solve time and objective of the planner's CP-SAT formulations.
+
+Runs build_meal_plan once per --formulation on the same recipes and reports
+CP-SAT's status, wall time, objective (total weighted deviation), and model
+size. --top-k and --no-prune set the candidate pruning, as for `plan`.
+With --vault, plans from that cooking folder's index like `plan` does
+(config read from --config-vault, default the folder's parent); otherwise
+from synthetic recipes.
+
+    uv run python benchmarks/plan_formulations.py --recipes 300 900
+    uv run python benchmarks/plan_formulations.py --recipes 900 --top-k 5
+    uv run python benchmarks/plan_formulations.py --vault ~/vault/Cooking --snacks
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import logging
+import random
+from pathlib import Path
+
+from meal_planner.config import DEFAULTS, load_config
+from meal_planner.models import Recipe
+from meal_planner.planner import FORMULATIONS, SolveStats, apply_plan_options, build_meal_plan
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack", "main course", "soup", "dessert"]
+MAIN_INGREDIENTS = [
+    "chicken", "beef", "pork", "salmon", "shrimp", "tofu", "beans", "lentils",
+    "eggs", "pasta", "rice", "turkey", None,
+]
+
+
+def synthetic_recipes(n: int, seed: int = 0) -> list[Recipe]:
+    rng = random.Random(seed)
+    return [
+        Recipe(
+            name=f"Recipe {i:05d}",
+            file_path=Path(f"synthetic/{i:05d}.md"),
+            calories=rng.randint(150, 900),
+            protein_g=rng.randint(3, 60),
+            total_time_min=rng.randint(10, 90),
+            meal_type=rng.choice(MEAL_TYPES),
+            main_ingredient=rng.choice(MAIN_INGREDIENTS),
+        )
+        for i in range(n)
+    ]
+
+
+def run_case(
+    config: dict,
+    formulation: str,
+    cooking_path: Path,
+    recipes: list[Recipe] | None,
+    prune: bool = True,
+    top_k: int | None = None,
+) -> dict:
+    stats = SolveStats()
+    build_meal_plan(
+        cooking_path,
+        copy.deepcopy(config),
+        recipes=recipes,
+        formulation=formulation,
+        solve_stats=stats,
+        prune=prune,
+        top_k=top_k,
+    )
+    return {
+        "recipes": len(recipes) if recipes is not None else None,
+        "formulation": formulation,
+        "status": stats.status,
+        "solve_s": round(stats.solve_s, 3),
+        "objective": stats.objective,
+        "variables": stats.variables,
+        "constraints": stats.constraints,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", nargs="+", type=int, default=[300])
+    parser.add_argument("--vault", type=Path, help="Cooking folder to plan from")
+    parser.add_argument("--config-vault", type=Path, help="Vault holding the config")
+    parser.add_argument("--formulation", nargs="+", choices=FORMULATIONS, default=FORMULATIONS)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--snacks", action="store_true")
+    parser.add_argument("--top-k", type=int, help="Best candidates kept per ingredient group")
+    parser.add_argument("--no-prune", action="store_true", help="Skip candidate pruning")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("meal_planner").setLevel(logging.ERROR)
+
+    if args.vault is not None:
+        base = load_config(args.config_vault or args.vault.parent)
+        cases = [None]
+    else:
+        base = copy.deepcopy(DEFAULTS)
+        cases = [synthetic_recipes(n) for n in args.recipes]
+    config = apply_plan_options(base, days=args.days, snacks=args.snacks)
+
+    if not args.json:
+        print(
+            f"{'recipes':>7} {'formulation':>11} {'status':>9} {'solve s':>8} "
+            f"{'objective':>10} {'vars':>7} {'constraints':>11}"
+        )
+    for recipes in cases:
+        for formulation in args.formulation:
+            result = run_case(
+                config,
+                formulation,
+                args.vault or Path("unused"),
+                recipes,
+                prune=not args.no_prune,
+                top_k=args.top_k,
+            )
+            if args.json:
+                print(json.dumps(result))
+                continue
+            objective = "-" if result["objective"] is None else f"{result['objective']:.0f}"
+            print(
+                f"{result['recipes'] or 'vault':>7} {formulation:>11} {result['status']:>9} "
+                f"{result['solve_s']:>8.2f} {objective:>10} {result['variables']:>7} "
+                f"{result['constraints']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
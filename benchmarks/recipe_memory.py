@@ -0,0 +1,115 @@
+"""Memory used by parsed Recipe objects for large synthetic vaults.
+
+Builds recipes from synthetic frontmatter through the same code path as
+`parse_recipe_file` and reports the heap retained per recipe, measured with
+tracemalloc. Pass --no-intern to measure without string interning, and
+--no-slots to build dict-backed (non-slotted) copies of the models instead.
+
+    uv run python benchmarks/recipe_memory.py 10000 100000
+    uv run python benchmarks/recipe_memory.py --no-slots --no-intern 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import random
+import tracemalloc
+from pathlib import Path
+
+from meal_planner import indexer
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack", "main course", "soup", "dessert"]
+CUISINES = ["Italian", "Mexican", "Indian", "Thai", "American", "French", "Japanese"]
+TAGS = ["vegetarian", "vegan", "gluten-free", "dairy-free", "keto", "high-protein"]
+CATEGORIES = ["weeknight", "meal prep", "comfort food", "salad", "one pot"]
+UNITS = ["cup", "tbsp", "tsp", "g", "oz", "lb", "clove", None]
+ITEMS = [
+    "olive oil", "garlic", "onion", "salt", "black pepper", "butter", "flour",
+    "chicken breast", "ground beef", "rice", "eggs", "milk", "tomatoes",
+    "lemon juice", "cumin", "paprika", "parmesan", "spinach", "carrots",
+]
+
+
+def dict_backed(cls: type) -> type:
+    """A copy of a slotted model dataclass with the same fields but a __dict__."""
+    fields = [
+        (f.name, f.type, dataclasses.field(default=f.default, default_factory=f.default_factory))
+        for f in dataclasses.fields(cls)
+    ]
+    return dataclasses.make_dataclass(cls.__name__, fields)
+
+
+def _fresh(s: str | None) -> str | None:
+    # The YAML loader returns a new string object for every scalar it reads
+    return None if s is None else "".join(list(s))
+
+
+def synthetic_frontmatter(rng: random.Random) -> dict:
+    return {
+        "type": "recipe",
+        "calories": rng.randint(150, 900),
+        "protein_g": rng.randint(5, 60),
+        "servings": rng.randint(1, 8),
+        "total_time": f"{rng.randint(10, 120)} minutes",
+        "meal_type": _fresh(rng.choice(MEAL_TYPES)),
+        "cuisine": _fresh(rng.choice(CUISINES)),
+        "main_ingredient": _fresh(rng.choice(ITEMS)),
+        "dietary_tags": [_fresh(t) for t in rng.sample(TAGS, rng.randint(0, 3))],
+        "categories": [_fresh(c) for c in rng.sample(CATEGORIES, rng.randint(0, 2))],
+        "rating": rng.choice([None, 3, 4, 5]),
+        "parsed_ingredients": [
+            {
+                "section": None,
+                "items": [
+                    {
+                        "qty": rng.randint(1, 4),
+                        "unit": _fresh(rng.choice(UNITS)),
+                        "item": _fresh(rng.choice(ITEMS)),
+                    }
+                    for _ in range(rng.randint(5, 15))
+                ],
+            }
+        ],
+    }
+
+
+def measure(n: int) -> float:
+    """Return retained bytes per recipe after building n recipes."""
+    rng = random.Random(0)
+    paths = [Path(f"/vault/Recipe {i:06d}.md") for i in range(n)]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    recipes = [indexer.recipe_from_frontmatter(synthetic_frontmatter(rng), p) for p in paths]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    assert len(recipes) == n
+    return retained / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000])
+    parser.add_argument("--no-intern", action="store_true")
+    parser.add_argument("--no-slots", action="store_true")
+    args = parser.parse_args()
+
+    if args.no_intern:
+        indexer._intern = lambda val: val
+    if args.no_slots:
+        # recipe_from_frontmatter builds its models through these names
+        for name in ("Recipe", "IngredientSection", "ParsedIngredient"):
+            setattr(indexer, name, dict_backed(getattr(indexer, name)))
+
+    for n in args.sizes:
+        per_recipe = measure(n)
+        print(f"{n:>8} recipes: {per_recipe:8.0f} B/recipe  {per_recipe * n / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
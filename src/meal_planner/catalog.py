@@ -0,0 +1,352 @@
+"""SQLite-backed recipe catalog with indexed filter columns.
+
+An optional alternative to loading every recipe into memory: `meal-planner
+index --catalog` writes `.meal-planner/catalog.sqlite`, after which suggest,
+plan, scale and shopping-list push their hard filters down as SQL and only
+unpickle the recipes that match.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import sqlite3
+from pathlib import Path
+
+from meal_planner.indexer import discover_recipe_files, parse_recipe_files
+from meal_planner.models import Recipe
+from meal_planner.recipe_index import (
+    INDEX_VERSION,
+    RecipeIndex,
+    catalog_path,
+    find_stale_files,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Stored recipes are pickles, so a Recipe layout change invalidates them too
+_USER_VERSION = SCHEMA_VERSION * 1000 + INDEX_VERSION
+
+# Shortest query the trigram FTS index can answer; shorter ones use instr()
+_TRIGRAM_MIN = 3
+
+_SCHEMA = """
+CREATE TABLE recipes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    -- Everything below is NULL for files that are not recipes
+    name TEXT,
+    name_lc TEXT,
+    meal_type TEXT,
+    cuisine TEXT,
+    total_time_min INTEGER,
+    calories REAL,
+    protein_g REAL,
+    recipe BLOB
+);
+CREATE INDEX idx_recipes_meal_type ON recipes(meal_type);
+CREATE INDEX idx_recipes_cuisine ON recipes(cuisine);
+CREATE INDEX idx_recipes_total_time ON recipes(total_time_min);
+CREATE INDEX idx_recipes_calories ON recipes(calories);
+CREATE INDEX idx_recipes_protein ON recipes(protein_g);
+CREATE INDEX idx_recipes_name ON recipes(name);
+
+CREATE TABLE recipe_categories (
+    recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    category TEXT NOT NULL
+);
+CREATE INDEX idx_categories ON recipe_categories(category, recipe_id);
+
+CREATE TABLE recipe_tags (
+    recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL
+);
+CREATE INDEX idx_tags ON recipe_tags(tag, recipe_id);
+
+CREATE VIRTUAL TABLE recipe_names USING fts5(name, tokenize='trigram');
+"""
+
+
+def _lower(val: object) -> str | None:
+    return str(val).lower() if val is not None else None
+
+
+class RecipeCatalog:
+    """Recipes stored in SQLite with indexed columns for the hard filters."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- Sync ---------------------------------------------------------------
+
+    def sync(
+        self,
+        files: list[Path],
+        prune: bool = True,
+        jobs: int = 1,
+        index: RecipeIndex | None = None,
+    ) -> int:
+        """Re-parse files whose mtime or size changed and upsert them.
+
+        With prune=True, rows for files not in `files` are deleted. If an
+        up-to-date `index` is given, its entries are reused instead of parsing
+        the same files again. Returns the number of files updated.
+        """
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute(
+                "SELECT path, mtime_ns, size FROM recipes"
+            )
+        }
+        stale = find_stale_files(files, known)
+
+        recipes: dict[str, Recipe | None] = {}
+        if index is not None:
+            for f, st in stale:
+                entry = index.entries.get(str(f))
+                if entry is not None and (entry.mtime_ns, entry.size) == (
+                    st.st_mtime_ns,
+                    st.st_size,
+                ):
+                    recipes[str(f)] = entry.recipe
+        to_parse = [f for f, _ in stale if str(f) not in recipes]
+        recipes.update(zip(map(str, to_parse), parse_recipe_files(to_parse, jobs=jobs)))
+
+        with self.conn:
+            for f, st in stale:
+                self._upsert(str(f), st.st_mtime_ns, st.st_size, recipes[str(f)])
+
+            removed = []
+            if prune:
+                current = {str(f) for f in files}
+                removed = [p for p in known if p not in current]
+                for path in removed:
+                    self.remove(path)
+
+        if stale or removed:
+            logger.debug(
+                "Recipe catalog: %d re-parsed, %d removed", len(stale), len(removed)
+            )
+        return len(stale)
+
+    def _upsert(
+        self, path: str, mtime_ns: int, size: int, recipe: Recipe | None
+    ) -> None:
+        self.remove(path)
+        values = (path, mtime_ns, size)
+        if recipe is None:
+            self.conn.execute(
+                "INSERT INTO recipes (path, mtime_ns, size) VALUES (?, ?, ?)", values
+            )
+            return
+
+        cur = self.conn.execute(
+            "INSERT INTO recipes (path, mtime_ns, size, name, name_lc, meal_type, "
+            "cuisine, total_time_min, calories, protein_g, recipe) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            values
+            + (
+                recipe.name,
+                recipe.name.lower(),
+                _lower(recipe.meal_type),
+                _lower(recipe.cuisine),
+                recipe.total_time_min,
+                recipe.calories,
+                recipe.protein_g,
+                pickle.dumps(recipe, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        recipe_id = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO recipe_categories (recipe_id, category) VALUES (?, ?)",
+            [(recipe_id, _lower(c)) for c in recipe.categories],
+        )
+        self.conn.executemany(
+            "INSERT INTO recipe_tags (recipe_id, tag) VALUES (?, ?)",
+            [(recipe_id, _lower(t)) for t in recipe.dietary_tags],
+        )
+        self.conn.execute(
+            "INSERT INTO recipe_names (rowid, name) VALUES (?, ?)",
+            (recipe_id, recipe.name),
+        )
+
+    def invalidate(self, paths: list[Path]) -> None:
+        """Force the next sync to re-read these files even if unchanged on disk."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE recipes SET mtime_ns = -1 WHERE path = ?",
+                [(str(p),) for p in paths],
+            )
+
+    def remove(self, path: str) -> None:
+        """Delete the row (and its side-table rows) for a file path."""
+        row = self.conn.execute(
+            "SELECT id FROM recipes WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return
+        self.conn.execute("DELETE FROM recipe_names WHERE rowid = ?", row)
+        self.conn.execute("DELETE FROM recipes WHERE id = ?", row)
+
+    # -- Queries ------------------------------------------------------------
+
+    def _load(self, sql: str, params: list | tuple = ()) -> list[Recipe]:
+        return [pickle.loads(blob) for (blob,) in self.conn.execute(sql, params)]
+
+    def all_recipes(self) -> list[Recipe]:
+        """Materialize every recipe, in file-name order."""
+        return self._load(
+            "SELECT recipe FROM recipes WHERE recipe IS NOT NULL ORDER BY path"
+        )
+
+    def names(self) -> list[str]:
+        """All recipe names, in file-name order, without loading recipes."""
+        return [
+            name
+            for (name,) in self.conn.execute(
+                "SELECT name FROM recipes WHERE recipe IS NOT NULL ORDER BY path"
+            )
+        ]
+
+    def get_by_names(self, names: list[str]) -> dict[str, Recipe]:
+        """Load the recipes with exactly these names."""
+        result: dict[str, Recipe] = {}
+        for name in names:
+            recipes = self._load("SELECT recipe FROM recipes WHERE name = ?", (name,))
+            if recipes:
+                result[name] = recipes[0]
+        return result
+
+    def find_by_name(self, query: str) -> list[Recipe]:
+        """Recipes whose name contains `query` (case-insensitive).
+
+        Uses the trigram FTS index for queries of three or more characters.
+        """
+        query_lc = query.lower()
+        if len(query_lc) >= _TRIGRAM_MIN:
+            fts_query = '"' + query.replace('"', '""') + '"'
+            candidates = self._load(
+                "SELECT r.recipe FROM recipe_names n JOIN recipes r ON r.id = n.rowid "
+                "WHERE recipe_names MATCH ? ORDER BY r.path",
+                (fts_query,),
+            )
+        else:
+            candidates = self._load(
+                "SELECT recipe FROM recipes WHERE recipe IS NOT NULL "
+                "AND instr(name_lc, ?) > 0 ORDER BY path",
+                (query_lc,),
+            )
+        # FTS case folding differs slightly from str.lower(); re-check in Python
+        return [r for r in candidates if query_lc in r.name.lower()]
+
+    def filter_recipes(
+        self,
+        meal_type: str | None = None,
+        max_time: int | None = None,
+        cuisine: str | None = None,
+        dietary_tags: list[str] | None = None,
+        exclude: list[str] | None = None,
+        min_protein: float | None = None,
+        max_calories: float | None = None,
+    ) -> list[Recipe]:
+        """SQL equivalent of suggest.filter_recipes over the catalog."""
+        from meal_planner.suggest import MEAL_TYPE_MAP
+
+        clauses = ["r.recipe IS NOT NULL"]
+        params: list = []
+
+        if meal_type:
+            meal_type = meal_type.lower()
+            valid = sorted(MEAL_TYPE_MAP.get(meal_type, {meal_type}))
+            marks = ", ".join("?" * len(valid))
+            clauses.append(
+                f"(r.meal_type IN ({marks}) OR r.id IN "
+                f"(SELECT recipe_id FROM recipe_categories WHERE category IN ({marks})))"
+            )
+            params += valid + valid
+        if max_time is not None:
+            clauses.append("(r.total_time_min IS NULL OR r.total_time_min <= ?)")
+            params.append(max_time)
+        if cuisine:
+            clauses.append("r.cuisine IS NOT NULL AND instr(r.cuisine, ?) > 0")
+            params.append(cuisine.lower())
+        for tag in dietary_tags or []:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM recipe_tags t "
+                "WHERE t.recipe_id = r.id AND t.tag = ?)"
+            )
+            params.append(tag.lower())
+        for ex in exclude or []:
+            clauses.append("instr(r.name_lc, ?) = 0")
+            params.append(ex.lower())
+        if min_protein is not None:
+            clauses.append("(r.protein_g IS NULL OR r.protein_g >= ?)")
+            params.append(min_protein)
+        if max_calories is not None:
+            clauses.append("(r.calories IS NULL OR r.calories <= ?)")
+            params.append(max_calories)
+
+        sql = (
+            "SELECT r.recipe FROM recipes r WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY r.path"
+        )
+        return self._load(sql, params)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version != _USER_VERSION:
+        if version:
+            logger.info("Rebuilding recipe catalog (format changed)")
+        with conn:
+            for (table,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'recipe_names_%'"
+            ).fetchall():
+                conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_USER_VERSION}")
+    return conn
+
+
+def open_catalog(
+    cooking_path: Path,
+    jobs: int = 1,
+    create: bool = False,
+    index: RecipeIndex | None = None,
+    invalidate: list[Path] | None = None,
+) -> RecipeCatalog | None:
+    """Open and sync the catalog, or return None if it has not been built.
+
+    With create=True the catalog is built if missing (used by `index --catalog`).
+    `index` is passed through to RecipeCatalog.sync; files in `invalidate`
+    are re-synced even if unchanged on disk.
+    """
+    path = catalog_path(cooking_path)
+    if not create and not path.exists():
+        return None
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        catalog = RecipeCatalog(_connect(path))
+        if invalidate:
+            catalog.invalidate(invalidate)
+        catalog.sync(discover_recipe_files(cooking_path), jobs=jobs, index=index)
+    except sqlite3.Error as e:
+        if create:
+            raise
+        logger.warning("Ignoring unusable recipe catalog %s: %s", path, e)
+        return None
+    return catalog
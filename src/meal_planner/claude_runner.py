@@ -0,0 +1,153 @@
+"""asyncio runner for `claude` CLI calls.
+
+Every Haiku call goes through a ClaudeRunner, which caps how many CLI
+processes run at once, spaces out new calls with a token bucket, and retries
+calls that exit non-zero (usually throttling) with exponential backoff and
+full jitter. Cancelling a call, e.g. on Ctrl-C, kills its process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+CLAUDE_COMMAND = ("claude", "--model", "haiku", "-p")
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0  # CLI calls started per second
+DEFAULT_MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+
+class ClaudeExitError(Exception):
+    """The CLI exited non-zero; worth retrying after a pause."""
+
+
+def strip_fences(text: str) -> str:
+    """Remove a markdown code fence around the CLI's answer, if present."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.endswith("```"):
+            text = text[: text.rfind("```")]
+        text = text.strip()
+    return text
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, bursting to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(
+    attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_MAX_SECONDS
+) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base·2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class ClaudeRunner:
+    """Runs `claude` CLI calls concurrently, politely and cancellably.
+
+    Args:
+        concurrency: most CLI processes alive at once
+        rate: most calls started per second (0 for no limit)
+        max_retries: retries after a non-zero exit before giving up
+        command: argv to run; the prompt is written to its stdin
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        command: tuple[str, ...] = CLAUDE_COMMAND,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.command = command
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(rate, burst=self.concurrency)
+        self.calls = 0
+        self.retries = 0
+
+    async def call(self, prompt: str, timeout: float) -> str | None:
+        """Run one CLI call and return its answer, or None on failure."""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._bucket.acquire()
+                self.calls += 1
+                try:
+                    return await self._run_once(prompt, timeout)
+                except ClaudeExitError as e:
+                    if attempt == self.max_retries:
+                        logger.error("claude CLI error: %s", e)
+                        return None
+                    error = str(e)
+            self.retries += 1
+            delay = backoff_delay(attempt)
+            logger.debug("claude CLI failed (%s), retrying in %.1fs", error, delay)
+            await asyncio.sleep(delay)
+        return None
+
+    async def _run_once(self, prompt: str, timeout: float) -> str | None:
+        """One CLI process. Raises ClaudeExitError on a non-zero exit."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            logger.error("'%s' CLI not found. Install it first.", self.command[0])
+            return None
+
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(prompt.encode()), timeout
+            )
+        except TimeoutError:
+            logger.error("claude CLI timed out after %ds", timeout)
+            await _kill(proc)
+            return None
+        except asyncio.CancelledError:
+            await _kill(proc)
+            raise
+
+        if proc.returncode != 0:
+            message = stderr.decode(errors="replace").strip()
+            raise ClaudeExitError(message or f"exit status {proc.returncode}")
+        return strip_fences(stdout.decode(errors="replace"))
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        await proc.wait()
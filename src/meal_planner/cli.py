@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 
 DEFAULT_VAULT_PATH = Path.home() / "obsidian-sync" / "Personal"
@@ -14,9 +15,21 @@ def get_cooking_path(args: argparse.Namespace) -> Path:
     return vault / DEFAULT_COOKING_DIR
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
 def cmd_index(args: argparse.Namespace) -> None:
     from meal_planner.indexer import run_index
 
+    vault = Path(args.vault_path) if args.vault_path else DEFAULT_VAULT_PATH
     run_index(
         cooking_path=get_cooking_path(args),
         dry_run=args.dry_run,
@@ -24,6 +37,19 @@ def cmd_index(args: argparse.Namespace) -> None:
         force=getattr(args, "force", False),
         skip_api=getattr(args, "skip_api", False),
         max_workers=getattr(args, "workers", 4),
+        rate=getattr(args, "rate", 2.0),
+        batch_tokens=getattr(args, "batch_tokens", 2000),
+        resume=getattr(args, "resume", False),
+        retry_failed=getattr(args, "retry_failed", False),
+        max_attempts=getattr(args, "max_attempts", 3),
+        sidecar=getattr(args, "sidecar", False),
+        budget=getattr(args, "budget", None),
+        verify=getattr(args, "verify", False),
+        vault_path=vault,
+        jobs=args.jobs,
+        catalog=getattr(args, "catalog", False),
+        watch=getattr(args, "watch", False),
+        interval=getattr(args, "interval", 2.0),
     )
 
 
@@ -44,6 +70,7 @@ def cmd_suggest(args: argparse.Namespace) -> None:
         max_calories=args.max_calories,
         limit=args.limit,
         output_format=args.format,
+        jobs=args.jobs,
     )
 
 
@@ -68,6 +95,10 @@ def cmd_plan(args: argparse.Namespace) -> None:
         save_plan=args.save_plan,
         recipes=args.recipes,
         require_groups=args.require_group,
+        jobs=args.jobs,
+        formulation=args.formulation,
+        prune=not args.no_prune,
+        top_k=args.top_k,
     )
 
 
@@ -81,6 +112,7 @@ def cmd_shopping_list(args: argparse.Namespace) -> None:
         plan_file=args.plan_file,
         pantry=args.pantry,
         output_format=args.format,
+        jobs=args.jobs,
     )
 
 
@@ -92,6 +124,19 @@ def cmd_scale(args: argparse.Namespace) -> None:
         recipe_name=args.recipe,
         servings=args.servings,
         output_format=args.format,
+        jobs=args.jobs,
+    )
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from meal_planner.server import run_serve
+
+    vault = Path(args.vault_path) if args.vault_path else DEFAULT_VAULT_PATH
+    run_serve(
+        cooking_path=get_cooking_path(args),
+        vault_path=vault,
+        socket_path=args.socket,
+        jobs=args.jobs,
     )
 
 
@@ -118,6 +163,17 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Also write logs to this file",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for parsing changed recipe files (default: 1)",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="After the command, print how long each module import took",
+    )
 
     sub = parser.add_subparsers(dest="command", required=True)
 
@@ -131,11 +187,77 @@ def build_parser() -> argparse.ArgumentParser:
         "--force", action="store_true", help="Re-parse even if hash matches"
     )
     p_index.add_argument(
-        "--skip-api", action="store_true", help="Use regex parser instead of Haiku"
+        "--verify",
+        action="store_true",
+        help="Check stored parses against the local parser and re-parse only "
+        "disagreeing lines, instead of everything as --force does",
+    )
+    p_index.add_argument(
+        "--skip-api",
+        action="store_true",
+        help="Use the local ingredient parser only, without Haiku",
     )
     p_index.add_argument(
         "--workers", type=int, default=4, help="Parallel Haiku workers (default: 4)"
     )
+    p_index.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Most Haiku calls started per second, 0 for no limit (default: 2)",
+    )
+    p_index.add_argument(
+        "--batch-tokens",
+        type=int,
+        default=2000,
+        help="Starting size of each Haiku batch in estimated tokens (default: 2000)",
+    )
+    journal_mode = p_index.add_mutually_exclusive_group()
+    journal_mode.add_argument(
+        "--resume",
+        action="store_true",
+        help="Only finish recipes an interrupted run left pending or failed",
+    )
+    journal_mode.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only retry recipes whose Haiku parse failed, however often",
+    )
+    p_index.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Skip recipes after this many failed Haiku attempts (default: 3)",
+    )
+    p_index.add_argument(
+        "--budget",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Send only the N most valuable recipes to Haiku: planner candidates, "
+        "then by rating",
+    )
+    p_index.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Store parsed ingredients in .meal-planner/ instead of the recipe notes",
+    )
+    p_index.add_argument(
+        "--catalog",
+        action="store_true",
+        help="Also build the SQLite catalog used to filter recipes in SQL",
+    )
+    p_index.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-index recipe files as they change",
+    )
+    p_index.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Seconds between checks in --watch mode (default: 2)",
+    )
     p_index.set_defaults(func=cmd_index)
 
     # suggest
@@ -211,6 +333,27 @@ def build_parser() -> argparse.ArgumentParser:
     p_plan.add_argument(
         "--format", type=str, choices=["json", "markdown"], default="markdown"
     )
+    p_plan.add_argument(
+        "--formulation",
+        choices=["element", "table"],
+        default="element",
+        help="CP-SAT encoding of meal macros: element lookups with products, or a "
+             "table of precomputed (recipe, serving) options",
+    )
+    p_plan.add_argument(
+        "--top-k",
+        type=positive_int,
+        metavar="K",
+        help="Give the solver only the K best-fitting candidates per ingredient group "
+             "and meal. May cost plan quality. If that leaves fewer recipes or groups "
+             "than plan days, the best pruned ones are added back, with a warning",
+    )
+    p_plan.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Give the solver every candidate, including recipes with identical "
+             "macros and ingredient group, and ignore --top-k",
+    )
     p_plan.set_defaults(func=cmd_plan)
 
     # shopping-list
@@ -233,6 +376,18 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_scale.set_defaults(func=cmd_scale)
 
+    # serve
+    p_serve = sub.add_parser(
+        "serve", help="Answer JSON-RPC requests with recipes kept in memory"
+    )
+    p_serve.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Listen on this Unix socket path instead of stdin/stdout",
+    )
+    p_serve.set_defaults(func=cmd_serve)
+
     return parser
 
 
@@ -242,6 +397,12 @@ def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
+    # Re-run the command under -X importtime; the child sees the option set
+    if args.startup_report and "importtime" not in sys._xoptions:
+        from meal_planner.startup import run_with_startup_report
+
+        sys.exit(run_with_startup_report(sys.argv[1:]))
+
     log_file = Path(args.log_file) if args.log_file else None
     setup_logging(level=args.log_level, log_file=log_file)
 
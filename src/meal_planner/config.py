@@ -4,8 +4,6 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import yaml
-
 DEFAULT_COOKING_DIR = "03. Resources/Cooking"
 
 DEFAULTS = {
@@ -63,12 +61,19 @@ def deep_merge(base: dict, override: dict) -> dict:
     return result
 
 
+def config_path(vault_path: Path) -> Path:
+    """Location of the meal preferences file inside a vault."""
+    return vault_path / DEFAULT_COOKING_DIR / "meal-preferences.yaml"
+
+
 def load_config(vault_path: Path) -> dict:
     """Load meal preferences from YAML file, falling back to defaults."""
-    config_path = vault_path / DEFAULT_COOKING_DIR / "meal-preferences.yaml"
+    path = config_path(vault_path)
+
+    if path.exists():
+        import yaml
 
-    if config_path.exists():
-        with open(config_path) as f:
+        with open(path) as f:
             user_config = yaml.safe_load(f) or {}
         return deep_merge(DEFAULTS, user_config)
 
@@ -0,0 +1,222 @@
+"""Atomic, batched write-back of frontmatter keys into recipe notes.
+
+Only the keys being updated are replaced: their lines are cut out of the
+YAML header and the new values appended, so the rest of the note (other
+keys, their order and formatting, and the body) is written back byte for
+byte without a YAML round-trip. Each file is replaced atomically via a
+temporary file and os.replace, so Obsidian and sync tools never see a
+half-written note.
+
+FrontmatterWriter does this on a background thread. Updates queued within
+a short window are coalesced (the last update per file wins) and flushed
+together: all temporary files are written and fsync'd, then renamed into
+place, then each directory is fsync'd once.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import logging
+import os
+import queue
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from meal_planner.indexer import read_header_lines
+
+logger = logging.getLogger(__name__)
+
+# How long the writer waits for more updates before flushing a batch
+COALESCE_SECONDS = 0.05
+MAX_BATCH_FILES = 128
+
+_STOP = object()
+
+
+def _dump_yaml(updates: dict) -> bytes:
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    text = yaml.dump(
+        updates, Dumper=dumper, default_flow_style=False, allow_unicode=True, sort_keys=False
+    )
+    return text.encode("utf-8")
+
+
+def _top_level_key(line: bytes) -> str | None:
+    """The key a header line starts, or None for continuation lines."""
+    if not line.strip() or line[:1] in (b" ", b"\t", b"-", b"#"):
+        return None
+    key, sep, _ = line.partition(b":")
+    return key.strip().strip(b"'\"").decode("utf-8", "replace") if sep else None
+
+
+def splice_frontmatter(data: bytes, updates: dict) -> bytes:
+    """Return `data` with the given top-level frontmatter keys replaced.
+
+    Each key's existing block (its line plus indented or list continuation
+    lines) is removed and the new values are appended at the end of the
+    header. A note without frontmatter gets a new header.
+    """
+    f = io.BytesIO(data)
+    header = read_header_lines(f)
+    if header is None:
+        return b"---\n" + _dump_yaml(updates) + b"---\n\n" + data
+
+    body = f.read()
+    kept: list[bytes] = []
+    skipping = False
+    for line in header:
+        key = _top_level_key(line)
+        if key is not None:
+            skipping = key in updates
+        if not skipping:
+            kept.append(line)
+    if kept and not kept[-1].endswith(b"\n"):
+        kept[-1] += b"\n"
+
+    bom = codecs.BOM_UTF8 if data.startswith(codecs.BOM_UTF8) else b""
+    return bom + b"---\n" + b"".join(kept) + _dump_yaml(updates) + b"---\n" + body
+
+
+def _write_temp(path: Path, data: bytes) -> str:
+    """Write `data` to a temporary file next to `path`, with its permissions."""
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        except OSError:
+            pass
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def _fsync_path(path: str | Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_frontmatter_keys(
+    paths_updates: dict[Path, dict], fsync: bool = True
+) -> list[Path]:
+    """Splice updates into several notes at once. Returns the paths that failed.
+
+    Temporary files are all written (and fsync'd) before any is renamed into
+    place, and each directory is fsync'd once at the end.
+    """
+    staged: list[tuple[Path, str]] = []
+    failed: list[Path] = []
+    for path, updates in paths_updates.items():
+        try:
+            data = splice_frontmatter(path.read_bytes(), updates)
+            staged.append((path, _write_temp(path, data)))
+        except OSError as e:
+            logger.error("Could not write %s: %s", path, e)
+            failed.append(path)
+
+    if fsync:
+        for path, tmp in staged:
+            try:
+                _fsync_path(tmp)
+            except OSError as e:
+                logger.debug("fsync failed for %s: %s", tmp, e)
+
+    directories: set[Path] = set()
+    for path, tmp in staged:
+        try:
+            os.replace(tmp, path)
+            directories.add(path.parent)
+        except OSError as e:
+            logger.error("Could not replace %s: %s", path, e)
+            failed.append(path)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    if fsync:
+        for directory in directories:
+            try:
+                _fsync_path(directory)
+            except OSError:
+                pass  # not supported on every platform
+    return failed
+
+
+class FrontmatterWriter:
+    """Background thread applying queued frontmatter updates in batches.
+
+    Use as a context manager; leaving it waits for every queued update to
+    be written. Paths are collected in `written` or, if writing them
+    failed, in `failed`.
+    """
+
+    def __init__(self, fsync: bool = True) -> None:
+        self.fsync = fsync
+        self.failed: list[Path] = []
+        self.written: list[Path] = []
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="frontmatter-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, path: Path, updates: dict) -> None:
+        """Queue `updates` (top-level key -> value) for the note at `path`."""
+        self._queue.put((path, updates))
+
+    def close(self) -> None:
+        """Flush everything queued and stop the thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> FrontmatterWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch: dict[Path, dict] = {}
+            self._merge(batch, item)
+
+            # Gather whatever else arrives shortly, merging repeated paths
+            deadline = time.monotonic() + COALESCE_SECONDS
+            while len(batch) < MAX_BATCH_FILES:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                self._merge(batch, item)
+
+            try:
+                failed = write_frontmatter_keys(batch, fsync=self.fsync)
+            except Exception:
+                logger.exception("Frontmatter writer failed")
+                failed = list(batch)
+            self.failed.extend(failed)
+            self.written.extend(p for p in batch if p not in failed)
+
+    @staticmethod
+    def _merge(batch: dict[Path, dict], item: tuple[Path, dict]) -> None:
+        path, updates = item
+        batch.setdefault(path, {}).update(updates)
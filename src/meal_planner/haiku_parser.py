@@ -2,163 +2,190 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import subprocess
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
-import frontmatter
-
+from meal_planner.claude_runner import DEFAULT_RATE, ClaudeRunner
+from meal_planner.config import DEFAULTS
+from meal_planner.frontmatter_writer import FrontmatterWriter
+from meal_planner.index_journal import (
+    FAILED,
+    MAX_ATTEMPTS,
+    OK,
+    PENDING,
+    IndexJournal,
+    load_journal,
+)
 from meal_planner.indexer import compute_ingredients_hash
-from meal_planner.log import stderr_console
+from meal_planner.ingredient_store import SidecarWriter
+from meal_planner.ingredient_parser import (
+    IngredientLine,
+    assemble_sections,
+    group_sections,
+    parse_ingredient_lines,
+    section_hash,
+)
+from meal_planner.line_cache import LineCache, load_line_cache, normalize_line
 from meal_planner.models import Recipe
+from meal_planner.suggest import planner_eligible
 
 logger = logging.getLogger(__name__)
 
-PARSE_PROMPT = """\
-Parse these recipe ingredients into structured JSON. Return a JSON array of section objects.
+LINE_PARSE_PROMPT = """\
+Parse each numbered recipe ingredient line below into structured JSON.
+
+Return a single JSON object where each key is the line number (as a string like "0", "1", etc.) and each value is an object with "qty" (number or null), "unit" (string or null), "item" (string) and "notes" (string or null), or null if the line is not an ingredient.
 
 Rules:
-- Each section has "section" (string or null if no section header) and "items" (array)
-- Each item has: "qty" (number or null), "unit" (string or null), "item" (string), "notes" (string or null)
 - Convert fractions to decimals: 1/2 = 0.5, 1/3 = 0.333, 1/4 = 0.25, 2/3 = 0.667, 3/4 = 0.75, ⅓ = 0.333, ½ = 0.5
 - For "1 (13.5oz) can coconut milk": qty=1, unit="can", item="coconut milk", notes="13.5oz"
 - For "60 g (4 tablespoons) vegetable oil": qty=60, unit="g", item="vegetable oil", notes="4 tablespoons"
 - For "salt and pepper to taste": qty=null, unit=null, item="salt and pepper", notes="to taste"
 - For "Juice from 1/2 of a lemon": qty=0.5, unit="whole", item="lemon", notes="juiced"
 - For "Pinch of kosher salt": qty=1, unit="pinch", item="kosher salt"
-- Section headers include lines like "**For the Sauce:**", "**Crumb Mixture**", "Chicken + Marinade:", "Toppings (85%):" — extract just the meaningful name
-- Skip empty lines and lines that are only "(Optional)" — attach optional to previous item's notes
+- For "1 cup + 2 tbsp flour": qty=1.125, unit="cup", item="flour", notes="1 cup + 2 tbsp"
 - For lines with no quantity like "Kosher salt": qty=null, unit=null, item="kosher salt", notes=null
 
 Return ONLY valid JSON, no markdown fences, no explanation.
 
-Ingredients:
 """
 
-BATCH_PARSE_PROMPT = """\
-Parse the ingredients for each recipe below into structured JSON. Each recipe is delimited by a header line.
+# Prefix on ingredients_hash for `index --skip-api` results that still
+# contain low-confidence lines, so a later run with Haiku revisits them
+LOCAL_HASH_PREFIX = "local:"
 
-Return a single JSON object where each key is the recipe number (as a string like "0", "1", etc.) and each value is a JSON array of section objects for that recipe.
+# Batches of uncertain lines are packed up to an estimated token budget
+# (about four characters per token, plus the JSON Haiku writes back for each
+# line) rather than a fixed line count. The budget adapts to how batches fare.
+DEFAULT_BATCH_TOKENS = 2000
+MIN_BATCH_TOKENS = 200
+MAX_BATCH_TOKENS = 8000
+OUTPUT_TOKENS_PER_LINE = 30
 
-Rules for each recipe's ingredient list:
-- Each section has "section" (string or null if no section header) and "items" (array)
-- Each item has: "qty" (number or null), "unit" (string or null), "item" (string), "notes" (string or null)
-- Convert fractions to decimals: 1/2 = 0.5, 1/3 = 0.333, 1/4 = 0.25, 2/3 = 0.667, 3/4 = 0.75, ⅓ = 0.333, ½ = 0.5
-- For "1 (13.5oz) can coconut milk": qty=1, unit="can", item="coconut milk", notes="13.5oz"
-- For "60 g (4 tablespoons) vegetable oil": qty=60, unit="g", item="vegetable oil", notes="4 tablespoons"
-- For "salt and pepper to taste": qty=null, unit=null, item="salt and pepper", notes="to taste"
-- For "Juice from 1/2 of a lemon": qty=0.5, unit="whole", item="lemon", notes="juiced"
-- For "Pinch of kosher salt": qty=1, unit="pinch", item="kosher salt"
-- Section headers include lines like "**For the Sauce:**", "**Crumb Mixture**", "Chicken + Marinade:", "Toppings (85%):" — extract just the meaningful name
-- Skip empty lines and lines that are only "(Optional)" — attach optional to previous item's notes
-- For lines with no quantity like "Kosher salt": qty=null, unit=null, item="kosher salt", notes=null
+# Unrated recipes rank as if rated this, as suggest scores them
+NEUTRAL_RATING = 2.5
 
-Return ONLY valid JSON, no markdown fences, no explanation.
+# CLI timeouts grow with the batch: a fixed allowance for starting the CLI,
+# plus time per estimated token
+TIMEOUT_BASE_SECONDS = 45
+TIMEOUT_PER_TOKEN_SECONDS = 0.03
+MAX_TIMEOUT_SECONDS = 300
 
-"""
 
+def estimate_tokens(text: str) -> int:
+    """Rough token count for a prompt, at about four characters per token."""
+    return len(text) // 4 + 1
 
-def _call_haiku_raw(prompt: str, timeout: int = 120) -> str | None:
-    """Call Claude Haiku via CLI and return raw text output, or None on failure."""
-    try:
-        result = subprocess.run(
-            ["claude", "--model", "haiku", "-p"],
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
 
-        if result.returncode != 0:
-            logger.error("claude CLI error: %s", result.stderr.strip())
-            return None
+def haiku_timeout(tokens: int) -> int:
+    """CLI timeout in seconds for a call of roughly `tokens` in and out."""
+    return min(
+        MAX_TIMEOUT_SECONDS,
+        round(TIMEOUT_BASE_SECONDS + tokens * TIMEOUT_PER_TOKEN_SECONDS),
+    )
 
-        text = result.stdout.strip()
-
-        # Strip markdown fences if present
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1]
-            if text.endswith("```"):
-                text = text[: text.rfind("```")]
-            text = text.strip()
-
-        return text
-    except subprocess.TimeoutExpired:
-        logger.error("claude CLI timed out after %ds", timeout)
-        return None
-    except FileNotFoundError:
-        logger.error("'claude' CLI not found. Install it first.")
-        return None
-
-
-def call_haiku(raw_ingredients: str) -> list[dict] | None:
-    """Call Claude Haiku via the claude CLI to parse ingredients."""
-    text = _call_haiku_raw(PARSE_PROMPT + raw_ingredients, timeout=60)
-    if text is None:
-        return None
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        logger.error("JSON parse error: %s", e)
-        return None
 
+def line_tokens(text: str) -> int:
+    """Estimated cost of one line in a LINE_PARSE_PROMPT batch, input and output."""
+    return estimate_tokens(text) + 2 + OUTPUT_TOKENS_PER_LINE
 
-def call_haiku_batch(
-    recipes: list[tuple[str, str]],
-    batch_size: int = 10,
-) -> dict[int, list[dict] | None]:
-    """Parse ingredients for multiple recipes in batched CLI calls.
 
-    Args:
-        recipes: list of (recipe_name, raw_ingredients) tuples
-        batch_size: number of recipes per CLI call
+class BatchBudget:
+    """Token budget for line batches, adjusted from how previous calls went.
 
-    Returns:
-        dict mapping original index -> parsed sections or None
+    A batch that times out halves the budget and one that comes back with
+    lines missing shrinks it by a quarter; a complete batch that finished in
+    under half its timeout grows it by a quarter.
     """
-    results: dict[int, list[dict] | None] = {}
-
-    for batch_start in range(0, len(recipes), batch_size):
-        batch = recipes[batch_start : batch_start + batch_size]
-        batch_indices = list(range(batch_start, batch_start + len(batch)))
 
-        # Build batched prompt
-        parts = []
-        for i, (name, raw) in enumerate(batch):
-            parts.append(f"===== RECIPE {i}: {name} =====")
-            parts.append(raw)
-            parts.append("")
+    def __init__(
+        self,
+        tokens: int = DEFAULT_BATCH_TOKENS,
+        min_tokens: int = MIN_BATCH_TOKENS,
+        max_tokens: int = MAX_BATCH_TOKENS,
+    ) -> None:
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.tokens = max(min_tokens, min(max_tokens, tokens))
+
+    def take(self, queue: deque[str], cost: Callable[[str], int]) -> list[str]:
+        """Pop lines off `queue` up to the budget (always at least one)."""
+        batch = [queue.popleft()]
+        used = cost(batch[0])
+        while queue and used + cost(queue[0]) <= self.tokens:
+            used += cost(queue[0])
+            batch.append(queue.popleft())
+        return batch
+
+    def record(self, elapsed: float, timeout: float, complete: bool) -> None:
+        """Adjust the budget after a batch call."""
+        if not complete and elapsed >= timeout * 0.9:
+            self.tokens = max(self.min_tokens, self.tokens // 2)
+        elif not complete:
+            self.tokens = max(self.min_tokens, self.tokens * 3 // 4)
+        elif elapsed < timeout / 2:
+            self.tokens = min(self.max_tokens, self.tokens * 5 // 4)
+
+
+# A numbered top-level key in a batch answer, e.g. `, "12": `
+_BATCH_KEY_RE = re.compile(r'[{,]\s*"(\d+)"\s*:\s*')
+_DELIMITER_RE = re.compile(r"\s*[,}]")
+
+
+def salvage_batch_entries(text: str) -> dict[str, object]:
+    """Recover the complete `"<n>": value` entries from a damaged batch answer.
+
+    Walks the text key by key with an incremental decoder instead of parsing
+    it in one go, so an answer cut off mid-entry, or with one malformed
+    entry, still yields every entry that came through intact. An entry
+    counts as complete if its value is an object or array, or if a `,` or
+    `}` follows it (a bare number at the cut-off point may be truncated).
+    """
+    decoder = json.JSONDecoder()
+    entries: dict[str, object] = {}
+    pos = 0
+    while match := _BATCH_KEY_RE.search(text, pos):
+        try:
+            value, end = decoder.raw_decode(text, match.end())
+        except json.JSONDecodeError:
+            # Skip the damaged value; resume at the next numbered key
+            pos = match.end()
+            continue
+        if not isinstance(value, (dict, list)) and not _DELIMITER_RE.match(text, end):
+            pos = match.end()
+            continue
+        entries[match.group(1)] = value
+        pos = end
+    return entries
 
-        prompt = BATCH_PARSE_PROMPT + "\n".join(parts)
-        text = _call_haiku_raw(prompt, timeout=120)
 
-        if text is not None:
-            try:
-                parsed = json.loads(text)
-                if isinstance(parsed, dict):
-                    all_ok = True
-                    for i, orig_idx in enumerate(batch_indices):
-                        key = str(i)
-                        if key in parsed and isinstance(parsed[key], list):
-                            results[orig_idx] = parsed[key]
-                        else:
-                            all_ok = False
-                    if all_ok:
-                        continue  # batch succeeded, move to next
-            except json.JSONDecodeError as e:
-                logger.error("Batch JSON parse error: %s", e)
-
-        # Fallback: parse individually for this batch
-        logger.debug(
-            "Falling back to individual parsing for batch at index %d", batch_start
+def _load_batch(text: str, expected: int) -> dict:
+    """Parse a batch answer, salvaging what it can if the JSON is damaged."""
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        parsed = salvage_batch_entries(text)
+        logger.warning(
+            "Batch JSON parse error (%s); salvaged %d of %d entries", e, len(parsed), expected
         )
-        for i, (name, raw) in enumerate(batch):
-            orig_idx = batch_indices[i]
-            if orig_idx not in results:
-                results[orig_idx] = call_haiku(raw)
+    return parsed if isinstance(parsed, dict) else {}
 
-    return results
+
+def parse_priority(recipe: Recipe, config: dict) -> tuple[bool, float]:
+    """Sort key for parsing order: higher is parsed sooner.
+
+    Recipes the planner could pick under `config` come first, since their
+    ingredients feed shopping lists; within each group, higher rated first.
+    """
+    rating = recipe.rating if recipe.rating and recipe.rating > 0 else NEUTRAL_RATING
+    return planner_eligible(recipe, config), rating
 
 
 def parsed_to_frontmatter_format(sections: list[dict]) -> list[dict]:
@@ -175,112 +202,526 @@ def parsed_to_frontmatter_format(sections: list[dict]) -> list[dict]:
             if item.get("notes"):
                 entry["notes"] = item["notes"]
             items.append(entry)
-        result.append(
-            {
-                "section": section.get("section"),
-                "items": items,
-            }
-        )
+        fm_section: dict = {"section": section.get("section")}
+        if section.get("hash"):
+            fm_section["hash"] = section["hash"]
+        fm_section["items"] = items
+        result.append(fm_section)
     return result
 
 
-def write_parsed_to_file(
-    file_path: Path,
-    parsed_ingredients: list[dict],
-    ingredients_hash: str,
-) -> None:
-    """Write parsed_ingredients and ingredients_hash back to recipe frontmatter."""
-    post = frontmatter.load(file_path)
-    post.metadata["parsed_ingredients"] = parsed_ingredients
-    post.metadata["ingredients_hash"] = ingredients_hash
+def _to_entry(value: object) -> dict:
+    """Normalize one line result from Haiku, raising ValueError if malformed."""
+    if not isinstance(value, dict) or not isinstance(value.get("item"), str):
+        raise ValueError(f"not an ingredient object: {value!r}")
+    qty = value.get("qty")
+    return {
+        "qty": qty if isinstance(qty, (int, float)) else None,
+        "unit": value.get("unit") or None,
+        "item": value["item"],
+        "notes": value.get("notes") or None,
+    }
+
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(frontmatter.dumps(post))
-        f.write("\n")
+def _line_results(text: str | None, lines: list[str]) -> dict[int, dict | None]:
+    """Pull the per-line entries out of Haiku's answer to LINE_PARSE_PROMPT."""
+    results: dict[int, dict | None] = {}
+    if text is not None:
+        parsed = _load_batch(text, len(lines))
+        for i in range(len(lines)):
+            key = str(i)
+            if key not in parsed:
+                continue
+            try:
+                results[i] = None if parsed[key] is None else _to_entry(parsed[key])
+            except ValueError as e:
+                logger.debug("Bad entry for %r: %s", lines[i], e)
+    return results
 
 
-def _fetch_batch(batch: list[Recipe]) -> dict[int, list[dict]]:
-    """Call Haiku for a batch of recipes and return parsed results.
+async def _fetch_lines(
+    runner: ClaudeRunner, lines: list[str], timeout: int | None = None
+) -> dict[int, dict | None]:
+    """Call Haiku for a batch of ingredient lines and return parsed results.
 
-    Returns a dict mapping batch-local index -> parsed sections.
-    Missing keys indicate failures that need individual fallback.
+    Returns a dict mapping batch-local index -> entry, or None for lines
+    Haiku says are not ingredients. Missing keys indicate failures that need
+    a retry. The timeout defaults to one sized for the batch.
     """
-    parts = []
-    for i, recipe in enumerate(batch):
-        parts.append(f"===== RECIPE {i}: {recipe.name} =====")
-        parts.append(recipe.raw_ingredients)
-        parts.append("")
+    prompt = LINE_PARSE_PROMPT + "\n".join(f"{i}: {line}" for i, line in enumerate(lines))
+    if timeout is None:
+        timeout = haiku_timeout(estimate_tokens(LINE_PARSE_PROMPT) + sum(map(line_tokens, lines)))
+    return _line_results(await runner.call(prompt, timeout), lines)
+
+
+async def _retry_lines(
+    runner: ClaudeRunner, lines: list[str], indices: list[int]
+) -> tuple[dict[int, dict | None], int]:
+    """Re-ask Haiku for `lines[i] for i in indices`, bisecting on failure.
+
+    A group whose lines all fail is split in half and both halves retried
+    concurrently; one where only some fail is retried with just those. A
+    single bad line in a batch of n therefore costs about 2·log2(n) extra
+    calls rather than n. Returns (results keyed by index into `lines`,
+    calls made).
+    """
+    if len(indices) > 1:
+        mid = len(indices) // 2
+        groups = [indices[:mid], indices[mid:]]
+    else:
+        groups = [indices]
+
+    async def retry(group: list[int]) -> tuple[dict[int, dict | None], int]:
+        found = await _fetch_lines(runner, [lines[i] for i in group])
+        results = {group[j]: value for j, value in found.items()}
+        calls = 1
+        missing = [i for i in group if i not in results]
+        if missing and len(group) > 1:
+            retried, retry_calls = await _retry_lines(runner, lines, missing)
+            results.update(retried)
+            calls += retry_calls
+        return results, calls
+
+    results: dict[int, dict | None] = {}
+    calls = 0
+    for found, group_calls in await asyncio.gather(*(retry(g) for g in groups)):
+        results.update(found)
+        calls += group_calls
+    return results, calls
+
+
+@dataclass(slots=True)
+class BatchOutcome:
+    """Result of one batch, with stats from its first call for BatchBudget."""
+
+    results: dict[int, dict | None]
+    elapsed: float  # seconds taken by the first call
+    complete: bool  # whether the first call answered every line
+    retry_calls: int
+
+
+@dataclass(slots=True)
+class ParseStats:
+    """Counters from one parse_all_ingredients run, for logs and benchmarks."""
+
+    with_ingredients: int = 0  # recipes with ingredient text
+    recipes: int = 0  # of which needed parsing
+    local: int = 0  # of which written without calling Haiku
+    parsed: int = 0  # written in total
+    failed: int = 0  # left unparsed because some of their lines failed
+    deferred: int = 0  # left for a later run by the budget
+    lines_sent: int = 0  # distinct lines sent to Haiku
+    lines_failed: int = 0
+    batches: int = 0
+    incomplete_batches: int = 0  # batches whose first call missed lines
+    calls: int = 0  # CLI calls, including retries
+    retries: int = 0  # calls retried after the CLI exited non-zero
+    bisect_calls: int = 0  # calls re-asking for lines a batch missed
+    sections_reused: int = 0  # unchanged sections taken from the stored parse
+
+
+async def _run_batch(runner: ClaudeRunner, lines: list[str], timeout: int) -> BatchOutcome:
+    """Fetch a batch, retrying any missed lines by bisection."""
+    start = time.perf_counter()
+    results = await _fetch_lines(runner, lines, timeout)
+    elapsed = time.perf_counter() - start
+
+    missing = [i for i in range(len(lines)) if i not in results]
+    complete = not missing
+    retry_calls = 0
+    if missing:
+        logger.debug("Batch missed %d of %d lines, retrying", len(missing), len(lines))
+        retried, retry_calls = await _retry_lines(runner, lines, missing)
+        results.update(retried)
+    return BatchOutcome(results, elapsed, complete, retry_calls)
+
+
+async def fetch_line_batches(
+    runner: ClaudeRunner,
+    queue: deque[str],
+    line_text: dict[str, str],
+    budget: BatchBudget,
+    apply: Callable[[list[str], BatchOutcome], None],
+    stats: ParseStats,
+) -> None:
+    """Send the lines keyed in `queue` to Haiku, calling `apply` per batch.
 
-    prompt = BATCH_PARSE_PROMPT + "\n".join(parts)
-    text = _call_haiku_raw(prompt, timeout=120)
+    Keeps the runner's slots full, sizing each new batch from the current
+    budget so later batches benefit from earlier ones. `apply` gets the
+    batch's keys and its outcome, whose results are indexed like the keys.
+    """
+    prompt_tokens = estimate_tokens(LINE_PARSE_PROMPT)
+    in_flight: dict[asyncio.Task, tuple[list[str], int]] = {}
 
-    results: dict[int, list[dict]] = {}
-    if text is not None:
-        try:
-            parsed = json.loads(text)
-            if isinstance(parsed, dict):
-                for i in range(len(batch)):
-                    key = str(i)
-                    if key in parsed and isinstance(parsed[key], list):
-                        results[i] = parsed[key]
-        except json.JSONDecodeError as e:
-            logger.error("Batch JSON parse error: %s", e)
+    def submit() -> None:
+        while queue and len(in_flight) < runner.concurrency:
+            batch = budget.take(queue, lambda key: line_tokens(line_text[key]))
+            texts = [line_text[key] for key in batch]
+            timeout = haiku_timeout(prompt_tokens + sum(map(line_tokens, texts)))
+            task = asyncio.create_task(_run_batch(runner, texts, timeout))
+            in_flight[task] = (batch, timeout)
 
-    return results
+    try:
+        submit()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                batch, timeout = in_flight.pop(future)
+                outcome = future.result()
+                budget.record(outcome.elapsed, timeout, outcome.complete)
+                stats.batches += 1
+                stats.incomplete_batches += not outcome.complete
+                stats.bisect_calls += outcome.retry_calls
+                logger.debug(
+                    "Batch of %d lines took %.1fs (timeout %ds, %d retries), "
+                    "budget now %d tokens",
+                    len(batch), outcome.elapsed, timeout, outcome.retry_calls,
+                    budget.tokens,
+                )
+                apply(batch, outcome)
+            submit()
+    finally:
+        # On Ctrl-C, cancel outstanding calls (killing their CLI processes)
+        for pending_task in in_flight:
+            pending_task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        stats.calls = runner.calls
+        stats.retries = runner.retries
+    logger.debug("%d CLI calls, %d retried after errors", runner.calls, runner.retries)
+
+
+def _write_sections(
+    writer: FrontmatterWriter | SidecarWriter,
+    recipe: Recipe,
+    sections: list[dict],
+    ingredients_hash: str,
+) -> None:
+    fm_data = parsed_to_frontmatter_format(sections)
+    writer.submit(
+        recipe.file_path,
+        {"parsed_ingredients": fm_data, "ingredients_hash": ingredients_hash},
+    )
+    total_items = sum(len(s["items"]) for s in fm_data)
+    logger.debug("OK: %s (%d ingredients)", recipe.name, total_items)
 
 
 def parse_all_ingredients(
     recipes: list[Recipe],
     cooking_path: Path,
     force: bool = False,
-    batch_size: int = 10,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
     max_workers: int = 4,
-) -> None:
-    """Parse ingredients for all recipes using Claude Haiku via CLI."""
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    from rich.progress import (
-        BarColumn,
-        MofNCompleteColumn,
-        Progress,
-        SpinnerColumn,
-        TextColumn,
-        TimeRemainingColumn,
-    )
-
+    use_api: bool = True,
+    rate: float = DEFAULT_RATE,
+    resume: bool = False,
+    retry_failed: bool = False,
+    max_attempts: int = MAX_ATTEMPTS,
+    sidecar: bool = False,
+    budget: int | None = None,
+    config: dict | None = None,
+    stats: ParseStats | None = None,
+) -> list[Path]:
+    """Parse ingredients for all recipes, locally first and with Haiku for the rest.
+
+    Every line goes through the local parser. Recipes whose lines all parse
+    confidently are written straight away; only the low-confidence lines
+    (deduplicated across recipes, packed into CLI calls of about
+    `batch_tokens` estimated tokens, see BatchBudget) are sent to Haiku,
+    at most `max_workers` calls at a time and `rate` new calls per second.
+    With use_api=False those lines are written as they stand, the whole line
+    as the item, with a hash that makes a later Haiku run revisit them.
+
+    Haiku's answers are kept per line in the line cache (see line_cache.py),
+    so a line is only ever sent once, across recipes, runs and --force.
+    Each stored section carries a hash of its lines; when a recipe changes,
+    sections whose hash still matches are taken from its stored parse
+    unchanged, except with force or resume.
+
+    Recipes sent to Haiku are tracked in the index journal (see
+    index_journal.py). resume=True parses only the recipes an earlier run
+    left pending or failed, retry_failed=True only the failed ones; other
+    runs skip recipes that failed `max_attempts` times in a row.
+
+    Results go into each recipe's frontmatter, or with sidecar=True into
+    the sidecar ingredient store (see ingredient_store.py). Returns the
+    paths of the recipes written; counters go into `stats` if given.
+
+    Recipes are parsed in parse_priority order under `config` (the meal
+    preferences, defaults if None): planner candidates first, then by
+    rating. With `budget`, only that many of the recipes that need Haiku
+    are sent, the most valuable ones; the rest wait for a later run.
+    Recipes the local parser and line cache cover are always written.
+    """
+    if stats is None:
+        stats = ParseStats()
+    journal = load_journal(cooking_path)
     need_parsing: list[Recipe] = []
+    gave_up = 0
 
     for recipe in recipes:
         if not recipe.raw_ingredients:
             continue
+        stats.with_ingredients += 1
 
         current_hash = compute_ingredients_hash(recipe.raw_ingredients)
 
-        if (
-            not force
-            and recipe.ingredients_hash == current_hash
-            and recipe.parsed_ingredients
-        ):
-            logger.debug("SKIP (hash match): %s", recipe.name)
-            continue
-
-        recipe._pending_hash = current_hash  # type: ignore[attr-defined]
+        if resume or retry_failed:
+            entry = journal.get(recipe.file_path)
+            wanted = (FAILED,) if retry_failed else (PENDING, FAILED)
+            if entry is None or entry.status not in wanted:
+                continue
+            if resume and journal.gave_up(recipe.file_path, current_hash, max_attempts):
+                gave_up += 1
+                continue
+        else:
+            up_to_date = recipe.ingredients_hash == current_hash or (
+                not use_api and recipe.ingredients_hash == LOCAL_HASH_PREFIX + current_hash
+            )
+            if not force and up_to_date and recipe.parsed_ingredients:
+                logger.debug("SKIP (hash match): %s", recipe.name)
+                continue
+            if use_api and journal.gave_up(recipe.file_path, current_hash, max_attempts):
+                logger.debug("SKIP (failed %d times): %s", max_attempts, recipe.name)
+                gave_up += 1
+                continue
+
+        recipe.pending_hash = current_hash
         need_parsing.append(recipe)
 
+    if gave_up:
+        logger.warning(
+            "Skipping %d recipes that failed %d times in a row; use --retry-failed to retry",
+            gave_up,
+            max_attempts,
+        )
     if not need_parsing:
-        logger.info("All recipes already parsed. Use --force to re-parse.")
-        return
+        if resume or retry_failed:
+            logger.info("Nothing to resume in the index journal.")
+        else:
+            logger.info("All recipes already parsed. Use --force to re-parse.")
+        journal.close()
+        return []
+
+    # Stable sort, so equally valuable recipes keep their file order
+    prefs = config if config is not None else DEFAULTS
+    need_parsing.sort(key=lambda recipe: parse_priority(recipe, prefs), reverse=True)
+    stats.recipes = len(need_parsing)
+    cache = load_line_cache(cooking_path)
+    writer = SidecarWriter(cooking_path) if sidecar else FrontmatterWriter()
+    try:
+        _parse_needed(
+            recipes,
+            need_parsing,
+            cache,
+            journal,
+            writer,
+            stats,
+            batch_tokens,
+            max_workers,
+            rate,
+            use_api,
+            budget,
+            # A resumed run may be finishing an interrupted --force run
+            not (force or resume),
+        )
+    finally:
+        # Wait for queued notes to be written before anything re-reads them
+        writer.close()
+        hashes = {recipe.file_path: recipe.pending_hash for recipe in need_parsing}
+        for path in writer.failed:
+            journal.record(path, hashes[path], FAILED)
+        cache.close()
+        journal.close()
+    return writer.written
+
+
+def _reusable_sections(
+    recipe: Recipe, lines: list[IngredientLine], use_api: bool
+) -> tuple[dict[int, dict], set[int]]:
+    """Sections of the stored parse whose lines have not changed.
+
+    Returns the reusable sections keyed by position in group_sections(lines),
+    as assemble_sections takes them, and the indices of the lines they
+    cover. Local best guesses are not reused when Haiku is available.
+    """
+    if use_api and (recipe.ingredients_hash or "").startswith(LOCAL_HASH_PREFIX):
+        return {}, set()
+    stored = {section.hash: section for section in recipe.parsed_ingredients if section.hash}
+    reused: dict[int, dict] = {}
+    covered: set[int] = set()
+    if not stored:
+        return reused, covered
+
+    start = 0
+    for n, run in enumerate(group_sections(lines)):
+        section = stored.get(section_hash(run))
+        if section is not None:
+            reused[n] = {
+                "section": section.section,
+                "hash": section.hash,
+                "items": [
+                    {"qty": i.qty, "unit": i.unit, "item": i.item, "notes": i.notes}
+                    for i in section.items
+                ],
+            }
+            covered.update(range(start, start + len(run)))
+        start += len(run)
+    return reused, covered
+
+
+def _cached_entries(
+    lines: list[IngredientLine], cache: LineCache, covered: set[int]
+) -> list[dict | None] | None:
+    """Entries for `lines`, with uncertain ones from the line cache.
+
+    Lines in `covered` (reused sections) get no entry. Returns None if any
+    other uncertain line has not been seen before.
+    """
+    entries: list[dict | None] = []
+    for i, line in enumerate(lines):
+        if i in covered:
+            entries.append(None)
+        elif line.confident:
+            entries.append(line.entry)
+        elif line.text in cache:
+            entries.append(cache.get(line.text))
+        else:
+            return None
+    return entries
+
 
-    logger.info("Parsing %d recipes with Haiku...", len(need_parsing))
+def _parse_needed(
+    recipes: list[Recipe],
+    need_parsing: list[Recipe],
+    cache: LineCache,
+    journal: IndexJournal,
+    writer: FrontmatterWriter | SidecarWriter,
+    stats: ParseStats,
+    batch_tokens: int,
+    max_workers: int,
+    rate: float,
+    use_api: bool,
+    budget: int | None,
+    reuse: bool,
+) -> None:
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TimeRemainingColumn,
+    )
+
+    from meal_planner.log import get_stderr_console
+
+    # Local pass: write recipes whose lines are all confident, cached or in
+    # unchanged sections of their stored parse, and collect the lines Haiku
+    # has never seen
+    local_count = 0
+    waiting: list[tuple[Recipe, list[IngredientLine], dict[int, dict], set[int]]] = []
+    for recipe in need_parsing:
+        lines = parse_ingredient_lines(recipe.raw_ingredients)
+        reused, covered = _reusable_sections(recipe, lines, use_api) if reuse else ({}, set())
+        stats.sections_reused += len(reused)
+        entries = _cached_entries(lines, cache, covered)
+        if entries is not None:
+            _write_sections(
+                writer, recipe, assemble_sections(lines, entries, reused), recipe.pending_hash
+            )
+            journal.record(recipe.file_path, recipe.pending_hash, OK)
+            local_count += 1
+        elif not use_api:
+            entries = [
+                line.entry if line.confident
+                else cache.get(line.text) if line.text in cache
+                else line.raw_entry()
+                for line in lines
+            ]
+            _write_sections(
+                writer,
+                recipe,
+                assemble_sections(lines, entries, reused),
+                LOCAL_HASH_PREFIX + recipe.pending_hash,
+            )
+            local_count += 1
+        else:
+            waiting.append((recipe, lines, reused, covered))
+
+    logger.info(
+        "Parsed %d recipes locally, %d need Haiku for some lines",
+        local_count,
+        len(waiting),
+    )
+    stats.local = stats.parsed = local_count
+    if budget is not None and len(waiting) > budget:
+        # `waiting` is in priority order; the rest wait for a later run
+        keep = max(budget, 0)
+        stats.deferred = len(waiting) - keep
+        logger.info(
+            "Budget: parsing the %d most valuable of %d recipes that need Haiku; "
+            "run again for the rest",
+            keep,
+            len(waiting),
+        )
+        waiting = waiting[:keep]
+    if not waiting:
+        logger.info(
+            "Done: %d parsed, 0 errors, %d skipped (already parsed)",
+            local_count,
+            len(recipes) - len(need_parsing),
+        )
+        return
 
-    # Split into batches
-    batches: list[list[Recipe]] = []
-    for start in range(0, len(need_parsing), batch_size):
-        batches.append(need_parsing[start : start + batch_size])
+    # Each distinct uncertain line is sent once, whichever recipes share it;
+    # lines differing only in case or spacing count as the same line
+    pending: dict[int, set[str]] = {}
+    recipes_by_line: dict[str, list[int]] = {}
+    line_text: dict[str, str] = {}
+    for r, (recipe, lines, _, covered) in enumerate(waiting):
+        journal.record(recipe.file_path, recipe.pending_hash, PENDING)
+        keys = set()
+        for i, line in enumerate(lines):
+            if i in covered or line.confident or line.text in cache:
+                continue
+            key = normalize_line(line.text)
+            keys.add(key)
+            line_text.setdefault(key, line.text)
+        pending[r] = keys
+        for key in keys:
+            recipes_by_line.setdefault(key, []).append(r)
+
+    unique_keys = list(recipes_by_line)
+    logger.info(
+        "Sending %d new ingredient lines to Haiku (%d lines in cache)",
+        len(unique_keys),
+        len(cache),
+    )
+    stats.lines_sent = len(unique_keys)
+    queue = deque(unique_keys)
+    budget = BatchBudget(batch_tokens)
 
-    parsed_count = 0
+    failed: set[int] = set()
+    parsed_count = local_count
     error_count = 0
 
+    def finish(r: int) -> None:
+        nonlocal parsed_count, error_count
+        recipe, lines, reused, covered = waiting[r]
+        if r in failed:
+            error_count += 1
+            stats.failed = error_count
+            journal.record(recipe.file_path, recipe.pending_hash, FAILED)
+            logger.debug("FAILED: %s", recipe.name)
+            return
+        entries = _cached_entries(lines, cache, covered)
+        _write_sections(
+            writer, recipe, assemble_sections(lines, entries, reused), recipe.pending_hash
+        )
+        journal.record(recipe.file_path, recipe.pending_hash, OK)
+        parsed_count += 1
+        stats.parsed = parsed_count
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -289,50 +730,47 @@ def parse_all_ingredients(
         TextColumn("[green]{task.fields[ok]}[/green] ok"),
         TextColumn("[red]{task.fields[fail]}[/red] fail"),
         TimeRemainingColumn(),
-        console=stderr_console,
+        console=get_stderr_console(),
     ) as progress:
         task = progress.add_task(
-            "Parsing ingredients",
-            total=len(need_parsing),
+            "Parsing ingredient lines",
+            total=len(unique_keys),
             ok=0,
             fail=0,
         )
+        ok_lines = 0
+        failed_lines = 0
+
+        def apply(batch: list[str], outcome: BatchOutcome) -> None:
+            nonlocal ok_lines, failed_lines
+            for i, key in enumerate(batch):
+                if i in outcome.results:
+                    cache.add(line_text[key], outcome.results[i])
+                    ok_lines += 1
+                else:
+                    failed_lines += 1
+                    stats.lines_failed = failed_lines
+                    failed.update(recipes_by_line[key])
+
+                for r in recipes_by_line[key]:
+                    pending[r].discard(key)
+                    if not pending[r]:
+                        finish(r)
+                progress.update(task, advance=1, ok=ok_lines, fail=failed_lines)
+
+        async def fetch_all() -> None:
+            runner = ClaudeRunner(concurrency=max_workers, rate=rate)
+            await fetch_line_batches(runner, queue, line_text, budget, apply, stats)
 
-        # Submit all batches to thread pool
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_batch = {
-                executor.submit(_fetch_batch, batch): batch for batch in batches
-            }
-
-            for future in as_completed(future_to_batch):
-                batch = future_to_batch[future]
-                batch_results = future.result()
-
-                # Process each recipe in this batch
-                for i, recipe in enumerate(batch):
-                    sections = batch_results.get(i)
-
-                    # Fallback: parse individually if batch missed this recipe
-                    if sections is None:
-                        logger.debug(
-                            "Falling back to individual parse: %s", recipe.name
-                        )
-                        sections = call_haiku(recipe.raw_ingredients)
-
-                    if sections is None:
-                        error_count += 1
-                        logger.debug("FAILED: %s", recipe.name)
-                        progress.update(task, advance=1, fail=error_count)
-                        continue
-
-                    fm_data = parsed_to_frontmatter_format(sections)
-                    current_hash = recipe._pending_hash  # type: ignore[attr-defined]
-                    write_parsed_to_file(recipe.file_path, fm_data, current_hash)
-
-                    parsed_count += 1
-                    total_items = sum(len(s.get("items", [])) for s in sections)
-                    logger.debug("OK: %s (%d ingredients)", recipe.name, total_items)
-                    progress.update(task, advance=1, ok=parsed_count)
+        try:
+            asyncio.run(fetch_all())
+        except KeyboardInterrupt:
+            logger.warning(
+                "Interrupted: %d recipes written, %d lines cached for the next run",
+                parsed_count,
+                ok_lines,
+            )
+            raise
 
     logger.info(
         "Done: %d parsed, %d errors, %d skipped (already parsed)",
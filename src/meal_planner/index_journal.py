@@ -0,0 +1,190 @@
+"""Append-only journal of recipes sent to Haiku by `index`.
+
+Each record is `{"path", "hash", "status", "attempts"}`, one JSON object per
+line in `.meal-planner/index-journal.jsonl`; the last record for a path
+wins. Recipes are journaled as "pending" when their lines go to Haiku and
+as "ok" or "failed" when they are written or given up on, so a run that is
+killed part-way leaves behind exactly the recipes it had not finished.
+`index --resume` picks those up, `index --retry-failed` retries only the
+failures, and normal runs skip recipes that failed `max_attempts` times
+in a row with unchanged ingredients. Once `index` has saved the recipe
+index, the journal is compacted to the latest pending or failed record per
+path, so it only grows with the recipes still outstanding.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+from meal_planner.recipe_index import INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "index-journal.jsonl"
+MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+OK = "ok"
+FAILED = "failed"
+
+
+@dataclass(slots=True)
+class JournalEntry:
+    path: str
+    hash: str
+    status: str
+    attempts: int
+
+
+def journal_path(cooking_path: Path) -> Path:
+    """Location of the index journal for a cooking directory."""
+    return cooking_path / INDEX_DIR / JOURNAL_FILE
+
+
+class IndexJournal:
+    """Latest journal entry per recipe, appending each change to disk."""
+
+    def __init__(
+        self, cooking_path: Path, entries: dict[str, JournalEntry] | None = None
+    ) -> None:
+        self.cooking_path = cooking_path
+        self.path = journal_path(cooking_path)
+        self.entries: dict[str, JournalEntry] = entries if entries is not None else {}
+        self._file: TextIO | None = None
+
+    def key(self, file_path: Path) -> str:
+        """Journal key for a recipe file: its path relative to the cooking dir."""
+        try:
+            return file_path.relative_to(self.cooking_path).as_posix()
+        except ValueError:
+            return str(file_path)
+
+    def get(self, file_path: Path) -> JournalEntry | None:
+        return self.entries.get(self.key(file_path))
+
+    def record(self, file_path: Path, ingredients_hash: str, status: str) -> None:
+        """Journal a status change for a recipe.
+
+        Failures count consecutive attempts at the same ingredients hash.
+        "ok" is only journaled for recipes that have an entry, which keeps
+        the journal to recipes that needed Haiku.
+        """
+        key = self.key(file_path)
+        previous = self.entries.get(key)
+        if status == OK and (previous is None or previous.status == OK):
+            return
+
+        attempts = 0
+        if previous is not None and previous.hash == ingredients_hash:
+            attempts = previous.attempts
+        if status == FAILED:
+            attempts += 1
+        elif status == OK:
+            attempts = 0
+
+        entry = JournalEntry(key, ingredients_hash, status, attempts)
+        self.entries[key] = entry
+        record = {"path": key, "hash": ingredients_hash, "status": status, "attempts": attempts}
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+        except OSError as e:
+            logger.warning("Could not write index journal %s: %s", self.path, e)
+
+    def gave_up(self, file_path: Path, ingredients_hash: str, max_attempts: int) -> bool:
+        """Whether the recipe has failed `max_attempts` times with these ingredients."""
+        entry = self.get(file_path)
+        return (
+            entry is not None
+            and entry.status == FAILED
+            and entry.hash == ingredients_hash
+            and entry.attempts >= max_attempts
+        )
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_journal(path: Path) -> tuple[dict[str, JournalEntry], int]:
+    """Latest entry per path, and the number of records read."""
+    entries: dict[str, JournalEntry] = {}
+    records = 0
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            records += 1
+            try:
+                record = json.loads(raw)
+                entry = JournalEntry(
+                    record["path"], record["hash"], record["status"], int(record["attempts"])
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                logger.debug("Skipping bad journal record: %r", raw[:80])
+                continue
+            entries[entry.path] = entry
+    return entries, records
+
+
+def load_journal(cooking_path: Path) -> IndexJournal:
+    """Load the index journal, skipping records a crash may have cut short."""
+    path = journal_path(cooking_path)
+    entries: dict[str, JournalEntry] = {}
+    try:
+        entries, _ = _read_journal(path)
+    except FileNotFoundError:
+        pass
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning("Could not read index journal %s: %s", path, e)
+    return IndexJournal(cooking_path, entries)
+
+
+def compact_journal(cooking_path: Path) -> int:
+    """Rewrite the journal with only the latest record per unfinished recipe.
+
+    "ok" records are dropped: a recipe without an entry is treated the same.
+    Returns the number of records dropped; the journal is left alone if
+    there are none or it cannot be read or rewritten (logged as a warning).
+    """
+    path = journal_path(cooking_path)
+    try:
+        entries, records = _read_journal(path)
+    except FileNotFoundError:
+        return 0
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning("Could not read index journal %s: %s", path, e)
+        return 0
+    kept = [entry for entry in entries.values() if entry.status != OK]
+    dropped = records - len(kept)
+    if dropped <= 0:
+        return 0
+
+    tmp = path.with_suffix(".jsonl.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in kept:
+                record = {
+                    "path": entry.path,
+                    "hash": entry.hash,
+                    "status": entry.status,
+                    "attempts": entry.attempts,
+                }
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not compact index journal %s: %s", path, e)
+        if tmp.is_file():
+            tmp.unlink()
+        return 0
+    logger.debug("Compacted index journal: dropped %d records", dropped)
+    return dropped
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import codecs
+import functools
 import hashlib
 import json
 import logging
+import os
 import re
+import sys
 from pathlib import Path
+from typing import BinaryIO
 
-import frontmatter
-
+from meal_planner.markdown_sections import find_section, split_sections
 from meal_planner.models import (
     IngredientSection,
     ParsedIngredient,
@@ -19,6 +23,24 @@ from meal_planner.models import (
 logger = logging.getLogger(__name__)
 
 
+@functools.cache
+def _yaml_loader() -> type:
+    """libyaml's C loader is several times faster; fall back to pure Python.
+
+    yaml is imported on first use: commands answered from the persistent
+    index never parse frontmatter and should not pay for the import.
+    """
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+FRONTMATTER_FENCE = b"---"
+
+# Below this many files, process startup costs more than it saves
+PARALLEL_MIN_FILES = 32
+
+
 def normalize_servings(raw: str | int | float | None) -> int | None:
     """Parse varied servings formats into an integer.
 
@@ -98,31 +120,76 @@ def extract_ingredients_section(content: str) -> str | None:
     Looks for ## Ingredients or ### Ingredients and captures everything
     until the next heading of equal or higher level.
     """
-    lines = content.split("\n")
-    in_section = False
-    section_level = 0
-    result: list[str] = []
-
-    for line in lines:
-        # Check for ingredients heading
-        m = re.match(r"^(#{2,3})\s+Ingredients", line, re.IGNORECASE)
-        if m and not in_section:
-            in_section = True
-            section_level = len(m.group(1))
-            continue
+    return find_section(split_sections(content), "ingredients")
+
 
-        if in_section:
-            # Check if we hit another heading at same or higher level
-            heading_match = re.match(r"^(#{1,%d})\s+" % section_level, line)
-            if heading_match:
-                break
-            result.append(line)
+def read_header_lines(f: BinaryIO) -> list[bytes] | None:
+    """Consume the frontmatter block from a binary file positioned at the start.
 
-    if not result:
+    Returns the YAML lines between the fences and leaves the file positioned
+    at the start of the body. Returns None (rewound to the start) if the file
+    has no terminated frontmatter block.
+    """
+    first = f.readline()
+    if first.startswith(codecs.BOM_UTF8):
+        first = first[len(codecs.BOM_UTF8) :]
+    if first.rstrip() != FRONTMATTER_FENCE:
+        f.seek(0)
         return None
 
-    text = "\n".join(result).strip()
-    return text if text else None
+    lines: list[bytes] = []
+    while True:
+        line = f.readline()
+        if not line:
+            f.seek(0)
+            return None
+        if line.rstrip() == FRONTMATTER_FENCE:
+            return lines
+        lines.append(line)
+
+
+def read_frontmatter(file_path: Path) -> dict:
+    """Read and parse only the YAML frontmatter of a markdown file.
+
+    Stops at the closing fence, so long recipe bodies are never read.
+    Returns {} for files without a frontmatter mapping.
+    """
+    with open(file_path, "rb") as f:
+        lines = read_header_lines(f)
+    if not lines:
+        return {}
+    import yaml
+
+    meta = yaml.load(b"".join(lines).decode("utf-8"), Loader=_yaml_loader())
+    return meta if isinstance(meta, dict) else {}
+
+
+def read_body(file_path: Path) -> str:
+    """Read the markdown body that follows the frontmatter block."""
+    with open(file_path, "rb") as f:
+        read_header_lines(f)
+        return f.read().decode("utf-8")
+
+
+def read_recipe_sections(file_path: Path) -> dict[str, str]:
+    """Read the body sections of a recipe file, keyed by lowercased heading."""
+    try:
+        body = read_body(file_path)
+    except (OSError, UnicodeDecodeError):
+        return {}
+
+    return split_sections(body)
+
+
+def has_ingredients(recipe: Recipe) -> bool:
+    """Whether the recipe has ingredient text, without keeping its body.
+
+    Uses the sections already loaded on the recipe if any; otherwise reads
+    the body and lets it go, so the recipe stays frontmatter-only.
+    """
+    if recipe.sections is not None:
+        return bool(recipe.raw_ingredients)
+    return bool(find_section(read_recipe_sections(recipe.file_path), "ingredients"))
 
 
 def compute_ingredients_hash(raw_ingredients: str) -> str:
@@ -132,21 +199,63 @@ def compute_ingredients_hash(raw_ingredients: str) -> str:
 
 
 def parse_recipe_file(file_path: Path) -> Recipe | None:
-    """Parse a single recipe markdown file into a Recipe object."""
+    """Parse a single recipe markdown file into a Recipe object.
+
+    Only the frontmatter is read; body sections such as the raw ingredient
+    text are loaded lazily through Recipe.load_sections(). If the cooking
+    directory has a sidecar ingredient store, the recipe is joined against it.
+    """
     try:
-        post = frontmatter.load(file_path)
+        meta = read_frontmatter(file_path)
+        if meta.get("type") == "recipe":
+            join_ingredient_store(meta, file_path)
     except Exception:
         return None
 
-    meta = post.metadata
+    return recipe_from_frontmatter(meta, file_path)
+
+
+def join_ingredient_store(meta: dict, file_path: Path) -> None:
+    """Fill in parsed ingredients from the sidecar store, if it has them.
+
+    The store (see ingredient_store.py) is keyed by the hash of the recipe's
+    current ingredient text, so an entry always wins over what the
+    frontmatter holds. A note the store was written for and that has not
+    changed since is joined on its recorded hash; otherwise the body is read
+    to hash the ingredient text. Without a store, the body is not read.
+    """
+    from meal_planner.ingredient_store import load_store
+
+    store = load_store(file_path.parent)
+    if store is None or not store[0]:
+        return
+    entries, files = store
+    known = files.get(str(file_path))
+    st = file_path.stat()
+    if known is not None and known[1] == (st.st_mtime_ns, st.st_size):
+        key = known[0]
+    else:
+        raw = find_section(read_recipe_sections(file_path), "ingredients")
+        if not raw:
+            return
+        key = compute_ingredients_hash(raw)
+    entry = entries.get(key)
+    if entry is not None:
+        meta["parsed_ingredients"] = entry["parsed_ingredients"]
+        meta["ingredients_hash"] = entry["ingredients_hash"]
+
+
+def recipe_from_frontmatter(meta: dict, file_path: Path) -> Recipe | None:
+    """Build a Recipe from parsed frontmatter, or None if it is not a recipe.
+
+    Repeated vocabulary (meal types, cuisines, tags, units, item names) is
+    interned so that recipes share one copy of each string.
+    """
     if meta.get("type") != "recipe":
         return None
 
     name = file_path.stem
 
-    # Extract raw ingredients from body
-    raw_ingredients = extract_ingredients_section(post.content)
-
     # Parse existing parsed_ingredients from frontmatter if present
     parsed_ingredients: list[IngredientSection] = []
     if "parsed_ingredients" in meta and meta["parsed_ingredients"]:
@@ -166,6 +275,7 @@ def parse_recipe_file(file_path: Path) -> Recipe | None:
                     IngredientSection(
                         section=section_data.get("section"),
                         items=items,
+                        hash=section_data.get("hash"),
                     )
                 )
 
@@ -188,7 +298,7 @@ def parse_recipe_file(file_path: Path) -> Recipe | None:
     if isinstance(categories, str):
         categories = [c.strip() for c in categories.split(",")]
 
-    return Recipe(
+    recipe = Recipe(
         name=name,
         file_path=file_path,
         calories=_to_float(meta.get("calories")),
@@ -213,8 +323,34 @@ def parse_recipe_file(file_path: Path) -> Recipe | None:
         last_made=_to_str(meta.get("last_made")),
         parsed_ingredients=parsed_ingredients,
         ingredients_hash=meta.get("ingredients_hash"),
-        raw_ingredients=raw_ingredients,
     )
+    return intern_recipe_strings(recipe)
+
+
+def _intern(val: object) -> object:
+    return sys.intern(val) if type(val) is str else val
+
+
+def intern_recipe_strings(recipe: Recipe) -> Recipe:
+    """Intern a recipe's repeated vocabulary strings in place and return it.
+
+    Strings are interned per process, so recipes parsed in worker processes
+    are interned again once they reach the parent.
+    """
+    recipe.meal_type = _intern(recipe.meal_type)
+    recipe.cuisine = _intern(recipe.cuisine)
+    recipe.main_ingredient = _intern(recipe.main_ingredient)
+    recipe.cooking_method = _intern(recipe.cooking_method)
+    if isinstance(recipe.dietary_tags, list):
+        recipe.dietary_tags = [_intern(t) for t in recipe.dietary_tags]
+    if isinstance(recipe.categories, list):
+        recipe.categories = [_intern(c) for c in recipe.categories]
+    for section in recipe.parsed_ingredients:
+        section.section = _intern(section.section)
+        for item in section.items:
+            item.unit = _intern(item.unit)
+            item.item = _intern(item.item)
+    return recipe
 
 
 def _to_float(val: object) -> float | None:
@@ -232,9 +368,36 @@ def _to_str(val: object) -> str | None:
     return str(val).strip()
 
 
+def parse_recipe_files(files: list[Path], jobs: int = 1) -> list[Recipe | None]:
+    """Parse many recipe files, spreading the work across processes if jobs > 1.
+
+    Files are handed to workers in chunks; results are returned in the same
+    order as `files`, with None for non-recipes and parse errors.
+    """
+    if jobs <= 1 or len(files) < PARALLEL_MIN_FILES:
+        return [parse_recipe_file(f) for f in files]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = min(jobs, len(files))
+    # A few chunks per worker keeps them busy without per-file IPC overhead
+    chunksize = max(1, len(files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return [
+            intern_recipe_strings(r) if r is not None else None
+            for r in executor.map(parse_recipe_file, files, chunksize=chunksize)
+        ]
+
+
 def discover_recipe_files(cooking_path: Path, limit: int | None = None) -> list[Path]:
     """Find all .md files in the cooking directory."""
-    files = sorted(cooking_path.glob("*.md"))
+    # A plain listdir is several times faster than Path.glob and this runs
+    # at the start of every command; sorting names gives the same order
+    try:
+        names = sorted(n for n in os.listdir(cooking_path) if n.endswith(".md"))
+    except FileNotFoundError:
+        return []
+    files = [cooking_path / n for n in names]
     if limit:
         files = files[:limit]
     return files
@@ -247,10 +410,40 @@ def run_index(
     force: bool = False,
     skip_api: bool = False,
     max_workers: int = 4,
+    rate: float = 2.0,
+    batch_tokens: int = 2000,
+    resume: bool = False,
+    retry_failed: bool = False,
+    max_attempts: int = 3,
+    sidecar: bool = False,
+    budget: int | None = None,
+    verify: bool = False,
+    vault_path: Path | None = None,
+    jobs: int = 1,
+    catalog: bool = False,
+    watch: bool = False,
+    interval: float = 2.0,
 ) -> None:
-    """Run the index command."""
+    """Run the index command.
+
+    Ingredient parsing is prioritized by the meal preferences in
+    `vault_path` (defaults if None); `budget` caps how many recipes are
+    sent to Haiku. With verify=True, stored parses are also cross-checked
+    against the local parser and only disagreeing lines re-sent (see
+    parse_verify.py), instead of re-parsing everything as force does.
+    With watch=True, keep running afterwards and apply file changes to the
+    index, catalog and nutrition snapshot as they happen.
+    """
+    from meal_planner.recipe_index import load_recipe_index
+
     files = discover_recipe_files(cooking_path, limit=limit)
 
+    # Refresh the persistent index so later commands start from a warm cache
+    index = load_recipe_index(cooking_path)
+    index.refresh(files, prune=limit is None, jobs=jobs)
+    if not dry_run:
+        index.save()
+
     stats = {
         "total_files": len(files),
         "parsed_ok": 0,
@@ -265,7 +458,7 @@ def run_index(
     recipes: list[Recipe] = []
 
     for f in files:
-        recipe = parse_recipe_file(f)
+        recipe = index.get(f)
         if recipe is None:
             stats["parse_errors"] += 1
             logger.debug("SKIP (not a recipe or parse error): %s", f.name)
@@ -274,7 +467,8 @@ def run_index(
         stats["parsed_ok"] += 1
         recipes.append(recipe)
 
-        if recipe.raw_ingredients:
+        # Ingredient text is only counted once parsing reads the bodies
+        if dry_run and has_ingredients(recipe):
             stats["with_ingredients"] += 1
         if recipe.calories is not None and recipe.protein_g is not None:
             stats["with_nutrition"] += 1
@@ -286,27 +480,98 @@ def run_index(
             stats["servings_unparseable"] += 1
 
         logger.debug(
-            "%s: servings=%s cal=%s protein=%s time=%smin ingredients=%s",
+            "%s: servings=%s cal=%s protein=%s time=%smin",
             recipe.name,
             recipe.servings,
             recipe.calories,
             recipe.protein_g,
             recipe.total_time_min,
-            "yes" if recipe.raw_ingredients else "no",
         )
 
     if dry_run:
         print(json.dumps(stats, indent=2))
         return
 
-    # If not dry_run and not skip_api, we'll do Haiku parsing (Task 2)
-    if not skip_api:
-        from meal_planner.haiku_parser import parse_all_ingredients
-
-        parse_all_ingredients(
-            recipes, cooking_path, force=force, max_workers=max_workers
+    # Parse ingredient lines locally, with Haiku for the ones the local
+    # parser is unsure of (or local guesses only with --skip-api)
+    from meal_planner.config import load_config
+    from meal_planner.haiku_parser import ParseStats, parse_all_ingredients
+
+    parse_stats = ParseStats()
+    written = parse_all_ingredients(
+        recipes,
+        cooking_path,
+        force=force and not verify,
+        max_workers=max_workers,
+        rate=rate,
+        batch_tokens=batch_tokens,
+        use_api=not skip_api,
+        resume=resume,
+        retry_failed=retry_failed,
+        max_attempts=max_attempts,
+        sidecar=sidecar,
+        budget=budget,
+        config=load_config(vault_path) if vault_path is not None else None,
+        stats=parse_stats,
+    )
+    stats["with_ingredients"] = parse_stats.with_ingredients
+    if verify:
+        from meal_planner.parse_verify import VerifyStats, verify_ingredients
+
+        # Recipes just parsed are up to date with the local parser already
+        just_written = set(written)
+        verify_stats = VerifyStats()
+        written += verify_ingredients(
+            [r for r in recipes if r.file_path not in just_written],
+            cooking_path,
+            batch_tokens=batch_tokens,
+            max_workers=max_workers,
+            rate=rate,
+            use_api=not skip_api,
+            sidecar=sidecar,
+            stats=verify_stats,
         )
-    else:
-        logger.info("Skipping API parsing (--skip-api)")
+        stats["verify"] = verify_stats.to_dict()
+
+    # The sidecar store is append-only; keep the latest record per hash
+    from meal_planner.ingredient_store import compact_store, store_path
+
+    if sidecar or store_path(cooking_path).exists():
+        compact_store(cooking_path)
+
+    # Parsing writes results back into the notes; pick those edits up. The
+    # sidecar store leaves the notes untouched, so re-read those recipes
+    # explicitly to join them against it.
+    stale = written if sidecar else []
+    index.invalidate(stale)
+    index.refresh(files, prune=limit is None, jobs=jobs)
+    index.save()
+
+    # With the results saved, the journal only needs unfinished recipes
+    from meal_planner.index_journal import compact_journal
+
+    compact_journal(cooking_path)
+
+    # Build the SQLite catalog on request, and keep an existing one in sync
+    from meal_planner.catalog import catalog_path, open_catalog
+
+    if catalog or catalog_path(cooking_path).exists():
+        open_catalog(
+            cooking_path, jobs=jobs, create=True, index=index, invalidate=stale
+        ).close()
+
+    # Columnar nutrition snapshot for the scorer and the solver
+    from meal_planner.nutrition_snapshot import snapshot_path, write_snapshot
+
+    if limit is None:
+        try:
+            write_snapshot(snapshot_path(cooking_path), index, files)
+        except OSError as e:
+            logger.warning("Could not write nutrition snapshot: %s", e)
 
     print(json.dumps(stats, indent=2))
+
+    if watch:
+        from meal_planner.watcher import watch_recipes
+
+        watch_recipes(cooking_path, interval=interval, jobs=jobs)
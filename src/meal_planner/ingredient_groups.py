@@ -80,6 +80,20 @@ def normalize_ingredient_group(main_ingredient: str | None) -> str | None:
     return INGREDIENT_GROUP_MAP.get(main_ingredient.lower().strip())
 
 
+def ingredient_group_key(main_ingredient: str | None) -> str | None:
+    """Key shared by recipes in the same ingredient group, or None if ungrouped.
+
+    Named groups give "group:<name>"; unmapped ingredients give
+    "raw:<lowered value>".
+    """
+    group = normalize_ingredient_group(main_ingredient)
+    if group is not None:
+        return f"group:{group}"
+    if main_ingredient is not None:
+        return f"raw:{main_ingredient.lower().strip()}"
+    return None
+
+
 def build_ingredient_group_table(
     candidates: list[Recipe],
 ) -> tuple[list[int], int, dict[str, int]]:
@@ -101,16 +115,8 @@ def build_ingredient_group_table(
 
     group_ids: list[int] = []
     for recipe in candidates:
-        group = normalize_ingredient_group(recipe.main_ingredient)
-        if group is not None:
-            # Named group
-            key = f"group:{group}"
-        elif recipe.main_ingredient is not None:
-            # Unmapped but present — group by raw value
-            key = f"raw:{recipe.main_ingredient.lower().strip()}"
-        else:
-            # None — unique per recipe
-            key = f"none:{next_id}"
+        # None — unique per recipe
+        key = ingredient_group_key(recipe.main_ingredient) or f"none:{next_id}"
 
         if key not in group_key_to_id:
             group_key_to_id[key] = next_id
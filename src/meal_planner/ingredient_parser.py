@@ -0,0 +1,334 @@
+"""Deterministic local ingredient-line parser.
+
+Produces the same `{section, items: [{qty, unit, item, notes}]}` structure as
+the Haiku parser, without any subprocess or network calls. Every line gets a
+best-effort parse plus a `confident` flag; only lines the rules cannot handle
+with confidence (e.g. "Juice from 1/2 of a lemon", "1 cup + 2 tbsp flour")
+need to be sent to Haiku.
+
+Each section also carries a hash of its lines, so that a later parse can
+reuse the sections of a stored result whose text has not changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+UNICODE_FRACTIONS = {
+    "¼": 0.25, "½": 0.5, "¾": 0.75, "⅐": 1 / 7, "⅑": 1 / 9, "⅒": 0.1,
+    "⅓": 1 / 3, "⅔": 2 / 3, "⅕": 0.2, "⅖": 0.4, "⅗": 0.6, "⅘": 0.8,
+    "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 0.125, "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+
+# Recognized units, matched case-insensitively without a trailing period.
+# The unit is kept as written (e.g. "cups"); shopping.normalize_unit folds
+# spellings together, as it does for Haiku output.
+UNITS = frozenset(
+    """
+    tsp tsps teaspoon teaspoons tbsp tbsps tbs tbl tblsp tablespoon tablespoons
+    cup cups c ml milliliter milliliters millilitre millilitres l liter liters
+    litre litres dl pint pints pt quart quarts qt gallon gallons gal
+    g gram grams gr kg kilogram kilograms mg oz ounce ounces lb lbs pound pounds
+    clove cloves can cans tin tins jar jars bottle bottles package packages pkg
+    packet packets bag bags box boxes bunch bunches sprig sprigs stalk stalks
+    head heads slice slices piece pieces pinch pinches dash dashes handful
+    handfuls stick sticks sheet sheets fillet fillets strip strips leaf leaves
+    ear ears drop drops scoop scoops container containers envelope envelopes
+    block blocks cube cubes knob knobs
+    """.split()
+)
+# Case matters for these: "1 T sugar" is a tablespoon, "1 t salt" a teaspoon
+CASED_UNITS = {"T": "tbsp", "Tbsp": "tbsp", "t": "tsp"}
+# Units that take "of" without a number ("Pinch of salt", "a handful of herbs")
+COUNTLESS_UNITS = frozenset({"pinch", "dash", "handful", "sprig", "splash", "drizzle"})
+# Words standing in for a number ("a few sprigs thyme", "some salt"); no quantity to read
+VAGUE_QUANTITIES = frozenset({"few", "some", "several", "couple", "little", "bit", "bunch"})
+SIZE_WORDS = frozenset(
+    {"small", "medium", "large", "extra-large", "heaping", "heaped", "level", "scant", "generous"}
+)
+# Trailing phrases that are notes rather than part of the item name
+TRAILING_NOTES = (
+    "to taste", "for garnish", "for serving", "for topping", "as needed",
+    "optional", "divided", "or more", "or to taste",
+)
+# Items longer than this are usually sentences the rules misread
+MAX_ITEM_WORDS = 8
+
+_FRACTION_CHARS = "".join(UNICODE_FRACTIONS)
+_NUMBER = rf"(?:\d+\s*[{_FRACTION_CHARS}]|\d+\s+\d+/\d+|\d+/\d+|[{_FRACTION_CHARS}]|\d+(?:\.\d+)?)"
+_QTY_RE = re.compile(
+    rf"^(?P<lo>{_NUMBER})(?:\s*(?:-|–|—|to|or)\s*(?P<hi>{_NUMBER}))?(?=[\s(]|[a-zA-Z]|$)"
+)
+_LIST_MARKER_RE = re.compile(r"^(?:[-*+•]|\d+[.)])(?=\s)\s*(?:\[[ xX]\]\s*)?")
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+)$")
+_BOLD_RE = re.compile(r"^(\*\*|__)(.+?)\1:?$")
+_PAREN_RE = re.compile(r"\s*\(([^()]*)\)")
+_LINK_RE = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]|\[([^\]]*)\]\([^)]*\)")
+_OPTIONAL_RE = re.compile(r"^[*_(\s]*optional[*_):\s]*$", re.IGNORECASE)
+_DIGIT_RE = re.compile(r"\d|[" + _FRACTION_CHARS + "]")
+
+
+@dataclass(slots=True)
+class IngredientLine:
+    """One ingredient line with its local parse."""
+
+    text: str  # the line as written, without list marker
+    section: str | None  # header the line falls under
+    entry: dict  # {"qty", "unit", "item", "notes"} as parsed_to_frontmatter_format expects
+    confident: bool
+
+    def raw_entry(self) -> dict:
+        """The line kept as written, for when its local parse is only a guess."""
+        item = " ".join(_strip_markup(self.text).split())
+        return {"qty": None, "unit": None, "item": item, "notes": None}
+
+
+def parse_quantity(text: str) -> float | None:
+    """Parse "2", "1.5", "1/2", "1 1/2", "½" or "1½" into a float."""
+    text = text.strip()
+    total = 0.0
+    for char, value in UNICODE_FRACTIONS.items():
+        if char in text:
+            total += value
+            text = text.replace(char, "").strip()
+    if not text:
+        return total
+    parts = text.split()
+    try:
+        for part in parts:
+            if "/" in part:
+                num, den = part.split("/")
+                total += int(num) / int(den)
+            else:
+                total += float(part)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return total
+
+
+def _clean_qty(value: float) -> float | int:
+    return int(value) if value == int(value) else round(value, 3)
+
+
+def _section_name(line: str) -> str | None:
+    """Return the section name if `line` is a section header, else None."""
+    m = _HEADING_RE.match(line)
+    if m:
+        name = m.group(1)
+    else:
+        m = _BOLD_RE.match(line)
+        if m:
+            name = m.group(2)
+        elif line.endswith(":") and not _DIGIT_RE.match(line):
+            name = line[:-1]
+            if len(name.split()) > 6:
+                return None
+        else:
+            return None
+
+    name = name.strip().strip("*_").rstrip(":").strip()
+    name = _PAREN_RE.sub("", name).strip()
+    name = re.sub(r"^for\s+(?:the\s+)?", "", name, flags=re.IGNORECASE)
+    if not name or _DIGIT_RE.match(name):
+        # "**2 cups flour**" is an emphasized ingredient, not a header
+        return None
+    return name
+
+
+def _strip_markup(text: str) -> str:
+    text = _LINK_RE.sub(lambda m: m.group(1) or m.group(2) or "", text)
+    return text.replace("**", "").replace("__", "").replace("*", "")
+
+
+def _split_notes(text: str) -> tuple[str, list[str]]:
+    """Separate "item, notes (more notes)" into the item and its notes."""
+    notes = [n.strip() for n in _PAREN_RE.findall(text) if n.strip()]
+    text = _PAREN_RE.sub("", text)
+    if "," in text:
+        text, rest = text.split(",", 1)
+        if rest.strip():
+            notes.append(rest.strip())
+    lowered = text.lower().rstrip()
+    for phrase in TRAILING_NOTES:
+        if lowered.endswith(" " + phrase):
+            text = text[: len(lowered) - len(phrase)]
+            notes.insert(0, phrase)
+            break
+    return text.strip(" .;-"), notes
+
+
+def _take_unit(words: list[str]) -> tuple[str | None, list[str]]:
+    """Pop a unit (and a following "of") off the front of `words`."""
+    if not words:
+        return None, words
+    first = words[0]
+    if first in CASED_UNITS:
+        unit: str | None = CASED_UNITS[first]
+        rest = words[1:]
+    elif first.lower() in ("fl", "fl.", "fluid") and len(words) > 1 and words[1].lower().rstrip(".") in ("oz", "ounce", "ounces"):
+        unit, rest = "fl oz", words[2:]
+    elif first.lower().rstrip(".") in UNITS:
+        unit, rest = first.lower().rstrip("."), words[1:]
+    else:
+        return None, words
+    if rest and rest[0].lower() == "of":
+        rest = rest[1:]
+    return unit, rest
+
+
+def parse_ingredient_line(text: str, section: str | None = None) -> IngredientLine:
+    """Parse a single ingredient line (without list marker)."""
+    body = _strip_markup(text).replace("\u2044", "/").strip()
+    confident = True
+    qty: float | None = None
+    notes: list[str] = []
+
+    m = _QTY_RE.match(body)
+    if m:
+        lo = parse_quantity(m.group("lo"))
+        hi = parse_quantity(m.group("hi")) if m.group("hi") else None
+        if hi is not None and lo is not None and hi < lo and hi < 1:
+            # "1-1/2 cups" is a mixed number, not a range
+            qty = lo + hi
+        else:
+            # Ranges buy for the upper bound
+            qty = hi if hi is not None else lo
+        rest = body[m.end():].strip()
+        if qty is None:
+            confident = False
+    else:
+        rest = body
+        if _DIGIT_RE.match(body):
+            confident = False
+
+    # Sizes directly after the quantity: "1 (13.5 oz) can", "2 large eggs"
+    while True:
+        paren = re.match(r"^\(([^()]*)\)\s*", rest)
+        if paren:
+            if paren.group(1).strip():
+                notes.append(paren.group(1).strip())
+            rest = rest[paren.end():]
+            continue
+        words = rest.split(" ", 1)
+        if words[0].lower() in SIZE_WORDS and len(words) > 1:
+            notes.append(words[0].lower())
+            rest = words[1].strip()
+            continue
+        break
+
+    words = rest.split()
+    if words and words[0].lower() in ("a", "an") and qty is None:
+        words = words[1:]
+    if words and words[0].lower() in VAGUE_QUANTITIES and qty is None:
+        confident = False
+    unit, words = _take_unit(words)
+    if unit is not None and qty is None:
+        if unit in COUNTLESS_UNITS:
+            # "a pinch of salt": 1 is a guess, not a reading
+            qty = 1
+            confident = False
+        else:
+            # "cups flour" with no number: probably a misread line
+            confident = False
+    rest = " ".join(words)
+
+    # "60 g (4 tablespoons) vegetable oil": the parenthetical follows the unit
+    item, item_notes = _split_notes(rest)
+    notes.extend(item_notes)
+    item = " ".join(item.lower().split())
+
+    if not item or _DIGIT_RE.search(item) or "+" in item or " plus " in item:
+        confident = False
+    elif len(item.split()) > MAX_ITEM_WORDS:
+        confident = False
+
+    entry = {
+        "qty": _clean_qty(qty) if qty is not None else None,
+        "unit": unit,
+        "item": item,
+        "notes": ", ".join(notes) or None,
+    }
+    return IngredientLine(text=text, section=section, entry=entry, confident=confident)
+
+
+def parse_ingredient_lines(raw: str) -> list[IngredientLine]:
+    """Parse raw ingredient text into lines, tracking section headers.
+
+    Blank lines are skipped and a bare "(Optional)" line is attached to the
+    previous item's notes, as the Haiku prompt asks.
+    """
+    lines: list[IngredientLine] = []
+    section: str | None = None
+    for raw_line in raw.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        line = _LIST_MARKER_RE.sub("", line, count=1).strip()
+        if not line:
+            continue
+
+        if _OPTIONAL_RE.match(line):
+            if lines:
+                entry = lines[-1].entry
+                entry["notes"] = f"{entry['notes']}, optional" if entry["notes"] else "optional"
+            continue
+
+        name = _section_name(line)
+        if name is not None:
+            section = name
+            continue
+
+        lines.append(parse_ingredient_line(line, section))
+    return lines
+
+
+def group_sections(lines: list[IngredientLine]) -> list[list[IngredientLine]]:
+    """Split lines into runs of consecutive lines under the same header."""
+    runs: list[list[IngredientLine]] = []
+    for line in lines:
+        if not runs or runs[-1][0].section != line.section:
+            runs.append([])
+        runs[-1].append(line)
+    return runs
+
+
+def section_hash(run: list[IngredientLine]) -> str:
+    """Stable hash of one section's header and lines, ignoring case."""
+    text = "\n".join([run[0].section or "", *(line.text for line in run)])
+    return hashlib.sha256(text.lower().encode()).hexdigest()[:16]
+
+
+def assemble_sections(
+    lines: list[IngredientLine],
+    entries: list[dict | None] | None = None,
+    reused: dict[int, dict] | None = None,
+) -> list[dict]:
+    """Group lines into Haiku-style sections, in order, each with its hash.
+
+    `entries`, if given, replaces each line's own entry (e.g. with a Haiku
+    parse); None drops the line. `reused` maps positions in
+    group_sections(lines) to stored sections that are used as they are.
+    """
+    sections: list[dict] = []
+    start = 0
+    for n, run in enumerate(group_sections(lines)):
+        end = start + len(run)
+        if reused is not None and n in reused:
+            sections.append(reused[n])
+        else:
+            run_entries = [line.entry for line in run] if entries is None else entries[start:end]
+            items = [entry for entry in run_entries if entry is not None]
+            if items:
+                sections.append(
+                    {"section": run[0].section, "hash": section_hash(run), "items": items}
+                )
+        start = end
+    return sections
+
+
+def parse_ingredients_locally(raw: str) -> tuple[list[dict], bool]:
+    """Parse a whole ingredient block. Returns (sections, all_confident)."""
+    lines = parse_ingredient_lines(raw)
+    return assemble_sections(lines), all(line.confident for line in lines)
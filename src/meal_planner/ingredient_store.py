@@ -0,0 +1,178 @@
+"""Sidecar store for parsed ingredients, keyed by ingredients hash.
+
+With `index --sidecar`, parse results go to `.meal-planner/parsed-ingredients.jsonl`
+instead of each recipe's frontmatter, so indexing never rewrites user notes.
+parse_recipe_file joins recipes against the store when they are loaded: a
+recipe whose current ingredient text has an entry takes its
+parsed_ingredients and ingredients_hash from there. Each record also notes
+the files it was written for, with their (mtime_ns, size) at the time, so a
+note that has not changed since is joined without reading its body. The
+store is read once per process and re-read only when the file changes, and
+`index` compacts it to one record per hash.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TextIO
+
+from meal_planner.recipe_index import INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE = "parsed-ingredients.jsonl"
+
+# Hash prefix for local-only parses; mirrors haiku_parser.LOCAL_HASH_PREFIX,
+# which imports this module
+_LOCAL_PREFIX = "local:"
+
+# Entries by plain hash, and (hash, note stamp) by note path
+StoreContents = tuple[dict[str, dict], dict[str, tuple[str, tuple[int, int]]]]
+
+# Store contents per file, with the (mtime_ns, size) they were read at
+_loaded: dict[str, tuple[tuple[int, int], StoreContents]] = {}
+
+
+def store_path(cooking_path: Path) -> Path:
+    """Location of the parsed-ingredient store for a cooking directory."""
+    return cooking_path / INDEX_DIR / STORE_FILE
+
+
+def _read_store(path: Path) -> tuple[StoreContents, int]:
+    """Store contents, later records winning, and the number of records read."""
+    entries: dict[str, dict] = {}
+    files: dict[str, tuple[str, tuple[int, int]]] = {}
+    records = 0
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            records += 1
+            try:
+                record = json.loads(raw)
+                key = record["hash"]
+                # Re-insert so entries stay in order of their latest record
+                entries.pop(key, None)
+                entries[key] = {
+                    "parsed_ingredients": record["parsed_ingredients"],
+                    "ingredients_hash": record["ingredients_hash"],
+                }
+                for note, (mtime_ns, size) in record.get("files", {}).items():
+                    files[note] = (key, (mtime_ns, size))
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                logger.debug("Skipping bad ingredient store record: %r", raw[:80])
+    return (entries, files), records
+
+
+def load_store(cooking_path: Path) -> StoreContents | None:
+    """Store entries and note stamps, or None if there is no store.
+
+    Entries are keyed by plain ingredients hash; each has
+    "parsed_ingredients" (frontmatter format) and "ingredients_hash" (as it
+    would be written to frontmatter, possibly with the local-parse prefix).
+    Note stamps map a note's path to the hash of the entry last written for
+    it and the note's (mtime_ns, size) when it was written.
+    """
+    path = store_path(cooking_path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = str(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _loaded.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        contents, _ = _read_store(path)
+    except OSError as e:
+        logger.warning("Could not read ingredient store %s: %s", path, e)
+        return None
+    _loaded[key] = (stamp, contents)
+    return contents
+
+
+def compact_store(cooking_path: Path) -> int:
+    """Rewrite the store with one record per hash, the latest one winning.
+
+    Each record keeps the notes whose latest write was that hash. Returns
+    the number of records dropped; the store is left alone if there are none
+    or it cannot be read or rewritten (logged as a warning).
+    """
+    path = store_path(cooking_path)
+    try:
+        (entries, files), records = _read_store(path)
+    except FileNotFoundError:
+        return 0
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning("Could not read ingredient store %s: %s", path, e)
+        return 0
+    dropped = records - len(entries)
+    if dropped <= 0:
+        return 0
+
+    notes: dict[str, dict[str, list[int]]] = {key: {} for key in entries}
+    for note, (key, stamp) in files.items():
+        notes[key][note] = list(stamp)
+    tmp = path.with_suffix(".jsonl.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, entry in entries.items():
+                record = {"hash": key, **entry, "files": notes[key]}
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Could not compact ingredient store %s: %s", path, e)
+        if tmp.is_file():
+            tmp.unlink()
+        return 0
+    logger.info("Compacted ingredient store: dropped %d superseded records", dropped)
+    return dropped
+
+
+class SidecarWriter:
+    """Drop-in for FrontmatterWriter that appends to the store instead.
+
+    Takes the same `submit(path, updates)` calls; nothing under the vault's
+    notes is touched.
+    """
+
+    def __init__(self, cooking_path: Path) -> None:
+        self.path = store_path(cooking_path)
+        self.failed: list[Path] = []
+        self.written: list[Path] = []
+        self._file: TextIO | None = None
+
+    def submit(self, path: Path, updates: dict) -> None:
+        ingredients_hash = updates["ingredients_hash"]
+        record = {
+            "hash": ingredients_hash.removeprefix(_LOCAL_PREFIX),
+            "ingredients_hash": ingredients_hash,
+            "parsed_ingredients": updates["parsed_ingredients"],
+        }
+        try:
+            # The note is not written to, so its current stamp identifies the
+            # text that was hashed for as long as the note stays unchanged
+            st = os.stat(path)
+            record["files"] = {str(path): [st.st_mtime_ns, st.st_size]}
+        except OSError:
+            pass
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self.written.append(path)
+        except OSError as e:
+            logger.error("Could not write ingredient store %s: %s", self.path, e)
+            self.failed.append(path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
@@ -0,0 +1,94 @@
+"""Content-addressed cache of Haiku ingredient-line parses, shared across recipes.
+
+Lines like "1 tsp kosher salt" appear in hundreds of recipes. Each distinct
+line (normalized for case and whitespace) is sent to Haiku once; the result
+is appended to `.meal-planner/ingredient-lines.jsonl` and reused for every
+recipe, and every later run, that contains the same line.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import TextIO
+
+from meal_planner.recipe_index import INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+LINE_CACHE_FILE = "ingredient-lines.jsonl"
+
+
+def line_cache_path(cooking_path: Path) -> Path:
+    """Location of the ingredient line cache for a cooking directory."""
+    return cooking_path / INDEX_DIR / LINE_CACHE_FILE
+
+
+def normalize_line(text: str) -> str:
+    """Cache key for an ingredient line: casefolded, whitespace collapsed."""
+    return " ".join(text.casefold().split())
+
+
+class LineCache:
+    """Append-only JSONL map of normalized line -> parsed entry (or None).
+
+    None records a line Haiku said is not an ingredient, so it is not asked
+    again either.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict | None] | None = None) -> None:
+        self.path = path
+        self.entries: dict[str, dict | None] = entries if entries is not None else {}
+        self._file: TextIO | None = None
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_line(text) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, text: str) -> dict | None:
+        """The cached entry for `text`; callers check `in` first."""
+        entry = self.entries[normalize_line(text)]
+        return dict(entry) if entry is not None else None
+
+    def add(self, text: str, entry: dict | None) -> None:
+        """Record a parse in memory and append it to the cache file."""
+        key = normalize_line(text)
+        self.entries[key] = entry
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"line": key, "entry": entry}) + "\n")
+        except OSError as e:
+            logger.warning("Could not write ingredient line cache %s: %s", self.path, e)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_line_cache(cooking_path: Path) -> LineCache:
+    """Load the line cache, skipping records a crash may have cut short."""
+    path = line_cache_path(cooking_path)
+    entries: dict[str, dict | None] = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    record = json.loads(raw)
+                    entries[record["line"]] = record["entry"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    logger.debug("Skipping bad line cache record: %r", raw[:80])
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not read ingredient line cache %s: %s", path, e)
+    return LineCache(path, entries)
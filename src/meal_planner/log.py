@@ -2,30 +2,48 @@
 
 from __future__ import annotations
 
+import functools
 import logging
+import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from rich.console import Console
+if TYPE_CHECKING:
+    from rich.console import Console
 
-stderr_console = Console(stderr=True)
+
+@functools.cache
+def get_stderr_console() -> Console:
+    """The shared stderr Console, created (and Rich imported) on first use."""
+    from rich.console import Console
+
+    return Console(stderr=True)
 
 
 def setup_logging(level: str = "info", log_file: Path | None = None) -> None:
-    """Configure the meal_planner logger with RichHandler and optional file output."""
-    from rich.logging import RichHandler
+    """Configure the meal_planner logger with optional file output.
 
+    Rich formatting is only used when stderr is a terminal; piped and
+    redirected runs get a plain handler and never import Rich.
+    """
     logger = logging.getLogger("meal_planner")
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     logger.handlers.clear()
 
-    rich_handler = RichHandler(
-        console=stderr_console,
-        show_path=False,
-        markup=False,
-        rich_tracebacks=True,
-    )
-    rich_handler.setLevel(getattr(logging, level.upper(), logging.INFO))
-    logger.addHandler(rich_handler)
+    if sys.stderr.isatty():
+        from rich.logging import RichHandler
+
+        stderr_handler: logging.Handler = RichHandler(
+            console=get_stderr_console(),
+            show_path=False,
+            markup=False,
+            rich_tracebacks=True,
+        )
+    else:
+        stderr_handler = logging.StreamHandler(sys.stderr)
+        stderr_handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    stderr_handler.setLevel(getattr(logging, level.upper(), logging.INFO))
+    logger.addHandler(stderr_handler)
 
     if log_file is not None:
         file_handler = logging.FileHandler(log_file)
@@ -0,0 +1,68 @@
+"""Single-pass splitting of recipe markdown bodies into heading sections."""
+
+from __future__ import annotations
+
+import re
+
+# Headings at these levels start a section (## Ingredients, ### Directions, ...)
+SECTION_LEVELS = (2, 3)
+
+_HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*$")
+
+
+def _section_key(title: str) -> str:
+    return title.rstrip(":").strip().lower()
+
+
+def split_sections(body: str) -> dict[str, str]:
+    """Split a markdown body into its level-2/3 heading sections in one pass.
+
+    Keys are lowercased heading titles with any trailing colon removed.
+    Each section runs until the next heading of the same or higher level, so
+    sub-headings (e.g. #### For the Sauce, or ### Make the Sauce under
+    ## Directions) stay inside their parent; a level-3 subsection is also a
+    section of its own. When a heading repeats, the first occurrence wins.
+    Keys are ordered by where their heading appears in the document.
+    """
+    sections: dict[str, str] = {}
+    # Stack of currently open sections: (level, key, lines, owns_key); a
+    # repeated heading still bounds its siblings but does not own the key
+    open_sections: list[tuple[int, str, list[str], bool]] = []
+
+    def close(section: tuple[int, str, list[str], bool]) -> None:
+        _, key, lines, owns_key = section
+        if owns_key:
+            sections[key] = "\n".join(lines).strip()
+
+    for line in body.split("\n"):
+        m = _HEADING_RE.match(line) if line.startswith("#") else None
+        if m:
+            level = len(m.group(1))
+            while open_sections and open_sections[-1][0] >= level:
+                close(open_sections.pop())
+
+        for section in open_sections:
+            section[2].append(line)
+
+        if m and level in SECTION_LEVELS:
+            key = _section_key(m.group(2))
+            owns_key = key not in sections
+            if owns_key:
+                sections[key] = ""  # reserve document order
+            open_sections.append((level, key, [], owns_key))
+
+    while open_sections:
+        close(open_sections.pop())
+
+    return sections
+
+
+def find_section(sections: dict[str, str], name: str) -> str | None:
+    """Return the first section (in document order) whose key starts with name.
+
+    The prefix match keeps headings like "Ingredients (serves 4)" working.
+    Empty sections are returned as None.
+    """
+    name = name.lower()
+    text = next((v for k, v in sections.items() if k.startswith(name)), None)
+    return text or None
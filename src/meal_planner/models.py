@@ -20,7 +20,7 @@ class MealType(Enum):
     SNACK = "snack"
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedIngredient:
     qty: float | None
     unit: str | None
@@ -28,13 +28,14 @@ class ParsedIngredient:
     notes: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class IngredientSection:
     section: str | None
     items: list[ParsedIngredient]
+    hash: str | None = None  # ingredient_parser.section_hash of the lines parsed
 
 
-@dataclass
+@dataclass(slots=True)
 class Recipe:
     name: str
     file_path: Path
@@ -63,8 +64,38 @@ class Recipe:
     # Parsed ingredients (populated by Haiku)
     parsed_ingredients: list[IngredientSection] = field(default_factory=list)
     ingredients_hash: str | None = None
-    # Raw ingredient text (used before parsing)
-    raw_ingredients: str | None = None
+    # Markdown body sections keyed by lowercased heading. None until first
+    # accessed; only the frontmatter is read when the recipe is parsed.
+    sections: dict[str, str] | None = field(default=None, repr=False, compare=False)
+    # Hash of the ingredient text currently being re-parsed; written back as
+    # ingredients_hash once the new parsed_ingredients are saved
+    pending_hash: str | None = field(default=None, repr=False, compare=False)
+
+    def __getstate__(self) -> tuple[None, dict]:
+        # Pickle (as the recipe index does) without the lazily loaded body, so
+        # the index holds frontmatter only whatever was read before saving
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["sections"] = None
+        return None, state
+
+    def load_sections(self) -> dict[str, str]:
+        """Return the body sections, reading them from file_path on first use."""
+        if self.sections is None:
+            from meal_planner.indexer import read_recipe_sections
+
+            self.sections = read_recipe_sections(self.file_path)
+        return self.sections
+
+    def section(self, name: str) -> str | None:
+        """Return the text of a body section such as "directions", or None."""
+        from meal_planner.markdown_sections import find_section
+
+        return find_section(self.load_sections(), name)
+
+    @property
+    def raw_ingredients(self) -> str | None:
+        """Raw ingredient text (used before parsing), loaded lazily."""
+        return self.section("ingredients")
 
 
 @dataclass
@@ -0,0 +1,401 @@
+"""Memory-mapped columnar snapshot of recipe nutrition and filter fields.
+
+`meal-planner index` writes one NumPy array per field under
+`.meal-planner/nutrition/`. Every array has one row per recipe, in file-name
+order. The scorer and the planner open the arrays with `np.load(mmap_mode="r")`
+and run the hard filters, macro tables and suggestion scores as vector
+operations. Only the rows that are actually returned are turned into Recipe
+objects: each row's recipe is pickled into `recipes.bin`, at the offset and
+size held in two more columns, so loading the top N reads N records rather
+than the whole recipe index.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pickle
+import shutil
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+from meal_planner.indexer import discover_recipe_files, parse_recipe_file
+from meal_planner.models import Recipe
+from meal_planner.recipe_index import (
+    RecipeIndex,
+    find_stale_files,
+    load_recipe_index,
+    snapshot_path,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+META_FILE = "meta.json"
+RECIPES_FILE = "recipes.bin"
+
+# NaN marks a missing value
+FLOAT_COLUMNS = ("calories", "protein_g", "fat_g", "carbs_g", "fiber_g", "rating")
+# -1 marks a missing value
+INT_COLUMNS = ("servings", "prep_time_min", "cook_time_min", "total_time_min")
+
+# Bit i of meal_mask is set when the recipe matches MEAL_TYPES[i]
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+# dietary_mask is a uint64, so at most this many distinct tags fit
+MAX_DIETARY_TAGS = 64
+
+FLAG_TRIED = 1
+FLAG_FAVORITE = 2
+
+# Serving multiples tried by suggest.score_macro_fit, in the same order
+MACRO_SERVINGS = (1.0, 1.5, 2.0, 3.0)
+
+_MISSING = -1
+
+
+def _last_made_ordinal(last_made: str | None) -> int:
+    if not last_made:
+        return _MISSING
+    try:
+        return datetime.strptime(last_made, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return _MISSING
+
+
+def _build_columns(
+    recipes: list[Recipe], dietary_vocab: list[str]
+) -> dict[str, np.ndarray]:
+    from meal_planner.suggest import matches_meal_type
+
+    tag_bits = {tag: 1 << i for i, tag in enumerate(dietary_vocab)}
+    columns: dict[str, np.ndarray] = {}
+
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array(
+            [np.nan if (v := getattr(r, name)) is None else v for r in recipes],
+            dtype=np.float64,
+        )
+    for name in INT_COLUMNS:
+        columns[name] = np.array(
+            [_MISSING if (v := getattr(r, name)) is None else v for r in recipes],
+            dtype=np.int32,
+        )
+
+    columns["last_made"] = np.array(
+        [_last_made_ordinal(r.last_made) for r in recipes], dtype=np.int32
+    )
+    columns["flags"] = np.array(
+        [(FLAG_TRIED if r.tried else 0) | (FLAG_FAVORITE if r.favorite else 0)
+         for r in recipes],
+        dtype=np.uint8,
+    )
+    columns["meal_mask"] = np.array(
+        [
+            sum(1 << i for i, mt in enumerate(MEAL_TYPES) if matches_meal_type(r, mt))
+            for r in recipes
+        ],
+        dtype=np.uint8,
+    )
+    columns["dietary_mask"] = np.array(
+        [sum(tag_bits[t] for t in {t.lower() for t in r.dietary_tags}) for r in recipes],
+        dtype=np.uint64,
+    )
+    columns["name"] = np.array([r.name for r in recipes], dtype=str)
+    columns["name_lc"] = np.array([r.name.lower() for r in recipes], dtype=str)
+    columns["cuisine_lc"] = np.array(
+        [(r.cuisine or "").lower() for r in recipes], dtype=str
+    )
+    columns["path"] = np.array([str(r.file_path) for r in recipes], dtype=str)
+    return columns
+
+
+def write_snapshot(path: Path, index: RecipeIndex, files: list[Path]) -> bool:
+    """Write the snapshot for `files` from a refreshed index.
+
+    The per-file (mtime_ns, size) fingerprint is stored alongside the columns
+    so readers can tell when the snapshot no longer matches the directory.
+    Returns False (after logging) if there are too many distinct dietary tags
+    for the bitmask.
+    """
+    entries = [(str(f), index.entries[str(f)]) for f in files if str(f) in index.entries]
+    recipes = [e.recipe for _, e in entries if e.recipe is not None]
+
+    dietary_vocab = sorted({t.lower() for r in recipes for t in r.dietary_tags})
+    if len(dietary_vocab) > MAX_DIETARY_TAGS:
+        logger.warning(
+            "Not writing nutrition snapshot: %d distinct dietary tags (max %d)",
+            len(dietary_vocab),
+            MAX_DIETARY_TAGS,
+        )
+        return False
+
+    columns = _build_columns(recipes, dietary_vocab)
+    records = [pickle.dumps(r, protocol=pickle.HIGHEST_PROTOCOL) for r in recipes]
+    sizes = np.array([len(rec) for rec in records], dtype=np.int64)
+    columns["recipe_offset"] = np.cumsum(sizes) - sizes
+    columns["recipe_size"] = sizes
+    columns["file_path"] = np.array([p for p, _ in entries], dtype=str)
+    columns["file_mtime_ns"] = np.array([e.mtime_ns for _, e in entries], dtype=np.int64)
+    columns["file_size"] = np.array([e.size for _, e in entries], dtype=np.int64)
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "rows": len(recipes),
+        "meal_types": list(MEAL_TYPES),
+        "dietary_tags": dietary_vocab,
+    }
+
+    # Build the new snapshot next to the old one and swap directories, so a
+    # reader never sees columns from two different writes
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    old = path.with_name(f"{path.name}.old-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        for name, arr in columns.items():
+            np.save(tmp / f"{name}.npy", arr, allow_pickle=False)
+        (tmp / RECIPES_FILE).write_bytes(b"".join(records))
+        (tmp / META_FILE).write_text(json.dumps(meta))
+        if path.exists():
+            path.rename(old)
+        tmp.rename(path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+    logger.debug("Wrote nutrition snapshot (%d recipes) to %s", len(recipes), path)
+    return True
+
+
+@dataclass
+class NutritionSnapshot:
+    """Read-only, memory-mapped recipe columns (see module docstring)."""
+
+    path: Path
+    columns: dict[str, np.ndarray]
+    dietary_tags: list[str]
+    _fingerprints: dict[str, tuple[int, int]] | None = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.columns["name"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def fingerprints(self) -> dict[str, tuple[int, int]]:
+        """(mtime_ns, size) of each file the snapshot was built from, by path."""
+        if self._fingerprints is None:
+            self._fingerprints = dict(
+                zip(
+                    self["file_path"].tolist(),
+                    zip(self["file_mtime_ns"].tolist(), self["file_size"].tolist()),
+                )
+            )
+        return self._fingerprints
+
+    def is_current(self, files: list[Path]) -> bool:
+        """True if `files` are exactly the files the snapshot was built from."""
+        known = self.fingerprints()
+        return len(known) == len(files) and not find_stale_files(files, known)
+
+    def supports(self, meal_type: str | None = None) -> bool:
+        """Whether select() can answer a meal-type filter (only the MEAL_TYPES)."""
+        return not meal_type or meal_type.lower() in MEAL_TYPES
+
+    # -- Row selection ------------------------------------------------------
+
+    def _name_contains(self, query: str) -> np.ndarray:
+        return np.strings.find(self["name_lc"], query.lower()) >= 0
+
+    def select(
+        self,
+        meal_type: str | None = None,
+        max_time: int | None = None,
+        cuisine: str | None = None,
+        dietary_tags: list[str] | None = None,
+        exclude: list[str] | None = None,
+        min_protein: float | None = None,
+        max_calories: float | None = None,
+        with_calories: bool = False,
+    ) -> np.ndarray:
+        """Row numbers passing suggest.filter_recipes' hard filters, in file order.
+
+        with_calories=True additionally drops recipes without calorie data,
+        as the planner needs. Check supports(meal_type) first.
+        """
+        keep = np.ones(len(self), dtype=bool)
+
+        if meal_type:
+            bit = 1 << MEAL_TYPES.index(meal_type.lower())
+            keep &= (self["meal_mask"] & bit) != 0
+        if max_time is not None:
+            total = self["total_time_min"]
+            keep &= (total == _MISSING) | (total <= max_time)
+        if cuisine:
+            cuisines = self["cuisine_lc"]
+            keep &= (cuisines != "") & (np.strings.find(cuisines, cuisine.lower()) >= 0)
+        if dietary_tags:
+            required = 0
+            for tag in dietary_tags:
+                tag = tag.lower()
+                if tag not in self.dietary_tags:
+                    return np.empty(0, dtype=np.intp)
+                required |= 1 << self.dietary_tags.index(tag)
+            required = np.uint64(required)
+            keep &= (self["dietary_mask"] & required) == required
+        for ex in exclude or []:
+            keep &= ~self._name_contains(ex)
+        if min_protein is not None:
+            protein = self["protein_g"]
+            keep &= np.isnan(protein) | (protein >= min_protein)
+        if max_calories is not None or with_calories:
+            calories = self["calories"]
+            if max_calories is not None:
+                keep &= np.isnan(calories) | (calories <= max_calories)
+            if with_calories:
+                keep &= ~np.isnan(calories)
+
+        return np.flatnonzero(keep)
+
+    def find_by_name(self, query: str) -> list[Recipe]:
+        """Recipes whose name contains `query` (case-insensitive)."""
+        return self.recipes(np.flatnonzero(self._name_contains(query)))
+
+    def recipes(self, rows: np.ndarray) -> list[Recipe]:
+        """Recipe objects for the given rows, in row order.
+
+        Each is read from the snapshot's own recipe records, so the cost
+        grows with len(rows), not with the vault. If the records cannot be
+        read, the rows are parsed from their files instead.
+        """
+        offsets = self["recipe_offset"]
+        sizes = self["recipe_size"]
+        try:
+            with open(self.path / RECIPES_FILE, "rb") as f:
+                result = []
+                for i in rows:
+                    f.seek(int(offsets[i]))
+                    result.append(pickle.loads(f.read(int(sizes[i]))))
+                return result
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning("Could not read snapshot recipes, parsing files: %s", e)
+        paths = self["path"]
+        parsed = (parse_recipe_file(Path(str(paths[i]))) for i in rows)
+        return [r for r in parsed if r is not None]
+
+    # -- Vectorized planner and scorer inputs ------------------------------
+
+    def scaled_table(self, column: str, rows: np.ndarray, scale: int) -> list[int]:
+        """int((value or 0) * scale) for each row, as the CP-SAT tables need."""
+        values = np.nan_to_num(self[column][rows], nan=0.0)
+        return (values * scale).astype(np.int64).tolist()
+
+    def macro_fit(
+        self,
+        rows: np.ndarray,
+        target_calories: int | None,
+        target_protein: int | None,
+    ) -> np.ndarray:
+        """Vectorized suggest.score_macro_fit best scores (0-1) for rows."""
+        calories = self["calories"][rows]
+        protein = self["protein_g"][rows]
+        use_cal = bool(target_calories) & ~np.isnan(calories) & (calories != 0)
+        use_pro = bool(target_protein) & ~np.isnan(protein) & (protein != 0)
+
+        best = np.zeros(len(rows))
+        for servings in MACRO_SERVINGS:
+            cal_score = np.zeros(len(rows))
+            pro_score = np.zeros(len(rows))
+            if target_calories:
+                fit = 1 - np.abs(calories * servings - target_calories) / target_calories
+                cal_score = np.where(use_cal & (fit > 0), fit, 0.0)
+            if target_protein:
+                fit = 1 - np.abs(protein * servings - target_protein) / target_protein
+                pro_score = np.where(use_pro & (fit > 0), fit, 0.0)
+
+            if target_calories and target_protein:
+                combined = cal_score * 0.4 + pro_score * 0.6
+            else:
+                combined = np.where(pro_score > cal_score, pro_score, cal_score)
+            best = np.where(combined > best, combined, best)
+
+        no_data = np.isnan(calories) & np.isnan(protein)
+        return np.where(no_data, 0.5, best)
+
+    def scores(
+        self,
+        rows: np.ndarray,
+        target_calories: int | None = None,
+        target_protein: int | None = None,
+        today: date | None = None,
+    ) -> np.ndarray:
+        """Unrounded suggest.score_recipe totals for rows, without pantry items."""
+        rating = self["rating"][rows]
+        rating_score = np.where(rating > 0, np.minimum(rating / 5.0, 1.0) * 20, 10.0)
+
+        last_made = self["last_made"][rows]
+        days_ago = (today or date.today()).toordinal() - last_made.astype(np.int64)
+        recency_score = np.select(
+            [last_made == _MISSING, days_ago < 7, days_ago < 14, days_ago < 30],
+            [15.0, 0.0, 5.0, 10.0],
+            default=15.0,
+        )
+
+        macro_score = self.macro_fit(rows, target_calories, target_protein) * 20
+
+        flags = self["flags"][rows]
+        variety_score = (
+            10.0
+            + np.where(flags & FLAG_TRIED, 2.5, 0.0)
+            + np.where(flags & FLAG_FAVORITE, 2.5, 0.0)
+        )
+
+        # Same summation order as score_recipe (its pantry term is 0.0 here)
+        return 0.0 + rating_score + recency_score + macro_score + variety_score
+
+
+def load_snapshot(path: Path) -> NutritionSnapshot | None:
+    """Memory-map a snapshot directory, or return None if missing or unusable."""
+    try:
+        meta = json.loads((path / META_FILE).read_text())
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("meal_types") != list(
+            MEAL_TYPES
+        ):
+            logger.info("Discarding nutrition snapshot (format changed)")
+            return None
+        columns = {
+            f.stem: np.load(f, mmap_mode="r", allow_pickle=False)
+            for f in path.glob("*.npy")
+        }
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unusable nutrition snapshot %s: %s", path, e)
+        return None
+    return NutritionSnapshot(path=path, columns=columns, dietary_tags=meta["dietary_tags"])
+
+
+def open_snapshot(cooking_path: Path, jobs: int = 1) -> NutritionSnapshot | None:
+    """Open the snapshot written by `index`, rebuilding it if recipes changed.
+
+    Returns None if no snapshot has been written for this directory.
+    """
+    path = snapshot_path(cooking_path)
+    if not path.exists():
+        return None
+
+    files = discover_recipe_files(cooking_path)
+    snapshot = load_snapshot(path)
+    if snapshot is not None and snapshot.is_current(files):
+        return snapshot
+
+    index = load_recipe_index(cooking_path)
+    index.refresh(files, jobs=jobs)
+    index.save()
+    try:
+        if not write_snapshot(path, index, files):
+            return None
+    except OSError as e:
+        logger.warning("Could not rewrite nutrition snapshot %s: %s", path, e)
+        return None
+    return load_snapshot(path)
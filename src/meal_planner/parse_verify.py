@@ -0,0 +1,300 @@
+"""Cross-check stored ingredient parses against the local parser (`index --verify`).
+
+A targeted alternative to `index --force`: each recipe's stored
+parsed_ingredients are lined up with its raw lines and every item is
+compared with the local parser's reading of the same line on quantity,
+unit and item head noun. Lines the local parser is confident about but
+that disagree with the stored parse are re-sent to Haiku; everything else
+is left alone. Per-field agreement rates show where stored parses drift.
+
+Stored sections are matched to the recipe's sections in order by header,
+and their items to lines one for one. A section whose item count differs
+from its line count (Haiku dropped or split lines) cannot be lined up; it
+is counted as unaligned and kept as it is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from meal_planner.claude_runner import DEFAULT_RATE, ClaudeRunner
+from meal_planner.frontmatter_writer import FrontmatterWriter
+from meal_planner.haiku_parser import (
+    DEFAULT_BATCH_TOKENS,
+    BatchBudget,
+    BatchOutcome,
+    ParseStats,
+    fetch_line_batches,
+    parsed_to_frontmatter_format,
+)
+from meal_planner.indexer import compute_ingredients_hash
+from meal_planner.ingredient_parser import (
+    IngredientLine,
+    assemble_sections,
+    group_sections,
+    parse_ingredient_lines,
+)
+from meal_planner.ingredient_store import SidecarWriter
+from meal_planner.line_cache import load_line_cache, normalize_line
+from meal_planner.models import IngredientSection, ParsedIngredient, Recipe
+from meal_planner.shopping import normalize_unit
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("qty", "unit", "item")
+
+# Quantities within this relative difference agree (Haiku rounds 1/3 to 0.333)
+QTY_TOLERANCE = 0.01
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def head_noun(item: str | None) -> str:
+    """Last word of an item name, lowercased and crudely singularized."""
+    words = _WORD_RE.findall((item or "").lower())
+    if not words:
+        return ""
+    word = words[-1]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "oes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _qty_agrees(a: object, b: object) -> bool:
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        return a is None and b is None
+    return abs(a - b) <= QTY_TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def compare_entries(local: dict, stored: dict) -> dict[str, bool]:
+    """Which of qty, unit and item head noun agree between two parses of a line."""
+    return {
+        "qty": _qty_agrees(local.get("qty"), stored.get("qty")),
+        "unit": normalize_unit(local.get("unit")) == normalize_unit(stored.get("unit")),
+        "item": head_noun(local.get("item")) == head_noun(stored.get("item")),
+    }
+
+
+@dataclass(slots=True)
+class VerifyStats:
+    """Agreement counters from one verify pass."""
+
+    recipes: int = 0  # recipes whose stored parse was checked
+    lines: int = 0  # lines compared field by field
+    unaligned: int = 0  # lines whose stored items could not be matched up
+    agree: dict[str, int] = field(default_factory=lambda: dict.fromkeys(FIELDS, 0))
+    disagreements: int = 0  # lines where any field differs
+    resent: int = 0  # of which sent back to Haiku
+    changed: int = 0  # lines whose new answer differs from the stored one
+    repaired: int = 0  # recipes rewritten
+
+    def agreement(self, name: str) -> float | None:
+        """Share of compared lines agreeing on field `name`, None if none."""
+        return self.agree[name] / self.lines if self.lines else None
+
+    def to_dict(self) -> dict:
+        """Counters and per-field agreement rates, for the index report."""
+        agreement = {name: self.agreement(name) for name in FIELDS}
+        return {
+            "recipes": self.recipes,
+            "lines": self.lines,
+            "unaligned_lines": self.unaligned,
+            "agreement": {
+                name: None if rate is None else round(rate, 4)
+                for name, rate in agreement.items()
+            },
+            "disagreements": self.disagreements,
+            "resent": self.resent,
+            "changed": self.changed,
+            "repaired_recipes": self.repaired,
+        }
+
+
+def _item_dict(item: ParsedIngredient) -> dict:
+    return {"qty": item.qty, "unit": item.unit, "item": item.item, "notes": item.notes}
+
+
+def _section_dict(section: IngredientSection) -> dict:
+    return {
+        "section": section.section,
+        "hash": section.hash,
+        "items": [_item_dict(item) for item in section.items],
+    }
+
+
+def align_stored(
+    lines: list[IngredientLine], stored: list[IngredientSection]
+) -> tuple[dict[int, dict], dict[int, dict]] | None:
+    """Line up a stored parse with the recipe's lines.
+
+    Returns (items keyed by line index, unaligned stored sections keyed by
+    position in group_sections(lines)), or None if the stored sections do
+    not follow the recipe's sections at all.
+    """
+    items: dict[int, dict] = {}
+    kept: dict[int, dict] = {}
+    remaining = deque(stored)
+    start = 0
+    for n, run in enumerate(group_sections(lines)):
+        # A run whose lines are all non-ingredients has no stored section
+        if remaining and remaining[0].section == run[0].section:
+            section = remaining.popleft()
+            if len(section.items) == len(run):
+                for offset, item in enumerate(section.items):
+                    items[start + offset] = _item_dict(item)
+            else:
+                kept[n] = _section_dict(section)
+        start += len(run)
+    return None if remaining else (items, kept)
+
+
+@dataclass(slots=True)
+class _Checked:
+    recipe: Recipe
+    lines: list[IngredientLine]
+    items: dict[int, dict]
+    kept: dict[int, dict]
+    resend: dict[int, str] = field(default_factory=dict)  # line index -> cache key
+
+
+def _check_recipe(recipe: Recipe, stats: VerifyStats) -> _Checked | None:
+    lines = parse_ingredient_lines(recipe.raw_ingredients)
+    aligned = align_stored(lines, recipe.parsed_ingredients)
+    if aligned is None:
+        stats.unaligned += len(lines)
+        logger.debug("UNALIGNED: %s", recipe.name)
+        return None
+    items, kept = aligned
+    stats.recipes += 1
+    stats.unaligned += len(lines) - len(items)
+    checked = _Checked(recipe, lines, items, kept)
+    for i, stored in items.items():
+        fields = compare_entries(lines[i].entry, stored)
+        stats.lines += 1
+        for name, agrees in fields.items():
+            stats.agree[name] += agrees
+        if not all(fields.values()):
+            stats.disagreements += 1
+            # Only a confident local parse is evidence that the stored one is wrong
+            if lines[i].confident:
+                checked.resend[i] = normalize_line(lines[i].text)
+    return checked
+
+
+def verify_ingredients(
+    recipes: list[Recipe],
+    cooking_path: Path,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    max_workers: int = 4,
+    rate: float = DEFAULT_RATE,
+    use_api: bool = True,
+    sidecar: bool = False,
+    stats: VerifyStats | None = None,
+) -> list[Path]:
+    """Compare stored parses with the local parser and repair disagreements.
+
+    Only recipes whose stored parse matches their current ingredient text
+    (and is not a local best guess) are checked. Disagreeing lines the local
+    parser is confident about are re-sent to Haiku, skipping the line cache,
+    and the new answers are written into those recipes and the cache. With
+    use_api=False, only the agreement statistics are gathered. Returns the
+    paths of the recipes rewritten; counters go into `stats` if given.
+    """
+    if stats is None:
+        stats = VerifyStats()
+    checked: list[_Checked] = []
+    for recipe in recipes:
+        if not recipe.raw_ingredients or not recipe.parsed_ingredients:
+            continue
+        if recipe.ingredients_hash != compute_ingredients_hash(recipe.raw_ingredients):
+            continue
+        result = _check_recipe(recipe, stats)
+        if result is not None and result.resend:
+            checked.append(result)
+
+    logger.info(
+        "Verified %d lines in %d recipes: qty %s, unit %s, item %s agree; %d disagree",
+        stats.lines,
+        stats.recipes,
+        *(_percent(stats.agreement(name)) for name in FIELDS),
+        stats.disagreements,
+    )
+    if not checked or not use_api:
+        return []
+
+    line_text: dict[str, str] = {}
+    for entry in checked:
+        for i, key in entry.resend.items():
+            line_text.setdefault(key, entry.lines[i].text)
+    stats.resent = len(line_text)
+    logger.info("Re-sending %d disagreeing lines to Haiku", len(line_text))
+
+    cache = load_line_cache(cooking_path)
+    answers: dict[str, dict | None] = {}
+
+    def apply(batch: list[str], outcome: BatchOutcome) -> None:
+        for i, key in enumerate(batch):
+            if i in outcome.results:
+                answers[key] = outcome.results[i]
+                cache.add(line_text[key], outcome.results[i])
+
+    async def fetch_all() -> None:
+        runner = ClaudeRunner(concurrency=max_workers, rate=rate)
+        await fetch_line_batches(
+            runner, deque(line_text), line_text, BatchBudget(batch_tokens), apply, ParseStats()
+        )
+
+    writer = SidecarWriter(cooking_path) if sidecar else FrontmatterWriter()
+    try:
+        asyncio.run(fetch_all())
+        for entry in checked:
+            _write_repaired(entry, answers, writer, stats)
+    finally:
+        writer.close()
+        cache.close()
+    return writer.written
+
+
+def _write_repaired(
+    entry: _Checked,
+    answers: dict[str, dict | None],
+    writer: FrontmatterWriter | SidecarWriter,
+    stats: VerifyStats,
+) -> None:
+    entries: list[dict | None] = [entry.items.get(i) for i in range(len(entry.lines))]
+    changed = 0
+    for i, key in entry.resend.items():
+        if key not in answers:
+            continue  # Haiku failed again; keep the stored item
+        if answers[key] is None or any(
+            not agrees for agrees in compare_entries(answers[key], entries[i]).values()
+        ):
+            changed += 1
+        entries[i] = answers[key]
+    stats.changed += changed
+    if not changed:
+        return
+
+    sections = assemble_sections(entry.lines, entries, entry.kept)
+    writer.submit(
+        entry.recipe.file_path,
+        {
+            "parsed_ingredients": parsed_to_frontmatter_format(sections),
+            "ingredients_hash": entry.recipe.ingredients_hash,
+        },
+    )
+    stats.repaired += 1
+    logger.debug("REPAIRED: %s (%d lines)", entry.recipe.name, changed)
+
+
+def _percent(rate: float | None) -> str:
+    return "n/a" if rate is None else f"{rate:.1%}"
@@ -5,16 +5,20 @@ from __future__ import annotations
 import json
 import logging
 import sys
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from ortools.sat.python import cp_model
+import numpy as np
 
+from meal_planner.catalog import RecipeCatalog
 from meal_planner.config import apply_cli_overrides, load_config
-from meal_planner.ingredient_groups import build_ingredient_group_table
+from meal_planner.ingredient_groups import build_ingredient_group_table, ingredient_group_key
 from meal_planner.models import MealPlan, MealSlot, MealType, PrepStyle, Recipe
+from meal_planner.nutrition_snapshot import NutritionSnapshot, open_snapshot
 from meal_planner.pins import PinSpec, ResolvedPin, resolve_pins
-from meal_planner.suggest import filter_recipes, load_all_recipes
+from meal_planner.suggest import filter_recipes, open_recipe_source
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +33,154 @@ DAY_NAMES = [
 ]
 
 
+# How a slot's calories and protein are expressed: element lookups times
+# the serving variable, or a table of precomputed (recipe, serving) options
+FORMULATIONS = ("element", "table")
+
+# Serving options (fixed-point: multiply by 10 internally)
+SERVING_OPTIONS = [5, 10, 15, 20, 25, 30, 35, 40]  # 0.5, 1.0 .. 4.0
+
+# Objective weights on daily calorie and protein deviation
+CAL_WEIGHT = 10
+PRO_WEIGHT = 15
+
+
+@dataclass(slots=True)
+class SolveStats:
+    """Solver figures from one build_meal_plan call."""
+
+    formulation: str = ""
+    status: str = ""
+    solve_s: float = 0.0
+    objective: float | None = None  # total penalty, None if no plan was found
+    variables: int = 0
+    constraints: int = 0
+
+
 def get_day_index(day_name: str) -> int:
     """Convert day name to 0-indexed (Monday=0)."""
     mapping = {d.lower(): i for i, d in enumerate(DAY_NAMES)}
     return mapping.get(day_name.lower(), -1)
 
 
+def select_candidates(
+    source: list[Recipe] | RecipeCatalog | NutritionSnapshot,
+    candidate_filter: Callable[..., list[Recipe]] | None = None,
+    **filters,
+) -> tuple[list[Recipe], np.ndarray | None]:
+    """Filter recipes for one meal, keeping only those with calorie data.
+
+    Returns (candidates, rows): rows are the snapshot row numbers of the
+    candidates when `source` is a NutritionSnapshot, otherwise None. A
+    `candidate_filter` is called with the filters in place of filter_recipes
+    over a list or catalog `source`.
+    """
+    if isinstance(source, NutritionSnapshot):
+        rows = source.select(with_calories=True, **filters)
+        return source.recipes(rows), rows
+    matches = (
+        candidate_filter(**filters)
+        if candidate_filter is not None
+        else filter_recipes(source, **filters)
+    )
+    return [r for r in matches if r.calories is not None], None
+
+
+def macro_table(
+    candidates: list[Recipe],
+    field: str,
+    scale: int,
+    snapshot: NutritionSnapshot | None = None,
+    rows: np.ndarray | None = None,
+) -> list[int]:
+    """Per-candidate `field` values scaled to integers for the solver.
+
+    Candidates covered by snapshot rows are read from the snapshot columns;
+    any after them (recipes injected by pins) are read from the objects.
+    """
+    table = snapshot.scaled_table(field, rows, scale) if rows is not None else []
+    table += [int((getattr(r, field) or 0) * scale) for r in candidates[len(table):]]
+    return table
+
+
+def prune_candidates(
+    candidates: list[Recipe],
+    cal_target: float,
+    pro_target: float,
+    top_k: int | None = None,
+    keep: Collection[int] = (),
+    min_keep: int = 1,
+) -> list[int]:
+    """Indices of the candidates worth giving the solver, in order.
+
+    Recipes with the same ingredient group, calories and protein add the
+    same amounts to every day total at every serving, so the solver cannot
+    tell them apart. Each such set is cut to its first min_keep recipes
+    (enough for every slot of the meal to use a different one), which
+    leaves the optimum unchanged.
+
+    With top_k, each ingredient group (recipes without a main ingredient
+    form one pool) also keeps only its k best by weighted deviation from the
+    per-meal targets at their best serving. This cut is a heuristic and can
+    cost objective. If it leaves fewer than min_keep recipes or ingredient
+    groups, the best-fitting pruned recipes, from new groups first, are
+    added back. Candidates in `keep` always stay.
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    group_keys = [ingredient_group_key(r.main_ingredient) for r in candidates]
+
+    identical: dict[tuple, list[int]] = {}
+    for i, recipe in enumerate(candidates):
+        key = (group_keys[i], recipe.calories or 0, recipe.protein_g or 0)
+        identical.setdefault(key, []).append(i)
+    distinct = sorted(i for members in identical.values() for i in members[:min_keep])
+    if top_k is None:
+        return sorted(set(distinct) | set(keep))
+
+    servings = np.array(SERVING_OPTIONS) / 10
+    cal = np.array([r.calories or 0 for r in candidates], dtype=float)
+    pro = np.array([r.protein_g or 0 for r in candidates], dtype=float)
+    fit = (
+        CAL_WEIGHT * np.abs(np.outer(cal, servings) - cal_target)
+        + PRO_WEIGHT * np.abs(np.outer(pro, servings) - pro_target)
+    ).min(axis=1)
+
+    pools: dict[str | None, list[int]] = {}
+    for i in distinct:
+        pools.setdefault(group_keys[i], []).append(i)
+    kept = set(keep)
+    for members in pools.values():
+        kept.update(sorted(members, key=lambda i: fit[i])[:top_k])
+
+    def model_group(i: int) -> object:
+        # The solver gives every recipe without a main ingredient its own group
+        return group_keys[i] or i
+
+    min_groups = min(min_keep, len({model_group(i) for i in distinct}))
+
+    def short() -> bool:
+        return len(kept) < min_keep or len({model_group(i) for i in kept}) < min_groups
+
+    spare = sorted((i for i in distinct if i not in kept), key=lambda i: fit[i])
+    added = 0
+    while spare and short():
+        groups = {model_group(i) for i in kept}
+        pick = next((i for i in spare if model_group(i) not in groups), spare[0])
+        spare.remove(pick)
+        kept.add(pick)
+        added += 1
+    if added:
+        logger.warning(
+            "Top %d per ingredient group leaves fewer than %d recipes or groups; "
+            "added back %d",
+            top_k,
+            min_keep,
+            added,
+        )
+    return sorted(kept)
+
+
 def build_meal_plan(
     cooking_path: Path,
     config: dict,
@@ -42,8 +188,26 @@ def build_meal_plan(
     exclude: list[str] | None = None,
     pins: list[PinSpec] | None = None,
     recipes: list[Recipe] | None = None,
+    jobs: int = 1,
+    formulation: str = "element",
+    solve_stats: SolveStats | None = None,
+    prune: bool = True,
+    top_k: int | None = None,
+    candidate_filter: Callable[..., list[Recipe]] | None = None,
 ) -> MealPlan | None:
-    """Build an optimized weekly meal plan using CP-SAT."""
+    """Build an optimized weekly meal plan using CP-SAT.
+
+    `formulation` picks how each slot's macros enter the model (see
+    FORMULATIONS); solver status, time and objective go into `solve_stats`
+    if given. Unless `prune` is false, each meal's candidates are first
+    reduced with prune_candidates: recipes the solver cannot tell apart are
+    collapsed, which never changes the optimum, and with `top_k` each
+    ingredient group keeps only its k best-fitting recipes, which can.
+    `candidate_filter` stands in for filter_recipes over `recipes` (see
+    select_candidates), e.g. to reuse filter results cached across plans.
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}, expected one of {FORMULATIONS}")
     num_days = config["schedule"]["plan_days"]
     daily_cal = config["nutrition"]["daily_calories"]
     daily_pro = config["nutrition"]["daily_protein_g"]
@@ -60,12 +224,24 @@ def build_meal_plan(
         if idx >= 0 and idx < num_days:
             cook_day_indices.add(idx)
 
-    # Load all recipes
-    all_recipes = recipes if recipes is not None else load_all_recipes(cooking_path)
+    # Recipe source: an explicit list, the nutrition snapshot, the SQLite
+    # catalog, or the full index
+    snapshot = open_snapshot(cooking_path, jobs=jobs) if recipes is None else None
+    if snapshot is not None:
+        all_recipes = snapshot
+    else:
+        all_recipes = (
+            recipes
+            if recipes is not None
+            else open_recipe_source(cooking_path, jobs=jobs)
+        )
 
-    # Pre-filter candidates per meal type
-    breakfast_candidates = filter_recipes(
-        all_recipes,
+    # Pre-filter candidates per meal type. Snapshot rows are kept so the
+    # macro tables below can be read straight from its columns.
+    def select(**filters) -> tuple[list[Recipe], np.ndarray | None]:
+        return select_candidates(all_recipes, candidate_filter, **filters)
+
+    breakfast_candidates, bf_rows = select(
         meal_type="breakfast",
         max_time=max_batch_time
         if prep_styles["breakfast"] == "batch"
@@ -74,51 +250,43 @@ def build_meal_plan(
         exclude=exclude,
     )
     # For lunch/dinner, include broader categories
-    lunch_candidates = filter_recipes(
-        all_recipes,
+    lunch_candidates, ln_rows = select(
         meal_type="lunch",
         max_time=max_fresh_time,
         dietary_tags=dietary,
         exclude=exclude,
     )
-    dinner_candidates = filter_recipes(
-        all_recipes,
+    dinner_candidates, dn_rows = select(
         meal_type="dinner",
         max_time=max_fresh_time,
         dietary_tags=dietary,
         exclude=exclude,
     )
 
-    # Filter to recipes with calorie data (needed for optimization)
-    breakfast_candidates = [r for r in breakfast_candidates if r.calories is not None]
-    lunch_candidates = [r for r in lunch_candidates if r.calories is not None]
-    dinner_candidates = [r for r in dinner_candidates if r.calories is not None]
-
     if not breakfast_candidates:
         logger.warning("No breakfast candidates found, using all recipes with calories")
-        breakfast_candidates = [r for r in all_recipes if r.calories is not None]
+        breakfast_candidates, bf_rows = select()
     if not dinner_candidates:
         logger.warning("No dinner candidates found, using all recipes with calories")
-        dinner_candidates = [r for r in all_recipes if r.calories is not None]
+        dinner_candidates, dn_rows = select()
     if not lunch_candidates:
         # Lunch can draw from dinner candidates too
-        lunch_candidates = list(dinner_candidates)
+        lunch_candidates, ln_rows = list(dinner_candidates), dn_rows
 
     # Snack candidates (broader pool: snack, appetizer, dessert, side)
     snacks_enabled = "snack" in config["schedule"]["meals_per_day"]
     snack_candidates: list[Recipe] = []
+    sn_rows = None
     if snacks_enabled:
-        snack_candidates = filter_recipes(
-            all_recipes,
+        snack_candidates, sn_rows = select(
             meal_type="snack",
             max_time=max_fresh_time,
             dietary_tags=dietary,
             exclude=exclude,
         )
-        snack_candidates = [r for r in snack_candidates if r.calories is not None]
         if not snack_candidates:
             logger.warning("No snack candidates found, using all recipes with calories")
-            snack_candidates = [r for r in all_recipes if r.calories is not None]
+            snack_candidates, sn_rows = select()
 
     # For batch breakfast: one recipe for all days
     batch_breakfast = prep_styles["breakfast"] == "batch"
@@ -132,8 +300,18 @@ def build_meal_plan(
             "dinner": dinner_candidates,
             "snack": snack_candidates,
         }
+        if isinstance(all_recipes, list):
+            pin_pool = all_recipes
+        else:
+            # Pins only match by name, so load just the recipes that could match
+            matches = {
+                r.file_path: r
+                for pin in pins
+                for r in all_recipes.find_by_name(pin.recipe_query)
+            }
+            pin_pool = [matches[p] for p in sorted(matches)]
         resolved_pins = resolve_pins(
-            pins, candidates_by_meal, all_recipes, num_days, batch_breakfast
+            pins, candidates_by_meal, pin_pool, num_days, batch_breakfast
         )
 
     # Per-meal calorie/protein targets
@@ -144,10 +322,47 @@ def build_meal_plan(
             "pro": daily_pro * meal_alloc[meal],
         }
 
-    # Serving options (fixed-point: multiply by 10 internally)
-    SERVING_OPTIONS = [5, 10, 15, 20, 25, 30, 35, 40]  # 0.5, 1.0 .. 4.0
+    # Pre-solve reduction, after pins so pinned recipes are kept (their
+    # candidate indices are remapped to the reduced lists). Each meal keeps
+    # num_days recipes and groups, enough for the variety constraints.
+    if prune:
+        pinned_by_meal: dict[str, set[int]] = {}
+        for rpin in resolved_pins:
+            pinned_by_meal.setdefault(rpin.meal_type.value, set()).add(rpin.candidate_index)
+        total = pruned = 0
+
+        def reduce(meal: str, candidates: list[Recipe], rows: np.ndarray | None) -> tuple:
+            nonlocal total, pruned
+            kept = prune_candidates(
+                candidates,
+                targets[meal]["cal"],
+                targets[meal]["pro"],
+                top_k=top_k,
+                keep=pinned_by_meal.get(meal, ()),
+                min_keep=num_days,
+            )
+            total += len(candidates)
+            pruned += len(candidates) - len(kept)
+            logger.debug("%s: kept %d of %d candidates", meal, len(kept), len(candidates))
+            new_index = {old: new for new, old in enumerate(kept)}
+            for rpin in resolved_pins:
+                if rpin.meal_type.value == meal:
+                    rpin.candidate_index = new_index[rpin.candidate_index]
+            if rows is not None:
+                rows = rows[[i for i in kept if i < len(rows)]]
+            return [candidates[i] for i in kept], rows
+
+        breakfast_candidates, bf_rows = reduce("breakfast", breakfast_candidates, bf_rows)
+        lunch_candidates, ln_rows = reduce("lunch", lunch_candidates, ln_rows)
+        dinner_candidates, dn_rows = reduce("dinner", dinner_candidates, dn_rows)
+        if snacks_enabled:
+            snack_candidates, sn_rows = reduce("snack", snack_candidates, sn_rows)
+        logger.info("Pruned %d of %d candidates before building the model", pruned, total)
+
+    # Build CP-SAT model (OR-Tools is imported here, not at module load, so
+    # commands that only format or read plans start quickly)
+    from ortools.sat.python import cp_model
 
-    # Build CP-SAT model
     model = cp_model.CpModel()
 
     # Decision variables
@@ -250,82 +465,84 @@ def build_meal_plan(
 
     # Scale factor for fixed-point arithmetic (calories * 10 to match serving encoding)
     SCALE = 10
+    # Upper bound on one slot's calories or protein in SCALE^2 units
+    MEAL_MAX = 100000
 
     # Pre-compute calorie/protein tables (scaled by SCALE)
-    bf_cal_table = [int((r.calories or 0) * SCALE) for r in breakfast_candidates]
-    bf_pro_table = [int((r.protein_g or 0) * SCALE) for r in breakfast_candidates]
-    dn_cal_table = [int((r.calories or 0) * SCALE) for r in dinner_candidates]
-    dn_pro_table = [int((r.protein_g or 0) * SCALE) for r in dinner_candidates]
-    ln_cal_table = [int((r.calories or 0) * SCALE) for r in lunch_candidates]
-    ln_pro_table = [int((r.protein_g or 0) * SCALE) for r in lunch_candidates]
+    bf_cal_table = macro_table(breakfast_candidates, "calories", SCALE, snapshot, bf_rows)
+    bf_pro_table = macro_table(breakfast_candidates, "protein_g", SCALE, snapshot, bf_rows)
+    dn_cal_table = macro_table(dinner_candidates, "calories", SCALE, snapshot, dn_rows)
+    dn_pro_table = macro_table(dinner_candidates, "protein_g", SCALE, snapshot, dn_rows)
+    ln_cal_table = macro_table(lunch_candidates, "calories", SCALE, snapshot, ln_rows)
+    ln_pro_table = macro_table(lunch_candidates, "protein_g", SCALE, snapshot, ln_rows)
 
     if snacks_enabled:
-        sn_cal_table = [int((r.calories or 0) * SCALE) for r in snack_candidates]
-        sn_pro_table = [int((r.protein_g or 0) * SCALE) for r in snack_candidates]
+        sn_cal_table = macro_table(snack_candidates, "calories", SCALE, snapshot, sn_rows)
+        sn_pro_table = macro_table(snack_candidates, "protein_g", SCALE, snapshot, sn_rows)
+
+    # Per-slot (calories, protein) expressions, keyed by slot name so slots
+    # sharing variables (batch breakfast) are only encoded once
+    slot_terms: dict[str, tuple] = {}
+
+    def slot_macros(name, recipe_var, serving_var, cal_table, pro_table) -> tuple:
+        """Scaled calories and protein of one meal slot, as model expressions.
+
+        "element" looks the recipe's macros up with element constraints and
+        multiplies them by the serving variable. "table" precomputes every
+        (recipe, serving) option with its scaled macros and ties the four
+        variables together with one allowed-assignments constraint, so the
+        model has no products; CP-SAT expands the table into one literal per
+        option and the day totals stay linear. Both cap a slot at MEAL_MAX.
+        """
+        if name in slot_terms:
+            return slot_terms[name]
+        if formulation == "table":
+            options = [
+                (i, s, cal_table[i] * s, pro_table[i] * s)
+                for i in range(len(cal_table))
+                for s in SERVING_OPTIONS
+                if cal_table[i] * s <= MEAL_MAX and pro_table[i] * s <= MEAL_MAX
+            ]
+            cal = model.new_int_var(0, MEAL_MAX, f"{name}_meal_cal")
+            pro = model.new_int_var(0, MEAL_MAX, f"{name}_meal_pro")
+            model.add_allowed_assignments([recipe_var, serving_var, cal, pro], options)
+        else:
+            base_cal = model.new_int_var(0, max(cal_table) + 1, f"{name}_base_cal")
+            model.add_element(recipe_var, cal_table, base_cal)
+            cal = model.new_int_var(0, MEAL_MAX, f"{name}_meal_cal")
+            model.add_multiplication_equality(cal, [base_cal, serving_var])
+
+            base_pro = model.new_int_var(0, max(pro_table) + 1, f"{name}_base_pro")
+            model.add_element(recipe_var, pro_table, base_pro)
+            pro = model.new_int_var(0, MEAL_MAX, f"{name}_meal_pro")
+            model.add_multiplication_equality(pro, [base_pro, serving_var])
+        slot_terms[name] = (cal, pro)
+        return cal, pro
 
     for d in range(num_days):
-        day_cal_terms = []
-        day_pro_terms = []
+        slots = []
 
         # Breakfast contribution
         if batch_breakfast:
-            bf_base_cal = model.new_int_var(
-                0, max(bf_cal_table) + 1, f"bf_base_cal_d{d}"
-            )
-            model.add_element(bf_recipe, bf_cal_table, bf_base_cal)
-            bf_meal_cal = model.new_int_var(0, 100000, f"bf_meal_cal_d{d}")
-            model.add_multiplication_equality(bf_meal_cal, [bf_base_cal, bf_servings])
-            day_cal_terms.append(bf_meal_cal)
-
-            bf_base_pro = model.new_int_var(
-                0, max(bf_pro_table) + 1, f"bf_base_pro_d{d}"
-            )
-            model.add_element(bf_recipe, bf_pro_table, bf_base_pro)
-            bf_meal_pro = model.new_int_var(0, 100000, f"bf_meal_pro_d{d}")
-            model.add_multiplication_equality(bf_meal_pro, [bf_base_pro, bf_servings])
-            day_pro_terms.append(bf_meal_pro)
+            slots.append(slot_macros("bf", bf_recipe, bf_servings, bf_cal_table, bf_pro_table))
         else:
-            bf_base_cal = model.new_int_var(
-                0, max(bf_cal_table) + 1, f"bf_base_cal_d{d}"
-            )
-            model.add_element(bf_recipe_vars[d], bf_cal_table, bf_base_cal)
-            bf_meal_cal = model.new_int_var(0, 100000, f"bf_meal_cal_d{d}")
-            model.add_multiplication_equality(
-                bf_meal_cal, [bf_base_cal, bf_serving_vars[d]]
-            )
-            day_cal_terms.append(bf_meal_cal)
-
-            bf_base_pro = model.new_int_var(
-                0, max(bf_pro_table) + 1, f"bf_base_pro_d{d}"
-            )
-            model.add_element(bf_recipe_vars[d], bf_pro_table, bf_base_pro)
-            bf_meal_pro = model.new_int_var(0, 100000, f"bf_meal_pro_d{d}")
-            model.add_multiplication_equality(
-                bf_meal_pro, [bf_base_pro, bf_serving_vars[d]]
+            slots.append(
+                slot_macros(
+                    f"bf_d{d}", bf_recipe_vars[d], bf_serving_vars[d], bf_cal_table, bf_pro_table
+                )
             )
-            day_pro_terms.append(bf_meal_pro)
 
         # Dinner contribution
         if d in dinner_recipe_vars:
-            dn_base_cal = model.new_int_var(
-                0, max(dn_cal_table) + 1, f"dn_base_cal_d{d}"
-            )
-            model.add_element(dinner_recipe_vars[d], dn_cal_table, dn_base_cal)
-            dn_meal_cal = model.new_int_var(0, 100000, f"dn_meal_cal_d{d}")
-            model.add_multiplication_equality(
-                dn_meal_cal, [dn_base_cal, dinner_serving_vars[d]]
-            )
-            day_cal_terms.append(dn_meal_cal)
-
-            dn_base_pro = model.new_int_var(
-                0, max(dn_pro_table) + 1, f"dn_base_pro_d{d}"
-            )
-            model.add_element(dinner_recipe_vars[d], dn_pro_table, dn_base_pro)
-            dn_meal_pro = model.new_int_var(0, 100000, f"dn_meal_pro_d{d}")
-            model.add_multiplication_equality(
-                dn_meal_pro, [dn_base_pro, dinner_serving_vars[d]]
+            slots.append(
+                slot_macros(
+                    f"dn_d{d}",
+                    dinner_recipe_vars[d],
+                    dinner_serving_vars[d],
+                    dn_cal_table,
+                    dn_pro_table,
+                )
             )
-            day_pro_terms.append(dn_meal_pro)
         else:
             # Leftover dinner from nearest previous cook day
             prev_cook = None
@@ -345,51 +562,27 @@ def build_meal_plan(
                     f"dn_lo_servings_d{d}",
                 )
                 dinner_lo_serving_vars[d] = lo_serving
-                dn_base_cal = model.new_int_var(
-                    0, max(dn_cal_table) + 1, f"dn_lo_base_cal_d{d}"
-                )
-                model.add_element(
-                    dinner_recipe_vars[prev_cook], dn_cal_table, dn_base_cal
-                )
-                dn_meal_cal = model.new_int_var(0, 100000, f"dn_lo_meal_cal_d{d}")
-                model.add_multiplication_equality(
-                    dn_meal_cal, [dn_base_cal, lo_serving]
-                )
-                day_cal_terms.append(dn_meal_cal)
-
-                dn_base_pro = model.new_int_var(
-                    0, max(dn_pro_table) + 1, f"dn_lo_base_pro_d{d}"
-                )
-                model.add_element(
-                    dinner_recipe_vars[prev_cook], dn_pro_table, dn_base_pro
-                )
-                dn_meal_pro = model.new_int_var(0, 100000, f"dn_lo_meal_pro_d{d}")
-                model.add_multiplication_equality(
-                    dn_meal_pro, [dn_base_pro, lo_serving]
+                slots.append(
+                    slot_macros(
+                        f"dn_lo_d{d}",
+                        dinner_recipe_vars[prev_cook],
+                        lo_serving,
+                        dn_cal_table,
+                        dn_pro_table,
+                    )
                 )
-                day_pro_terms.append(dn_meal_pro)
 
         # Lunch contribution
         if d in lunch_recipe_vars:
-            ln_base_cal = model.new_int_var(
-                0, max(ln_cal_table) + 1, f"ln_base_cal_d{d}"
-            )
-            model.add_element(lunch_recipe_vars[d], ln_cal_table, ln_base_cal)
-            ln_meal_cal = model.new_int_var(0, 100000, f"ln_meal_cal_d{d}")
-            model.add_multiplication_equality(
-                ln_meal_cal, [ln_base_cal, lunch_serving_vars[d]]
-            )
-            day_cal_terms.append(ln_meal_cal)
-
-            ln_base_pro = model.new_int_var(
-                0, max(ln_pro_table) + 1, f"ln_base_pro_d{d}"
-            )
-            model.add_element(lunch_recipe_vars[d], ln_pro_table, ln_base_pro)
-            ln_meal_pro = model.new_int_var(0, 100000, f"ln_meal_pro_d{d}")
-            model.add_multiplication_equality(
-                ln_meal_pro, [ln_base_pro, lunch_serving_vars[d]]
+            slots.append(
+                slot_macros(
+                    f"ln_d{d}",
+                    lunch_recipe_vars[d],
+                    lunch_serving_vars[d],
+                    ln_cal_table,
+                    ln_pro_table,
+                )
             )
-            day_pro_terms.append(ln_meal_pro)
         elif lunch_is_leftover:
             # Lunch from previous dinner leftovers
             source_day = d - 1 if d > 0 else num_days - 1
@@ -409,43 +602,30 @@ def build_meal_plan(
                     f"ln_lo_servings_d{d}",
                 )
                 lunch_lo_serving_vars[d] = lo_serving
-                ln_base_cal = model.new_int_var(
-                    0, max(dn_cal_table) + 1, f"ln_lo_base_cal_d{d}"
-                )
-                model.add_element(
-                    dinner_recipe_vars[source_cook], dn_cal_table, ln_base_cal
+                slots.append(
+                    slot_macros(
+                        f"ln_lo_d{d}",
+                        dinner_recipe_vars[source_cook],
+                        lo_serving,
+                        dn_cal_table,
+                        dn_pro_table,
+                    )
                 )
-                ln_meal_cal = model.new_int_var(0, 100000, f"ln_lo_meal_cal_d{d}")
-                model.add_multiplication_equality(
-                    ln_meal_cal, [ln_base_cal, lo_serving]
-                )
-                day_cal_terms.append(ln_meal_cal)
-
-                ln_base_pro = model.new_int_var(
-                    0, max(dn_pro_table) + 1, f"ln_lo_base_pro_d{d}"
-                )
-                model.add_element(
-                    dinner_recipe_vars[source_cook], dn_pro_table, ln_base_pro
-                )
-                ln_meal_pro = model.new_int_var(0, 100000, f"ln_lo_meal_pro_d{d}")
-                model.add_multiplication_equality(
-                    ln_meal_pro, [ln_base_pro, lo_serving]
-                )
-                day_pro_terms.append(ln_meal_pro)
 
         # Snack contribution
         if snacks_enabled and d in snack_recipe_vars:
-            sn_base_cal = model.new_int_var(0, max(sn_cal_table) + 1, f"sn_base_cal_d{d}")
-            model.add_element(snack_recipe_vars[d], sn_cal_table, sn_base_cal)
-            sn_meal_cal = model.new_int_var(0, 100000, f"sn_meal_cal_d{d}")
-            model.add_multiplication_equality(sn_meal_cal, [sn_base_cal, snack_serving_vars[d]])
-            day_cal_terms.append(sn_meal_cal)
-
-            sn_base_pro = model.new_int_var(0, max(sn_pro_table) + 1, f"sn_base_pro_d{d}")
-            model.add_element(snack_recipe_vars[d], sn_pro_table, sn_base_pro)
-            sn_meal_pro = model.new_int_var(0, 100000, f"sn_meal_pro_d{d}")
-            model.add_multiplication_equality(sn_meal_pro, [sn_base_pro, snack_serving_vars[d]])
-            day_pro_terms.append(sn_meal_pro)
+            slots.append(
+                slot_macros(
+                    f"sn_d{d}",
+                    snack_recipe_vars[d],
+                    snack_serving_vars[d],
+                    sn_cal_table,
+                    sn_pro_table,
+                )
+            )
+
+        day_cal_terms = [cal for cal, _ in slots]
+        day_pro_terms = [pro for _, pro in slots]
 
         # Day total cal/pro (in SCALE^2 units: cal*10 * servings*10 = cal*100)
         day_total_cal = model.new_int_var(0, 1000000, f"day_total_cal_d{d}")
@@ -514,7 +694,8 @@ def build_meal_plan(
     # Objective: minimize weighted deviations
     total_penalty = model.new_int_var(0, 100000000, "total_penalty")
     model.add(
-        total_penalty == 10 * sum(cal_penalty_terms) + 15 * sum(pro_penalty_terms)
+        total_penalty
+        == CAL_WEIGHT * sum(cal_penalty_terms) + PRO_WEIGHT * sum(pro_penalty_terms)
     )
     model.minimize(total_penalty)
 
@@ -523,6 +704,22 @@ def build_meal_plan(
     solver.parameters.max_time_in_seconds = 30.0
     status = solver.solve(model)
 
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    if solve_stats is not None:
+        solve_stats.formulation = formulation
+        solve_stats.status = solver.status_name(status)
+        solve_stats.solve_s = solver.wall_time
+        solve_stats.objective = solver.objective_value if solved else None
+        solve_stats.variables = len(model.proto.variables)
+        solve_stats.constraints = len(model.proto.constraints)
+    logger.info(
+        "Solver (%s formulation): %s in %.2fs, objective %s",
+        formulation,
+        solver.status_name(status),
+        solver.wall_time,
+        f"{solver.objective_value:.0f}" if solved else "n/a",
+    )
+
     if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         logger.error("Solver could not find a feasible plan")
         return None
@@ -741,7 +938,12 @@ def format_plan_markdown(plan: MealPlan) -> str:
 
 def format_plan_json(plan: MealPlan) -> str:
     """Format a meal plan as JSON."""
-    data = {
+    return json.dumps(plan_to_dict(plan), indent=2)
+
+
+def plan_to_dict(plan: MealPlan) -> dict:
+    """JSON-ready dict for a meal plan (the plan --format json document)."""
+    return {
         "start_date": plan.start_date,
         "end_date": plan.end_date,
         "days": plan.days,
@@ -763,29 +965,18 @@ def format_plan_json(plan: MealPlan) -> str:
             for s in plan.slots
         ],
     }
-    return json.dumps(data, indent=2)
 
 
-def run_plan(
-    cooking_path: Path,
-    vault_path: Path,
-    start_date: str | None = None,
+def apply_plan_options(
+    config: dict,
     days: int | None = None,
     calories: int | None = None,
     protein: int | None = None,
     cook_days: str | None = None,
-    pantry: str | None = None,
-    exclude: str | None = None,
-    output_format: str = "markdown",
     snacks: bool = False,
-    pins: list[str] | None = None,
-    shopping_list: bool = False,
-    save_plan: str | None = None,
-    recipes: bool = False,
     require_groups: list[str] | None = None,
-) -> None:
-    """CLI entry point for plan command."""
-    config = load_config(vault_path)
+) -> dict:
+    """Apply the plan command's option overrides to a loaded config."""
     config = apply_cli_overrides(
         config,
         calories=calories,
@@ -810,13 +1001,59 @@ def run_plan(
                 alloc[k] = alloc[k] / total_existing * 0.85
             alloc["snack"] = 0.15
 
+    return config
+
+
+def run_plan(
+    cooking_path: Path,
+    vault_path: Path,
+    start_date: str | None = None,
+    days: int | None = None,
+    calories: int | None = None,
+    protein: int | None = None,
+    cook_days: str | None = None,
+    pantry: str | None = None,
+    exclude: str | None = None,
+    output_format: str = "markdown",
+    snacks: bool = False,
+    pins: list[str] | None = None,
+    shopping_list: bool = False,
+    save_plan: str | None = None,
+    recipes: bool = False,
+    require_groups: list[str] | None = None,
+    jobs: int = 1,
+    formulation: str = "element",
+    prune: bool = True,
+    top_k: int | None = None,
+) -> None:
+    """CLI entry point for plan command."""
+    config = apply_plan_options(
+        load_config(vault_path),
+        days=days,
+        calories=calories,
+        protein=protein,
+        cook_days=cook_days,
+        snacks=snacks,
+        require_groups=require_groups,
+    )
+
     pantry_items = [p.strip() for p in pantry.split(",")] if pantry else None
     exclude_list = [e.strip() for e in exclude.split(",")] if exclude else None
 
     from meal_planner.pins import parse_pin
     parsed_pins = [parse_pin(p) for p in (pins or [])]
 
-    plan = build_meal_plan(cooking_path, config, pantry_items, exclude_list, parsed_pins)
+    plan = build_meal_plan(
+        cooking_path,
+        config,
+        pantry_items,
+        exclude_list,
+        parsed_pins,
+        jobs=jobs,
+        formulation=formulation,
+        prune=prune,
+        top_k=top_k,
+    )
 
     if plan is None:
         sys.exit(1)
@@ -0,0 +1,181 @@
+"""Persistent on-disk recipe index keyed by file path, mtime and size."""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from meal_planner.indexer import discover_recipe_files, parse_recipe_files
+from meal_planner.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = ".meal-planner"
+INDEX_FILE = "recipes.pickle"
+# Written by nutrition_snapshot and catalog; located here so callers can
+# check for them without importing NumPy or sqlite3
+SNAPSHOT_DIR = "nutrition"
+CATALOG_FILE = "catalog.sqlite"
+
+# Bump whenever the Recipe layout or the parsing rules change so that stale
+# pickles are discarded instead of being loaded into the new classes.
+INDEX_VERSION = 4
+
+
+def find_stale_files(
+    files: list[Path], known: Mapping[str, tuple[int, int]]
+) -> list[tuple[Path, os.stat_result]]:
+    """Return files whose (mtime_ns, size) differ from `known`, with their stat.
+
+    `known` maps str(path) to the (mtime_ns, size) recorded when the file was
+    last parsed. Files that vanish while being checked are skipped.
+    """
+    stale: list[tuple[Path, os.stat_result]] = []
+    for f in files:
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        if known.get(str(f)) != (st.st_mtime_ns, st.st_size):
+            stale.append((f, st))
+    return stale
+
+
+@dataclass
+class IndexEntry:
+    mtime_ns: int
+    size: int
+    recipe: Recipe | None  # None for non-recipe or unparseable files
+
+
+@dataclass
+class RecipeIndex:
+    """Parsed recipes cached by file, re-parsed only when mtime or size change."""
+
+    path: Path
+    entries: dict[str, IndexEntry] = field(default_factory=dict)
+    dirty: bool = False
+
+    def refresh(self, files: list[Path], prune: bool = True, jobs: int = 1) -> int:
+        """Re-parse files whose mtime or size changed since the last refresh.
+
+        With prune=True, entries for files not in `files` are dropped (the
+        caller passed the full directory listing). Stale files are parsed
+        across `jobs` processes. Returns the number of files (re-)parsed.
+        """
+        known = {k: (e.mtime_ns, e.size) for k, e in self.entries.items()}
+        stale = find_stale_files(files, known)
+        seen = {str(f) for f in files}
+
+        parsed = parse_recipe_files([f for f, _ in stale], jobs=jobs)
+        for (f, st), recipe in zip(stale, parsed):
+            self.entries[str(f)] = IndexEntry(
+                mtime_ns=st.st_mtime_ns,
+                size=st.st_size,
+                recipe=recipe,
+            )
+
+        removed = 0
+        if prune:
+            for key in [k for k in self.entries if k not in seen]:
+                del self.entries[key]
+                removed += 1
+
+        if stale or removed:
+            self.dirty = True
+            logger.debug(
+                "Recipe index: %d re-parsed, %d removed, %d cached",
+                len(stale),
+                removed,
+                len(self.entries) - len(stale),
+            )
+
+        return len(stale)
+
+    def invalidate(self, files: list[Path]) -> None:
+        """Drop entries so the next refresh re-parses these files."""
+        for f in files:
+            if self.entries.pop(str(f), None) is not None:
+                self.dirty = True
+
+    def get(self, file_path: Path) -> Recipe | None:
+        entry = self.entries.get(str(file_path))
+        return entry.recipe if entry is not None else None
+
+    def recipes(self, files: list[Path]) -> list[Recipe]:
+        """Return indexed recipes for `files`, preserving their order."""
+        result = []
+        for f in files:
+            recipe = self.get(f)
+            if recipe is not None:
+                result.append(recipe)
+        return result
+
+    def save(self) -> None:
+        """Write the index atomically if it changed since loading."""
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    (INDEX_VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write recipe index %s: %s", self.path, e)
+            return
+        self.dirty = False
+
+
+def index_path(cooking_path: Path) -> Path:
+    """Location of the persistent recipe index for a cooking directory."""
+    return cooking_path / INDEX_DIR / INDEX_FILE
+
+
+def snapshot_path(cooking_path: Path) -> Path:
+    """Location of the nutrition snapshot directory for a cooking directory."""
+    return cooking_path / INDEX_DIR / SNAPSHOT_DIR
+
+
+def catalog_path(cooking_path: Path) -> Path:
+    """Location of the SQLite catalog for a cooking directory."""
+    return cooking_path / INDEX_DIR / CATALOG_FILE
+
+
+def load_recipe_index(cooking_path: Path) -> RecipeIndex:
+    """Load the persistent index, starting empty if missing or outdated."""
+    path = index_path(cooking_path)
+    index = RecipeIndex(path=path)
+
+    try:
+        with open(path, "rb") as f:
+            version, entries = pickle.load(f)
+    except FileNotFoundError:
+        return index
+    except Exception as e:
+        logger.debug("Discarding unreadable recipe index %s: %s", path, e)
+        return index
+
+    if version != INDEX_VERSION:
+        logger.debug("Discarding recipe index with version %s", version)
+        return index
+
+    index.entries = entries
+    return index
+
+
+def load_recipes(
+    cooking_path: Path, limit: int | None = None, jobs: int = 1
+) -> list[Recipe]:
+    """Load all recipes through the persistent index, refreshing stale files."""
+    files = discover_recipe_files(cooking_path, limit=limit)
+    index = load_recipe_index(cooking_path)
+    index.refresh(files, prune=limit is None, jobs=jobs)
+    index.save()
+    return index.recipes(files)
@@ -2,47 +2,38 @@
 
 from __future__ import annotations
 
-import re
+import functools
+from collections.abc import Callable
 from pathlib import Path
 
+from meal_planner.markdown_sections import find_section
 from meal_planner.models import MealPlan, Recipe
 from meal_planner.scaler import scale_recipe
 
 
 def extract_directions(file_path: Path) -> str | None:
     """Extract the Directions section from a recipe markdown file."""
-    try:
-        text = file_path.read_text()
-    except OSError:
-        return None
-
-    # Strip YAML frontmatter
-    if text.startswith("---"):
-        end = text.find("---", 3)
-        if end != -1:
-            text = text[end + 3:]
-
-    # Find ### Directions (or ## Directions)
-    match = re.search(r"^#{2,3}\s+Directions\s*$", text, re.MULTILINE)
-    if not match:
-        return None
-
-    start = match.end()
-    # Capture until next heading of same or higher level, or EOF
-    next_heading = re.search(r"^#{2,3}\s+", text[start:], re.MULTILINE)
-    if next_heading:
-        directions = text[start : start + next_heading.start()]
-    else:
-        directions = text[start:]
-
-    return directions.strip() or None
-
-
-def _load_recipe_with_ingredients(file_path: Path) -> Recipe | None:
-    """Load a recipe from disk, returning it only if it has parsed ingredients."""
-    from meal_planner.indexer import parse_recipe_file
-
-    recipe = parse_recipe_file(file_path)
+    from meal_planner.indexer import read_recipe_sections
+
+    return find_section(read_recipe_sections(file_path), "directions")
+
+
+def _load_recipe_with_ingredients(
+    slot_recipe: Recipe, indexed: Callable[[], dict[Path, Recipe]]
+) -> Recipe | None:
+    """Return the slot recipe, or its indexed copy, if it has parsed ingredients.
+
+    `indexed` returns the recipe index by path; it is only called when the
+    slot recipe has no parsed ingredients of its own.
+    """
+    if slot_recipe.parsed_ingredients:
+        return slot_recipe
+
+    recipe = indexed().get(slot_recipe.file_path)
+    if recipe is None:
+        from meal_planner.indexer import parse_recipe_file
+
+        recipe = parse_recipe_file(slot_recipe.file_path)
     if recipe and recipe.parsed_ingredients:
         return recipe
     return None
@@ -67,11 +58,17 @@ def render_plan_recipes(plan: MealPlan, cooking_path: Path) -> str:
     if not recipe_specs:
         return ""
 
+    @functools.cache
+    def indexed() -> dict[Path, Recipe]:
+        from meal_planner.recipe_index import load_recipes
+
+        return {r.file_path: r for r in load_recipes(cooking_path)}
+
     lines = ["## Recipes", ""]
 
     for name, servings, slot_recipe in recipe_specs:
-        # Load full recipe from disk (need parsed_ingredients)
-        recipe = _load_recipe_with_ingredients(slot_recipe.file_path)
+        # Plan recipes usually carry parsed_ingredients; otherwise use the index
+        recipe = _load_recipe_with_ingredients(slot_recipe, indexed)
         if recipe is None:
             lines.append(f"### {name} ({servings:.1f}x)")
             lines.append("")
@@ -104,8 +101,8 @@ def render_plan_recipes(plan: MealPlan, cooking_path: Path) -> str:
                     lines.append(f"- {item['item']}{notes}")
             lines.append("")
 
-        # Directions
-        directions = extract_directions(slot_recipe.file_path)
+        # Directions (body sections are cached on the recipe after first read)
+        directions = recipe.section("directions")
         if directions:
             lines.append("#### Directions")
             lines.append("")
@@ -8,42 +8,66 @@ import sys
 from difflib import SequenceMatcher
 from pathlib import Path
 
-from meal_planner.indexer import discover_recipe_files, parse_recipe_file
 from meal_planner.models import Recipe
+from meal_planner.recipe_index import catalog_path, load_recipes
 
 logger = logging.getLogger(__name__)
 
 
-def fuzzy_match_recipe(name: str, cooking_path: Path) -> Recipe | None:
-    """Find the best matching recipe by fuzzy name matching."""
-    files = discover_recipe_files(cooking_path)
+def best_name_match(name: str, names: list[str]) -> str | None:
+    """Return the closest recipe name by exact, substring, then fuzzy matching."""
     name_lower = name.lower()
+    lowered = [(candidate, candidate.lower()) for candidate in names]
 
-    best_match: tuple[float, Path | None] = (0.0, None)
-
-    for f in files:
-        stem_lower = f.stem.lower()
-
-        # Exact match
+    # Exact match
+    for candidate, stem_lower in lowered:
         if stem_lower == name_lower:
-            recipe = parse_recipe_file(f)
-            if recipe:
-                return recipe
+            return candidate
 
+    best_match: tuple[float, str | None] = (0.0, None)
+    matcher = SequenceMatcher(None, name_lower)
+
+    for candidate, stem_lower in lowered:
+        matcher.set_seq2(stem_lower)
         # Substring match gets a boost
-        score = SequenceMatcher(None, name_lower, stem_lower).ratio()
-        if name_lower in stem_lower or stem_lower in name_lower:
+        is_substring = name_lower in stem_lower or stem_lower in name_lower
+        # ratio() can only be lower than these cheap upper bounds, so most
+        # candidates are rejected without computing it
+        if not is_substring and (
+            matcher.real_quick_ratio() <= best_match[0]
+            or matcher.quick_ratio() <= best_match[0]
+        ):
+            continue
+
+        score = matcher.ratio()
+        if is_substring:
             score = max(score, 0.8)
 
         if score > best_match[0]:
-            best_match = (score, f)
+            best_match = (score, candidate)
 
     if best_match[1] and best_match[0] > 0.4:
-        return parse_recipe_file(best_match[1])
+        return best_match[1]
 
     return None
 
 
+def fuzzy_match_recipe(name: str, cooking_path: Path, jobs: int = 1) -> Recipe | None:
+    """Find the best matching recipe by fuzzy name matching."""
+    if catalog_path(cooking_path).exists():
+        from meal_planner.catalog import open_catalog
+
+        catalog = open_catalog(cooking_path, jobs=jobs)
+        if catalog is not None:
+            # Match on names alone, then load only the winning recipe
+            match = best_name_match(name, catalog.names())
+            return catalog.get_by_names([match]).get(match) if match else None
+
+    recipes = {r.name: r for r in load_recipes(cooking_path, jobs=jobs)}
+    match = best_name_match(name, list(recipes))
+    return recipes[match] if match else None
+
+
 def round_to_fraction(qty: float) -> str:
     """Round a quantity to a practical cooking fraction."""
     if qty == 0:
@@ -190,9 +214,10 @@ def run_scale(
     recipe_name: str,
     servings: float,
     output_format: str = "markdown",
+    jobs: int = 1,
 ) -> None:
     """CLI entry point for scale command."""
-    recipe = fuzzy_match_recipe(recipe_name, cooking_path)
+    recipe = fuzzy_match_recipe(recipe_name, cooking_path, jobs=jobs)
 
     if not recipe:
         logger.error("Recipe not found: %s", recipe_name)
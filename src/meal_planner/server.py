@@ -0,0 +1,435 @@
+"""Long-running planner service speaking JSON-RPC 2.0 over stdio or a Unix socket.
+
+`meal-planner serve` pays Python startup, the OR-Tools import and the recipe
+load once. After that, plan, suggest, scale, shopping_list and swap requests
+are answered from memory. Messages are newline-delimited JSON, one request or
+batch per line. Recipe files are re-checked (stat only) on every request, so
+edits made in Obsidian are picked up without restarting.
+
+    {"jsonrpc": "2.0", "id": 1, "method": "suggest",
+     "params": {"meal_type": "dinner", "max_time": 30, "limit": 5}}
+"""
+
+from __future__ import annotations
+
+import copy
+import inspect
+import json
+import logging
+import os
+import socketserver
+import stat
+import sys
+import threading
+from pathlib import Path
+from typing import TextIO
+
+from meal_planner.config import config_path, load_config
+from meal_planner.indexer import discover_recipe_files
+from meal_planner.models import MealPlan, MealSlot, MealType, PrepStyle, Recipe
+from meal_planner.pins import parse_pin
+from meal_planner.planner import (
+    FORMULATIONS,
+    apply_plan_options,
+    build_meal_plan,
+    format_plan_markdown,
+    get_day_index,
+    plan_to_dict,
+)
+from meal_planner.recipe_index import load_recipe_index
+from meal_planner.scaler import best_name_match, scale_recipe
+from meal_planner.shopping import build_shopping_sections
+from meal_planner.suggest import filter_recipes, score_recipe, scored_to_dicts
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("plan", "suggest", "scale", "shopping_list", "swap")
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVICE_ERROR = -32000
+
+
+class ServiceError(Exception):
+    """A request that is well-formed but cannot be served (e.g. no plan yet)."""
+
+
+def _split(value: str | list[str] | None) -> list[str] | None:
+    """Accept either a list or the CLI's comma-separated form."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip() for v in value if v.strip()] or None
+
+
+def _freeze(value: object) -> object:
+    return tuple(value) if isinstance(value, list) else value
+
+
+class PlannerService:
+    """Recipes, filtered candidate lists, config and the current plan, kept warm."""
+
+    def __init__(self, cooking_path: Path, vault_path: Path, jobs: int = 1) -> None:
+        self.cooking_path = cooking_path
+        self.vault_path = vault_path
+        self.jobs = jobs
+        self.plan: MealPlan | None = None
+        self._lock = threading.Lock()
+        self._index = load_recipe_index(cooking_path)
+        self._recipes: list[Recipe] | None = None
+        self._by_name: dict[str, Recipe] = {}
+        self._candidates: dict[tuple, list[Recipe]] = {}
+        self._config: tuple[int | None, dict] | None = None
+        self.recipes()
+
+    # -- Cached state -------------------------------------------------------
+
+    def recipes(self) -> list[Recipe]:
+        """All recipes, refreshed from the persistent index if files changed."""
+        files = discover_recipe_files(self.cooking_path)
+        self._index.refresh(files, jobs=self.jobs)
+        if self._index.dirty or self._recipes is None:
+            self._index.save()
+            self._recipes = self._index.recipes(files)
+            self._by_name = {r.name: r for r in self._recipes}
+            self._candidates.clear()
+        return self._recipes
+
+    def candidates(self, **filters: object) -> list[Recipe]:
+        """filter_recipes over the loaded recipes, memoized per filter set."""
+        recipes = self.recipes()
+        key = tuple(sorted((k, _freeze(v)) for k, v in filters.items()))
+        if key not in self._candidates:
+            self._candidates[key] = filter_recipes(recipes, **filters)
+        return self._candidates[key]
+
+    def config(self) -> dict:
+        """A private copy of the preferences, re-read when the file changes."""
+        try:
+            mtime_ns = config_path(self.vault_path).stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if self._config is None or self._config[0] != mtime_ns:
+            self._config = (mtime_ns, load_config(self.vault_path))
+        # load_config shares nested dicts with DEFAULTS; requests mutate theirs
+        return copy.deepcopy(self._config[1])
+
+    def find_recipe(self, name: str) -> Recipe:
+        self.recipes()
+        match = best_name_match(name, list(self._by_name))
+        if match is None:
+            raise ServiceError(f"Recipe not found: {name}")
+        return self._by_name[match]
+
+    # -- RPC methods --------------------------------------------------------
+
+    def rpc_plan(
+        self,
+        days: int | None = None,
+        calories: int | None = None,
+        protein: int | None = None,
+        cook_days: str | None = None,
+        pantry: str | list[str] | None = None,
+        exclude: str | list[str] | None = None,
+        snacks: bool = False,
+        pins: list[str] | None = None,
+        require_groups: list[str] | None = None,
+        markdown: bool = False,
+        formulation: str = "element",
+        prune: bool = True,
+        top_k: int | None = None,
+    ) -> dict:
+        """Build a new plan (same options as `plan`) and make it the current one.
+
+        Candidates come from the same memoized filters as suggest.
+        """
+        if formulation not in FORMULATIONS:
+            raise ServiceError(f"Unknown formulation: {formulation}")
+        if top_k is not None and top_k < 1:
+            raise ServiceError("top_k must be at least 1")
+        config = apply_plan_options(
+            self.config(),
+            days=days,
+            calories=calories,
+            protein=protein,
+            cook_days=cook_days,
+            snacks=snacks,
+            require_groups=require_groups,
+        )
+        try:
+            parsed_pins = [parse_pin(p) for p in pins or []]
+        except ValueError as e:
+            raise ServiceError(str(e)) from e
+
+        plan = build_meal_plan(
+            self.cooking_path,
+            config,
+            _split(pantry),
+            _split(exclude),
+            parsed_pins,
+            recipes=self.recipes(),
+            formulation=formulation,
+            prune=prune,
+            top_k=top_k,
+            candidate_filter=self.candidates,
+        )
+        if plan is None:
+            raise ServiceError("Solver could not find a feasible plan")
+        self.plan = plan
+        return self._plan_result(markdown)
+
+    def rpc_suggest(
+        self,
+        meal_type: str | None = None,
+        max_time: int | None = None,
+        cuisine: str | None = None,
+        dietary_tags: str | list[str] | None = None,
+        exclude: str | list[str] | None = None,
+        available_ingredients: str | list[str] | None = None,
+        target_calories: int | None = None,
+        target_protein: int | None = None,
+        min_protein: float | None = None,
+        max_calories: float | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Ranked suggestions, as `suggest --format json` prints them."""
+        candidates = self.candidates(
+            meal_type=meal_type,
+            max_time=max_time,
+            cuisine=cuisine,
+            dietary_tags=_split(dietary_tags),
+            exclude=_split(exclude),
+            min_protein=min_protein,
+            max_calories=max_calories,
+        )
+        pantry = _split(available_ingredients)
+        scored = [
+            score_recipe(
+                r,
+                pantry_items=pantry,
+                target_calories=target_calories,
+                target_protein=target_protein,
+            )
+            for r in candidates
+        ]
+        scored.sort(key=lambda s: s.score, reverse=True)
+        return scored_to_dicts(scored[:limit])
+
+    def rpc_scale(self, recipe: str, servings: float) -> dict:
+        """A recipe's ingredients scaled to `servings`, as `scale --format json`."""
+        found = self.find_recipe(recipe)
+        if not found.parsed_ingredients:
+            raise ServiceError(
+                f"Recipe '{found.name}' has no parsed ingredients. Run 'index' first."
+            )
+        return scale_recipe(found, servings)
+
+    def rpc_shopping_list(
+        self,
+        plan: dict | None = None,
+        pantry: str | list[str] | None = None,
+    ) -> dict[str, list[dict]]:
+        """Shopping list sections for `plan` (a plan JSON dict) or the current plan."""
+        if plan is None:
+            if self.plan is None:
+                raise ServiceError("No plan yet: call plan first or pass one")
+            plan = plan_to_dict(self.plan)
+
+        pantry_staples = self.config().get("pantry_staples", []) + (
+            _split(pantry) or []
+        )
+        return build_shopping_sections(
+            plan, self.cooking_path, pantry_staples, recipes=self.recipes()
+        )
+
+    def rpc_swap(
+        self,
+        day: int | str,
+        meal_type: str,
+        recipe: str,
+        servings: float | None = None,
+    ) -> dict:
+        """Replace one meal in the current plan and return the updated plan.
+
+        Slots that share the same cooking (a batch breakfast, or a dinner and
+        its leftovers) are swapped together and keep their servings, unless
+        `servings` is given for the chosen slot.
+        """
+        if self.plan is None:
+            raise ServiceError("No plan yet: call plan first")
+        day_idx = day if isinstance(day, int) else get_day_index(day)
+        try:
+            meal = MealType(meal_type.lower())
+        except ValueError as e:
+            raise ServiceError(f"Unknown meal type: {meal_type}") from e
+
+        target = next(
+            (s for s in self.plan.slots if s.day == day_idx and s.meal_type == meal),
+            None,
+        )
+        if target is None:
+            raise ServiceError(f"No {meal.value} on day {day} in the current plan")
+
+        new_recipe = self.find_recipe(recipe)
+        linked = [s for s in self.plan.slots if _same_cooking(s, target)]
+        if servings is not None:
+            target.servings = servings
+        for slot in linked:
+            slot.recipe = new_recipe
+            slot.calories = (new_recipe.calories or 0) * slot.servings
+            slot.protein_g = (new_recipe.protein_g or 0) * slot.servings
+        return self._plan_result(markdown=False)
+
+    def _plan_result(self, markdown: bool) -> dict:
+        result = plan_to_dict(self.plan)
+        if markdown:
+            result["markdown"] = format_plan_markdown(self.plan)
+        return result
+
+    # -- JSON-RPC dispatch --------------------------------------------------
+
+    def handle(self, request: object) -> dict | None:
+        """Answer one decoded JSON-RPC request; None for notifications."""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0":
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        req_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params", {})
+
+        if method not in METHODS:
+            response = _error(req_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        elif not isinstance(params, dict):
+            response = _error(req_id, INVALID_PARAMS, "params must be an object")
+        else:
+            handler = getattr(self, f"rpc_{method}")
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as e:
+                response = _error(req_id, INVALID_PARAMS, str(e))
+            else:
+                response = self._call(req_id, handler, params)
+
+        return response if "id" in request else None
+
+    def _call(self, req_id: object, handler, params: dict) -> dict:
+        try:
+            with self._lock:
+                result = handler(**params)
+        except ServiceError as e:
+            return _error(req_id, SERVICE_ERROR, str(e))
+        except Exception as e:
+            logger.exception("Error handling %s", handler.__name__)
+            return _error(req_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+    def handle_line(self, line: str) -> str | None:
+        """Answer one line of newline-delimited JSON-RPC (a request or a batch)."""
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            return json.dumps(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+
+        if isinstance(message, list):
+            if not message:
+                return json.dumps(_error(None, INVALID_REQUEST, "Empty batch"))
+            responses = [r for r in map(self.handle, message) if r is not None]
+            return json.dumps(responses) if responses else None
+
+        response = self.handle(message)
+        return json.dumps(response) if response is not None else None
+
+
+def _same_cooking(slot: MealSlot, target: MealSlot) -> bool:
+    """Whether `slot` is served from the same cooked recipe as `target`."""
+    if slot is target:
+        return True
+    if slot.recipe is None or target.recipe is None or slot.recipe.name != target.recipe.name:
+        return False
+    shared = (PrepStyle.BATCH, PrepStyle.LEFTOVER)
+    return slot.prep_style in shared or target.prep_style in shared
+
+
+def _error(req_id: object, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
+
+
+def serve_stdio(
+    service: PlannerService, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout
+) -> None:
+    """Serve requests read line by line from stdin until EOF."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = service.handle_line(line)
+        if response is not None:
+            stdout.write(response + "\n")
+            stdout.flush()
+
+
+class _RpcHandler(socketserver.StreamRequestHandler):
+    service: PlannerService
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            line = raw.decode("utf-8")
+            if not line.strip():
+                continue
+            response = self.service.handle_line(line)
+            if response is not None:
+                self.wfile.write((response + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+
+def serve_unix(service: PlannerService, socket_path: Path) -> None:
+    """Serve requests on a Unix domain socket until interrupted.
+
+    A socket left at `socket_path` by an earlier run is replaced; any other
+    file there raises FileExistsError.
+    """
+    try:
+        mode = socket_path.lstat().st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{socket_path} exists and is not a socket")
+        socket_path.unlink()
+    handler = type("RpcHandler", (_RpcHandler,), {"service": service})
+    # Create the socket owner-only rather than tightening it after bind
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(socket_path), handler)
+    finally:
+        os.umask(umask)
+    with server:
+        logger.info("Listening on %s", socket_path)
+        try:
+            server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def run_serve(
+    cooking_path: Path,
+    vault_path: Path,
+    socket_path: str | None = None,
+    jobs: int = 1,
+) -> None:
+    """CLI entry point for serve command."""
+    service = PlannerService(cooking_path, vault_path, jobs=jobs)
+    logger.info("Loaded %d recipes", len(service.recipes()))
+    try:
+        if socket_path:
+            serve_unix(service, Path(socket_path))
+        else:
+            serve_stdio(service)
+    except KeyboardInterrupt:
+        pass
+    except FileExistsError as e:
+        logger.error("Not serving: %s", e)
+        sys.exit(1)
@@ -9,8 +9,7 @@ from collections import defaultdict
 from pathlib import Path
 
 from meal_planner.config import load_config
-from meal_planner.indexer import parse_recipe_file, discover_recipe_files
-from meal_planner.models import ParsedIngredient
+from meal_planner.models import ParsedIngredient, Recipe
 
 logger = logging.getLogger(__name__)
 
@@ -328,6 +327,8 @@ def build_shopping_sections(
     plan_data: dict,
     cooking_path: Path,
     pantry_staples: list[str] | None = None,
+    jobs: int = 1,
+    recipes: list[Recipe] | None = None,
 ) -> dict[str, list[dict]]:
     """Build aggregated shopping list sections from a plan JSON dict.
 
@@ -335,6 +336,9 @@ def build_shopping_sections(
         plan_data: plan JSON dict with a "slots" key
         cooking_path: path to the cooking/recipe directory
         pantry_staples: items to exclude from the list
+        jobs: worker processes for re-parsing changed recipe files
+        recipes: already-loaded recipes to look names up in, instead of
+            the catalog or persistent index
 
     Returns:
         dict of section -> list of {item, qty, unit, notes}
@@ -351,16 +355,29 @@ def build_shopping_sections(
         servings = slot.get("servings", 1.0)
         recipe_servings[recipe_name] = recipe_servings.get(recipe_name, 0) + servings
 
-    # Load each recipe's parsed ingredients
-    recipe_files = {f.stem: f for f in discover_recipe_files(cooking_path)}
+    # Look up each recipe's parsed ingredients in the catalog or persistent
+    # index; both pull in the indexer, so they are imported only when needed
+    if recipes is not None:
+        recipes_by_name = {r.name: r for r in recipes}
+    elif not recipe_servings:
+        recipes_by_name = {}
+    else:
+        from meal_planner.catalog import open_catalog
+        from meal_planner.recipe_index import load_recipes
+
+        catalog = open_catalog(cooking_path, jobs=jobs)
+        if catalog is not None:
+            recipes_by_name = catalog.get_by_names(list(recipe_servings))
+        else:
+            recipes_by_name = {r.name: r for r in load_recipes(cooking_path, jobs=jobs)}
 
     for recipe_name, total_servings in recipe_servings.items():
-        if recipe_name not in recipe_files:
+        recipe = recipes_by_name.get(recipe_name)
+        if recipe is None:
             logger.warning("Recipe file not found: %s", recipe_name)
             continue
 
-        recipe = parse_recipe_file(recipe_files[recipe_name])
-        if not recipe or not recipe.parsed_ingredients:
+        if not recipe.parsed_ingredients:
             logger.warning("No parsed ingredients for: %s", recipe_name)
             continue
 
@@ -384,6 +401,7 @@ def run_shopping_list(
     plan_file: str | None = None,
     pantry: str | None = None,
     output_format: str = "markdown",
+    jobs: int = 1,
 ) -> None:
     """CLI entry point for shopping-list command."""
     config = load_config(vault_path)
@@ -398,7 +416,7 @@ def run_shopping_list(
     else:
         plan_data = json.load(sys.stdin)
 
-    sections = build_shopping_sections(plan_data, cooking_path, pantry_staples)
+    sections = build_shopping_sections(plan_data, cooking_path, pantry_staples, jobs)
 
     if not sections:
         logger.warning("No ingredients to list")
@@ -0,0 +1,89 @@
+"""Startup-time report for `meal-planner --startup-report`.
+
+The command is re-run under `python -X importtime`, so the interpreter itself
+times every import (including the ones made before our code runs). Its
+stderr is split back into the command's own output and the import timings,
+which are printed as a table after the command finishes.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+# "import time:       498 |      39406 |   meal_planner.log"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(lines: list[str]) -> tuple[list[ImportTiming], list[str]]:
+    """Split `-X importtime` stderr into timings and all other lines.
+
+    Timings are returned in load order (parents after their children, as
+    the interpreter reports them).
+    """
+    timings: list[ImportTiming] = []
+    other: list[str] = []
+    for line in lines:
+        if line.startswith("import time: self [us]"):
+            continue
+        m = _IMPORTTIME_LINE.match(line)
+        if m is None:
+            other.append(line)
+            continue
+        self_us, cumulative_us, indent, module = m.groups()
+        timings.append(
+            ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2)
+        )
+    return timings, other
+
+
+def format_startup_report(timings: list[ImportTiming], wall_seconds: float) -> str:
+    """Per-module import table plus totals, times in milliseconds."""
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    lines = [
+        f"Startup report: {wall_seconds * 1000:.0f} ms wall, "
+        f"{total_us / 1000:.0f} ms importing {len(timings)} modules",
+        "",
+        f"{'self ms':>9} {'total ms':>9}  module",
+    ]
+    for t in timings:
+        lines.append(
+            f"{t.self_us / 1000:9.1f} {t.cumulative_us / 1000:9.1f}  "
+            f"{'  ' * t.depth}{t.module}"
+        )
+
+    slowest = sorted(
+        (t for t in timings if t.depth == 0), key=lambda t: t.cumulative_us, reverse=True
+    )[:10]
+    lines += ["", "Slowest top-level imports:"]
+    for t in slowest:
+        lines.append(f"{t.cumulative_us / 1000:9.1f} ms  {t.module}")
+    return "\n".join(lines)
+
+
+def run_with_startup_report(argv: list[str]) -> int:
+    """Run `meal-planner <argv>` under -X importtime and report to stderr.
+
+    stdout and stdin are passed through untouched. Returns the exit code.
+    """
+    cmd = [sys.executable, "-X", "importtime", "-m", "meal_planner.cli", *argv]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+    wall_seconds = time.perf_counter() - start
+
+    timings, other = parse_importtime(proc.stderr.splitlines())
+    for line in other:
+        print(line, file=sys.stderr)
+    print(format_startup_report(timings, wall_seconds), file=sys.stderr)
+    return proc.returncode
@@ -7,10 +7,15 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from meal_planner.config import load_config
-from meal_planner.indexer import discover_recipe_files, parse_recipe_file
 from meal_planner.models import Recipe
+from meal_planner.recipe_index import catalog_path, load_recipes, snapshot_path
+
+if TYPE_CHECKING:
+    from meal_planner.catalog import RecipeCatalog
+    from meal_planner.nutrition_snapshot import NutritionSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +93,7 @@ def is_excluded(recipe: Recipe, exclude_names: list[str]) -> bool:
 
 
 def filter_recipes(
-    recipes: list[Recipe],
+    recipes: list[Recipe] | RecipeCatalog,
     meal_type: str | None = None,
     max_time: int | None = None,
     cuisine: str | None = None,
@@ -97,7 +102,24 @@ def filter_recipes(
     min_protein: float | None = None,
     max_calories: float | None = None,
 ) -> list[Recipe]:
-    """Apply hard filters to recipe list."""
+    """Apply hard filters to recipe list.
+
+    Given a RecipeCatalog, the filters run as SQL and only the matching
+    recipes are loaded.
+    """
+    # Anything but a list is a RecipeCatalog; checked this way so that
+    # vaults without a catalog never import sqlite3
+    if not isinstance(recipes, list):
+        return recipes.filter_recipes(
+            meal_type=meal_type,
+            max_time=max_time,
+            cuisine=cuisine,
+            dietary_tags=dietary_tags,
+            exclude=exclude,
+            min_protein=min_protein,
+            max_calories=max_calories,
+        )
+
     result = []
     for r in recipes:
         if meal_type and not matches_meal_type(r, meal_type):
@@ -126,6 +148,34 @@ def filter_recipes(
     return result
 
 
+def planner_eligible(recipe: Recipe, config: dict) -> bool:
+    """Whether `plan` could pick this recipe for any meal under `config`.
+
+    Mirrors the planner's per-meal hard filters: calorie data, a matching
+    meal type, the prep-time limit for that meal's prep style and the
+    dietary tags from preferences.
+    """
+    if recipe.calories is None:
+        return False
+    prefs = config["preferences"]
+    dietary = prefs.get("dietary_tags") or None
+    for meal in config["schedule"]["meals_per_day"]:
+        if meal not in MEAL_TYPE_MAP:
+            continue
+        max_time = (
+            prefs["max_batch_time_minutes"]
+            if config["prep_styles"].get(meal) == "batch"
+            else prefs["max_prep_time_minutes"]
+        )
+        if (
+            matches_meal_type(recipe, meal)
+            and matches_time(recipe, max_time)
+            and matches_dietary_tags(recipe, dietary)
+        ):
+            return True
+    return False
+
+
 def compute_pantry_overlap(recipe: Recipe, pantry_items: list[str]) -> float:
     """Score 0-1 for how many recipe ingredients overlap with pantry."""
     if not pantry_items or not recipe.parsed_ingredients:
@@ -250,15 +300,20 @@ def score_recipe(
     )
 
 
-def load_all_recipes(cooking_path: Path) -> list[Recipe]:
-    """Load all recipe files into Recipe objects."""
-    files = discover_recipe_files(cooking_path)
-    recipes = []
-    for f in files:
-        r = parse_recipe_file(f)
-        if r:
-            recipes.append(r)
-    return recipes
+def load_all_recipes(cooking_path: Path, jobs: int = 1) -> list[Recipe]:
+    """Load all recipe files into Recipe objects via the persistent index."""
+    return load_recipes(cooking_path, jobs=jobs)
+
+
+def open_recipe_source(cooking_path: Path, jobs: int = 1) -> list[Recipe] | RecipeCatalog:
+    """Return the SQLite catalog if one was built, otherwise all recipes."""
+    if catalog_path(cooking_path).exists():
+        from meal_planner.catalog import open_catalog
+
+        catalog = open_catalog(cooking_path, jobs=jobs)
+        if catalog is not None:
+            return catalog
+    return load_all_recipes(cooking_path, jobs=jobs)
 
 
 def suggest_recipes(
@@ -274,13 +329,36 @@ def suggest_recipes(
     min_protein: float | None = None,
     max_calories: float | None = None,
     limit: int = 10,
+    jobs: int = 1,
 ) -> list[ScoredRecipe]:
     """Filter and rank recipes, returning top N suggestions."""
-    all_recipes = load_all_recipes(cooking_path)
+    # Without pantry items every score comes from numeric columns, so the
+    # nutrition snapshot can rank all recipes before any are loaded
+    if not available_ingredients and snapshot_path(cooking_path).exists():
+        # Deferred so vaults without a snapshot never import NumPy
+        from meal_planner.nutrition_snapshot import open_snapshot
+
+        snapshot = open_snapshot(cooking_path, jobs=jobs)
+        if snapshot is not None and snapshot.supports(meal_type):
+            return suggest_from_snapshot(
+                snapshot,
+                meal_type=meal_type,
+                max_time=max_time,
+                cuisine=cuisine,
+                dietary_tags=dietary_tags,
+                exclude=exclude,
+                target_calories=target_calories,
+                target_protein=target_protein,
+                min_protein=min_protein,
+                max_calories=max_calories,
+                limit=limit,
+            )
+
+    source = open_recipe_source(cooking_path, jobs=jobs)
 
     # Hard filters
     filtered = filter_recipes(
-        all_recipes,
+        source,
         meal_type=meal_type,
         max_time=max_time,
         cuisine=cuisine,
@@ -307,6 +385,44 @@ def suggest_recipes(
     return scored[:limit]
 
 
+def suggest_from_snapshot(
+    snapshot: NutritionSnapshot,
+    meal_type: str | None = None,
+    max_time: int | None = None,
+    cuisine: str | None = None,
+    dietary_tags: list[str] | None = None,
+    exclude: list[str] | None = None,
+    target_calories: int | None = None,
+    target_protein: int | None = None,
+    min_protein: float | None = None,
+    max_calories: float | None = None,
+    limit: int = 10,
+) -> list[ScoredRecipe]:
+    """suggest_recipes over the nutrition snapshot, loading only the top N.
+
+    Ranks on the same rounded scores as score_recipe, with the same stable
+    tie order, then re-scores the winners to fill in their breakdowns.
+    """
+    rows = snapshot.select(
+        meal_type=meal_type,
+        max_time=max_time,
+        cuisine=cuisine,
+        dietary_tags=dietary_tags,
+        exclude=exclude,
+        min_protein=min_protein,
+        max_calories=max_calories,
+    )
+    totals = [round(t, 1) for t in snapshot.scores(
+        rows, target_calories, target_protein
+    ).tolist()]
+    top = sorted(range(len(rows)), key=totals.__getitem__, reverse=True)[:limit]
+
+    return [
+        score_recipe(r, target_calories=target_calories, target_protein=target_protein)
+        for r in snapshot.recipes(rows[top])
+    ]
+
+
 def format_table(scored: list[ScoredRecipe]) -> str:
     """Format scored recipes as a readable table."""
     lines = []
@@ -329,6 +445,11 @@ def format_table(scored: list[ScoredRecipe]) -> str:
 
 def format_json(scored: list[ScoredRecipe]) -> str:
     """Format scored recipes as JSON."""
+    return json.dumps(scored_to_dicts(scored), indent=2)
+
+
+def scored_to_dicts(scored: list[ScoredRecipe]) -> list[dict]:
+    """JSON-ready dicts for scored recipes (the suggest --format json rows)."""
     data = []
     for sr in scored:
         r = sr.recipe
@@ -347,7 +468,7 @@ def format_json(scored: list[ScoredRecipe]) -> str:
                 "score_breakdown": sr.breakdown,
             }
         )
-    return json.dumps(data, indent=2)
+    return data
 
 
 def run_suggest(
@@ -364,6 +485,7 @@ def run_suggest(
     max_calories: int | None = None,
     limit: int = 10,
     output_format: str = "table",
+    jobs: int = 1,
 ) -> None:
     """CLI entry point for suggest command."""
     tags = [t.strip() for t in dietary_tags.split(",")] if dietary_tags else None
@@ -387,6 +509,7 @@ def run_suggest(
         min_protein=float(min_protein) if min_protein else None,
         max_calories=float(max_calories) if max_calories else None,
         limit=limit,
+        jobs=jobs,
     )
 
     if not scored:
@@ -0,0 +1,86 @@
+"""Watch mode: keep the recipe index, catalog and snapshot current as files change.
+
+Polls the cooking directory instead of relying on inotify, so it behaves the
+same on Linux and macOS and with synced vaults. Each poll costs one directory
+listing plus a stat per file. Only files whose mtime or size changed are
+re-parsed.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from meal_planner.catalog import open_catalog
+from meal_planner.indexer import discover_recipe_files
+from meal_planner.nutrition_snapshot import snapshot_path, write_snapshot
+from meal_planner.recipe_index import load_recipe_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 2.0
+
+
+class RecipeWatcher:
+    """Holds the index (and catalog, if built) open between polls."""
+
+    def __init__(self, cooking_path: Path, jobs: int = 1) -> None:
+        self.cooking_path = cooking_path
+        self.jobs = jobs
+        # Bring the index up to date first so opening the catalog reuses it;
+        # the first poll() then saves it and rewrites the snapshot
+        self.index = load_recipe_index(cooking_path)
+        self.index.refresh(discover_recipe_files(cooking_path), jobs=jobs)
+        self.catalog = open_catalog(cooking_path, jobs=jobs, index=self.index)
+
+    def close(self) -> None:
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
+
+    def poll(self) -> bool:
+        """Apply any file changes since the last poll. Returns True if any."""
+        files = discover_recipe_files(self.cooking_path)
+        previous = set(self.index.entries)
+        reparsed = self.index.refresh(files, jobs=self.jobs)
+        if not self.index.dirty:
+            return False
+
+        self.index.save()
+        if self.catalog is not None:
+            self.catalog.sync(files, jobs=self.jobs, index=self.index)
+        try:
+            write_snapshot(snapshot_path(self.cooking_path), self.index, files)
+        except OSError as e:
+            logger.warning("Could not write nutrition snapshot: %s", e)
+
+        removed = len(previous - self.index.entries.keys())
+        logger.info("Index updated: %d re-parsed, %d removed", reparsed, removed)
+        return True
+
+
+def watch_recipes(
+    cooking_path: Path,
+    interval: float = DEFAULT_INTERVAL,
+    jobs: int = 1,
+    max_polls: int | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> None:
+    """Poll `cooking_path` every `interval` seconds until interrupted.
+
+    max_polls and sleep exist for tests.
+    """
+    watcher = RecipeWatcher(cooking_path, jobs=jobs)
+    logger.info("Watching %s for recipe changes (Ctrl-C to stop)", cooking_path)
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            watcher.poll()
+            polls += 1
+            sleep(interval)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
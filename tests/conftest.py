@@ -1,5 +1,6 @@
 import pytest
 from pathlib import Path
+from meal_planner.claude_runner import ClaudeRunner
 from meal_planner.models import Recipe
 
 
@@ -24,3 +25,18 @@ def sample_recipes() -> list[Recipe]:
         Recipe(name="Apple Pie", file_path=Path("fake/h.md"),
                calories=350, protein_g=4, meal_type="dessert"),
     ]
+
+
+@pytest.fixture
+def fake_claude(monkeypatch):
+    """Replace each claude CLI call with `answer(prompt, timeout)`.
+
+    Returning None makes the call fail as a timeout would.
+    """
+    def install(answer):
+        async def run_once(self, prompt, timeout):
+            return answer(prompt, timeout)
+
+        monkeypatch.setattr(ClaudeRunner, "_run_once", run_once)
+
+    return install
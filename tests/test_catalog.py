@@ -0,0 +1,155 @@
+"""Tests for the SQLite recipe catalog and SQL filter pushdown."""
+
+import itertools
+import os
+
+import pytest
+from meal_planner.catalog import catalog_path, open_catalog
+from meal_planner.indexer import discover_recipe_files, parse_recipe_file
+from meal_planner.suggest import filter_recipes
+
+RECIPES = {
+    "Breakfast Slop": dict(meal_type="breakfast", calories=400, protein_g=30,
+                           total_time="10 minutes", dietary_tags="[vegetarian]"),
+    "Chicken Tikka Masala": dict(meal_type="dinner", calories=550, protein_g=40,
+                                 total_time="45 minutes", cuisine="Indian",
+                                 dietary_tags="[gluten-free]"),
+    "Beef Stew Recipe": dict(meal_type="Main Course", calories=480, protein_g=35,
+                             total_time="3 hours", cuisine="Irish"),
+    "Tortilla Soup": dict(meal_type="soup", calories=300, protein_g=18,
+                          cuisine="Mexican", dietary_tags="[Gluten-Free, vegetarian]"),
+    "Caesar Salad": dict(categories="[lunch, salad]", calories=350, protein_g=20,
+                         total_time="15 minutes"),
+    "Granola Bar": dict(meal_type="snack", calories=200, protein_g=8),
+    "Mystery Stew": dict(meal_type="dinner"),
+}
+
+
+def _write(path, fields):
+    lines = ["---", "type: recipe"]
+    lines += [f"{k}: {v}" for k, v in fields.items()]
+    lines += ["---", "", "### Ingredients", "", "- 1 thing", ""]
+    path.write_text("\n".join(lines))
+
+
+@pytest.fixture
+def cooking_dir(tmp_path):
+    for name, fields in RECIPES.items():
+        _write(tmp_path / f"{name}.md", fields)
+    (tmp_path / "Not A Recipe.md").write_text("---\ntype: note\n---\n")
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(cooking_dir):
+    cat = open_catalog(cooking_dir, create=True)
+    yield cat
+    cat.close()
+
+
+@pytest.fixture
+def recipes(cooking_dir):
+    return [r for f in discover_recipe_files(cooking_dir) if (r := parse_recipe_file(f))]
+
+
+def _names(recipes):
+    return [r.name for r in recipes]
+
+
+class TestOpenCatalog:
+    def test_missing_catalog_returns_none(self, cooking_dir):
+        assert open_catalog(cooking_dir) is None
+
+    def test_create_builds_catalog(self, catalog, cooking_dir):
+        assert catalog_path(cooking_dir).exists()
+        assert catalog.names() == sorted(RECIPES)
+
+    def test_sync_picks_up_changes(self, catalog, cooking_dir):
+        (cooking_dir / "Granola Bar.md").unlink()
+        path = cooking_dir / "Caesar Salad.md"
+        _write(path, dict(meal_type="dinner", calories=999))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        _write(cooking_dir / "Zucchini Bread.md", dict(meal_type="snack"))
+
+        catalog.close()
+        reopened = open_catalog(cooking_dir)
+        assert "Granola Bar" not in reopened.names()
+        assert "Zucchini Bread" in reopened.names()
+        salad = reopened.get_by_names(["Caesar Salad"])["Caesar Salad"]
+        assert salad.calories == 999
+        assert _names(reopened.filter_recipes(meal_type="snack")) == ["Zucchini Bread"]
+        reopened.close()
+
+    def test_unchanged_files_not_reparsed(self, catalog, cooking_dir):
+        assert catalog.sync(discover_recipe_files(cooking_dir)) == 0
+
+
+class TestFilterPushdown:
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"meal_type": "dinner"},
+        {"meal_type": "lunch"},
+        {"meal_type": "Breakfast"},
+        {"meal_type": "brunch"},
+        {"max_time": 30},
+        {"max_time": 0},
+        {"cuisine": "ind"},
+        {"cuisine": "MEX"},
+        {"dietary_tags": ["gluten-free"]},
+        {"dietary_tags": ["Vegetarian", "gluten-free"]},
+        {"exclude": ["stew"]},
+        {"exclude": ["Soup", "bar"]},
+        {"min_protein": 30},
+        {"max_calories": 400},
+        {"meal_type": "dinner", "max_time": 60, "min_protein": 36},
+    ])
+    def test_matches_python_filter(self, catalog, recipes, kwargs):
+        assert _names(filter_recipes(catalog, **kwargs)) == _names(
+            filter_recipes(recipes, **kwargs)
+        )
+
+    def test_combinations_match_python_filter(self, catalog, recipes):
+        options = {
+            "meal_type": [None, "dinner", "snack"],
+            "max_time": [None, 20],
+            "dietary_tags": [None, ["vegetarian"]],
+            "max_calories": [None, 450],
+        }
+        for values in itertools.product(*options.values()):
+            kwargs = dict(zip(options, values))
+            assert _names(filter_recipes(catalog, **kwargs)) == _names(
+                filter_recipes(recipes, **kwargs)
+            ), kwargs
+
+
+class TestNameLookup:
+    def test_find_by_name_substring(self, catalog):
+        assert _names(catalog.find_by_name("stew")) == ["Beef Stew Recipe", "Mystery Stew"]
+
+    def test_find_by_name_mid_word(self, catalog):
+        assert _names(catalog.find_by_name("ikka")) == ["Chicken Tikka Masala"]
+
+    def test_find_by_name_short_query(self, catalog):
+        assert _names(catalog.find_by_name("ba")) == ["Granola Bar"]
+
+    def test_get_by_names(self, catalog):
+        found = catalog.get_by_names(["Tortilla Soup", "Nope"])
+        assert list(found) == ["Tortilla Soup"]
+        assert found["Tortilla Soup"].cuisine == "Mexican"
+
+
+class TestCommandsUseCatalog:
+    def test_scaler_fuzzy_match(self, catalog, cooking_dir):
+        from meal_planner.scaler import fuzzy_match_recipe
+
+        assert fuzzy_match_recipe("tikka", cooking_dir).name == "Chicken Tikka Masala"
+        assert fuzzy_match_recipe("granola bar", cooking_dir).name == "Granola Bar"
+
+    def test_suggest(self, catalog, cooking_dir):
+        from meal_planner.suggest import suggest_recipes
+
+        scored = suggest_recipes(cooking_dir, meal_type="dinner", min_protein=36)
+        assert sorted(_names(s.recipe for s in scored)) == [
+            "Chicken Tikka Masala", "Mystery Stew",
+        ]
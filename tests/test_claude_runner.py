@@ -0,0 +1,113 @@
+"""Tests for the asyncio claude CLI runner, using small Python scripts as the CLI."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from meal_planner import claude_runner
+from meal_planner.claude_runner import ClaudeRunner, TokenBucket, backoff_delay, strip_fences
+
+
+def _script(code):
+    return (sys.executable, "-c", code)
+
+
+ECHO = _script("import sys; print(sys.stdin.read().upper())")
+
+
+class TestHelpers:
+    def test_strip_fences(self):
+        assert strip_fences('```json\n{"0": null}\n```\n') == '{"0": null}'
+        assert strip_fences(" [1] ") == "[1]"
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [backoff_delay(attempt, base=1, cap=5) for attempt in range(10) for _ in range(20)]
+        assert all(0 <= d <= 5 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_token_bucket_spaces_calls(self):
+        async def acquire_all():
+            bucket = TokenBucket(rate=20, burst=1)
+            start = time.monotonic()
+            for _ in range(5):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        assert asyncio.run(acquire_all()) >= 0.18
+
+
+class TestClaudeRunner:
+    def test_call_returns_stdout(self):
+        runner = ClaudeRunner(rate=0, command=ECHO)
+        assert asyncio.run(runner.call("abc", timeout=30)) == "ABC"
+
+    def test_missing_cli(self):
+        runner = ClaudeRunner(rate=0, command=("no-such-claude-binary",))
+        assert asyncio.run(runner.call("abc", timeout=30)) is None
+
+    def test_retries_non_zero_exit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(claude_runner, "backoff_delay", lambda attempt: 0)
+        counter = tmp_path / "count"
+        code = (
+            "import pathlib, sys\n"
+            f"p = pathlib.Path({str(counter)!r})\n"
+            "n = int(p.read_text()) if p.exists() else 0\n"
+            "p.write_text(str(n + 1))\n"
+            "if n < 2: sys.exit('rate limited')\n"
+            "print('ok')\n"
+        )
+        runner = ClaudeRunner(rate=0, command=_script(code))
+        assert asyncio.run(runner.call("", timeout=30)) == "ok"
+        assert (runner.calls, runner.retries) == (3, 2)
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        monkeypatch.setattr(claude_runner, "backoff_delay", lambda attempt: 0)
+        runner = ClaudeRunner(rate=0, max_retries=1, command=_script("import sys; sys.exit(1)"))
+        assert asyncio.run(runner.call("", timeout=30)) is None
+        assert runner.calls == 2
+
+    def test_timeout_returns_none(self):
+        runner = ClaudeRunner(rate=0, command=_script("import time; time.sleep(30)"))
+        start = time.monotonic()
+        assert asyncio.run(runner.call("", timeout=0.5)) is None
+        assert time.monotonic() - start < 10
+
+    def test_concurrency_ceiling(self, tmp_path):
+        # Each call records how many calls were running when it started
+        code = (
+            "import os, pathlib, time\n"
+            f"d = pathlib.Path({str(tmp_path)!r})\n"
+            "(d / str(os.getpid())).touch()\n"
+            "print(len(list(d.iterdir())))\n"
+            "time.sleep(0.3)\n"
+            "(d / str(os.getpid())).unlink()\n"
+        )
+        runner = ClaudeRunner(concurrency=2, rate=0, command=_script(code))
+
+        async def run_all():
+            return await asyncio.gather(*(runner.call("", timeout=30) for _ in range(6)))
+
+        assert max(int(n) for n in asyncio.run(run_all())) <= 2
+
+    def test_cancel_kills_process(self, tmp_path):
+        pid_file = tmp_path / "pid"
+        code = (
+            "import os, pathlib, time\n"
+            f"pathlib.Path({str(pid_file)!r}).write_text(str(os.getpid()))\n"
+            "time.sleep(30)\n"
+        )
+        runner = ClaudeRunner(rate=0, command=_script(code))
+
+        async def cancel_soon():
+            task = asyncio.create_task(runner.call("", timeout=60))
+            while not pid_file.exists():
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_soon())
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,96 @@
+"""Tests for splicing frontmatter keys and the background writer."""
+
+import os
+
+from meal_planner import frontmatter_writer
+from meal_planner.frontmatter_writer import (
+    FrontmatterWriter,
+    splice_frontmatter,
+    write_frontmatter_keys,
+)
+from meal_planner.indexer import read_frontmatter
+
+NOTE = b"""---
+type: recipe
+parsed_ingredients:
+- section: null
+  items:
+  - qty: 1
+    item: old
+tags: [dinner, quick]   # hand-formatted
+ingredients_hash: abc
+---
+
+## Ingredients
+
+- 1 cup rice
+"""
+
+PARSED = [{"section": None, "items": [{"qty": 2, "unit": "cups", "item": "rice"}]}]
+
+
+class TestSplice:
+    def test_replaces_only_given_keys(self):
+        out = splice_frontmatter(NOTE, {"parsed_ingredients": PARSED, "ingredients_hash": "new"})
+        header, body = out.split(b"---\n")[1:3]
+        assert b"type: recipe\ntags: [dinner, quick]   # hand-formatted\n" in header
+        assert b"old" not in header
+        assert body == NOTE.split(b"---\n")[2]
+
+    def test_round_trips_through_yaml(self, tmp_path):
+        path = tmp_path / "Rice.md"
+        path.write_bytes(splice_frontmatter(NOTE, {"parsed_ingredients": PARSED}))
+        meta = read_frontmatter(path)
+        assert meta["parsed_ingredients"] == PARSED
+        assert meta["tags"] == ["dinner", "quick"]
+        assert meta["ingredients_hash"] == "abc"
+
+    def test_note_without_frontmatter(self):
+        out = splice_frontmatter(b"# Toast\n", {"ingredients_hash": "h"})
+        assert out == b"---\ningredients_hash: h\n---\n\n# Toast\n"
+
+
+class TestWrite:
+    def test_atomic_write_keeps_mode_and_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "Rice.md"
+        path.write_bytes(NOTE)
+        os.chmod(path, 0o640)
+        assert write_frontmatter_keys({path: {"ingredients_hash": "new"}}) == []
+        assert read_frontmatter(path)["ingredients_hash"] == "new"
+        assert os.stat(path).st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["Rice.md"]
+
+    def test_missing_file_is_reported(self, tmp_path):
+        missing = tmp_path / "Gone.md"
+        assert write_frontmatter_keys({missing: {"ingredients_hash": "x"}}) == [missing]
+
+
+class TestFrontmatterWriter:
+    def test_coalesces_updates_per_file(self, tmp_path, monkeypatch):
+        batches = []
+        real = frontmatter_writer.write_frontmatter_keys
+
+        def recording(paths_updates, fsync=True):
+            batches.append(dict(paths_updates))
+            return real(paths_updates, fsync=fsync)
+
+        monkeypatch.setattr(frontmatter_writer, "write_frontmatter_keys", recording)
+        monkeypatch.setattr(frontmatter_writer, "COALESCE_SECONDS", 1.0)
+        paths = [tmp_path / f"{n}.md" for n in range(3)]
+        for path in paths:
+            path.write_bytes(NOTE)
+
+        with FrontmatterWriter() as writer:
+            for path in paths:
+                writer.submit(path, {"ingredients_hash": "first"})
+            writer.submit(paths[0], {"ingredients_hash": "second"})
+
+        assert len(batches) == 1 and len(batches[0]) == 3
+        assert writer.written == paths and writer.failed == []
+        assert read_frontmatter(paths[0])["ingredients_hash"] == "second"
+        assert read_frontmatter(paths[1])["ingredients_hash"] == "first"
+
+    def test_collects_failures(self, tmp_path):
+        with FrontmatterWriter(fsync=False) as writer:
+            writer.submit(tmp_path / "Gone.md", {"ingredients_hash": "x"})
+        assert writer.failed == [tmp_path / "Gone.md"]
@@ -0,0 +1,250 @@
+"""Tests for Haiku line batching and retries."""
+
+import asyncio
+import json
+import re
+import sys
+from collections import deque
+from pathlib import Path
+
+from meal_planner import haiku_parser
+from meal_planner.claude_runner import ClaudeRunner
+from meal_planner.haiku_parser import BatchBudget, ParseStats, haiku_timeout, line_tokens
+from meal_planner.config import DEFAULTS
+from meal_planner.indexer import parse_recipe_file
+
+
+class TestBatchBudget:
+    def test_take_packs_to_budget(self):
+        queue = deque(["a" * 400] * 10)
+        budget = BatchBudget(tokens=3 * line_tokens("a" * 400))
+        assert len(budget.take(queue, line_tokens)) == 3
+        assert len(queue) == 7
+
+    def test_take_always_returns_one_line(self):
+        queue = deque(["x" * 4000, "y"])
+        assert BatchBudget(tokens=200).take(queue, line_tokens) == ["x" * 4000]
+
+    def test_record_adapts(self):
+        budget = BatchBudget(tokens=2000)
+        budget.record(elapsed=100, timeout=100, complete=False)
+        assert budget.tokens == 1000
+        budget.record(elapsed=50, timeout=100, complete=False)
+        assert budget.tokens == 750
+        budget.record(elapsed=10, timeout=100, complete=True)
+        assert budget.tokens == 937
+        budget.record(elapsed=80, timeout=100, complete=True)
+        assert budget.tokens == 937
+
+    def test_record_respects_bounds(self):
+        budget = BatchBudget(tokens=300, min_tokens=200, max_tokens=400)
+        for _ in range(5):
+            budget.record(elapsed=1, timeout=100, complete=True)
+        assert budget.tokens == 400
+        for _ in range(5):
+            budget.record(elapsed=100, timeout=100, complete=False)
+        assert budget.tokens == 200
+
+    def test_timeout_scales_with_tokens(self):
+        assert haiku_timeout(100) < haiku_timeout(2000) < haiku_timeout(8000)
+        assert haiku_timeout(10**6) == haiku_timeout(10**7)
+
+
+def _recipe(path, lines):
+    path.write_text(
+        "---\ntype: recipe\nmeal_type: dinner\n---\n\n## Ingredients\n\n"
+        + "\n".join(f"- {line}" for line in lines)
+        + "\n"
+    )
+
+
+def _answer(prompt):
+    """Answer every numbered line in a LINE_PARSE_PROMPT."""
+    keys = re.findall(r"^(\d+): ", prompt.split("Return ONLY")[1], re.MULTILINE)
+    return json.dumps({k: {"qty": 1, "unit": None, "item": "flour"} for k in keys})
+
+
+class TestAdaptiveBatching:
+    def test_lines_split_by_token_budget(self, tmp_path, fake_claude):
+        lines = [f"1 cup + {n} tbsp flour" for n in range(10, 30)]
+        _recipe(tmp_path / "A.md", lines)
+        calls = []
+
+        def fake_haiku(prompt, timeout=120):
+            calls.append((len(re.findall(r"^\d+: ", prompt, re.MULTILINE)), timeout))
+            return _answer(prompt)
+
+        fake_claude(fake_haiku)
+        recipe = parse_recipe_file(tmp_path / "A.md")
+        haiku_parser.parse_all_ingredients(
+            [recipe], tmp_path, batch_tokens=8 * line_tokens(lines[0]), max_workers=1
+        )
+
+        # 8 lines fit the budget; quick complete batches grow it a little
+        assert [n for n, _ in calls] == [8, 10, 2]
+        assert calls[0][1] < calls[1][1]
+        assert len(parse_recipe_file(tmp_path / "A.md").parsed_ingredients[0].items) == 20
+
+
+def _run_batch(lines):
+    runner = ClaudeRunner(rate=0)
+    return asyncio.run(haiku_parser._run_batch(runner, lines, timeout=60))
+
+
+class TestBisectionRetry:
+    def _fake(self, fake_claude, calls, poison):
+        def fake_haiku(prompt, timeout=120):
+            calls.append(prompt)
+            if poison in prompt:
+                return "not json"
+            return _answer(prompt)
+
+        fake_claude(fake_haiku)
+
+    def test_one_bad_line_costs_log_n_calls(self, fake_claude):
+        lines = [f"line {n}" for n in range(16)]
+        lines[11] = "POISON"
+        calls = []
+        self._fake(fake_claude, calls, "POISON")
+
+        outcome = _run_batch(lines)
+
+        assert not outcome.complete
+        assert sorted(outcome.results) == [i for i in range(16) if i != 11]
+        # 16 -> 8+8 -> 4+4 -> 2+2 -> 1+1
+        assert outcome.retry_calls == 8
+        assert len(calls) == 9
+
+    def test_partial_answer_retries_only_missing_lines(self, fake_claude):
+        calls = []
+
+        def fake_haiku(prompt, timeout=120):
+            calls.append(prompt)
+            if len(calls) == 1:
+                return json.dumps({"0": {"item": "a"}, "2": {"item": "c"}})
+            return _answer(prompt)
+
+        fake_claude(fake_haiku)
+        outcome = _run_batch(["a", "b", "c", "d"])
+        assert sorted(outcome.results) == [0, 1, 2, 3]
+        assert outcome.retry_calls == 2
+        assert calls[1].endswith("0: b") and calls[2].endswith("0: d")
+
+    def test_complete_batch_makes_one_call(self, fake_claude):
+        calls = []
+        self._fake(fake_claude, calls, "POISON")
+        outcome = _run_batch(["a", "b"])
+        assert outcome.complete and outcome.retry_calls == 0 and len(calls) == 1
+
+
+class TestSalvage:
+    def test_truncated_answer_keeps_complete_entries(self):
+        text = '{"0": {"item": "a"}, "1": null, "2": [1], "3": {"item": "tru'
+        entries = haiku_parser.salvage_batch_entries(text)
+        assert entries == {"0": {"item": "a"}, "1": None, "2": [1]}
+
+    def test_skips_one_malformed_entry(self):
+        text = '{"0": {"qty": 1/2, "item": "a"}, "1": {"item": "b"}}'
+        assert haiku_parser.salvage_batch_entries(text) == {"1": {"item": "b"}}
+
+    def test_scalar_at_cut_off_is_dropped(self):
+        assert haiku_parser.salvage_batch_entries('{"0": 1, "1": 12') == {"0": 1}
+        assert haiku_parser.salvage_batch_entries("not json at all") == {}
+
+    def test_truncated_batch_retries_only_missing_lines(self, fake_claude):
+        calls = []
+
+        def fake_haiku(prompt, timeout=120):
+            calls.append(prompt)
+            text = _answer(prompt)
+            return text[: text.rfind('"3"') + 8] if len(calls) == 1 else text
+
+        fake_claude(fake_haiku)
+        outcome = _run_batch(["a", "b", "c", "d"])
+        assert sorted(outcome.results) == [0, 1, 2, 3]
+        assert outcome.retry_calls == 1
+        assert calls[1].endswith("0: d")
+
+
+def _note(path, line, **meta):
+    header = "".join(f"{k}: {v}\n" for k, v in {"type": "recipe", **meta}.items())
+    path.write_text(f"---\n{header}---\n\n## Ingredients\n\n- {line}\n")
+    return parse_recipe_file(path)
+
+
+class TestPriority:
+    def test_planner_candidates_then_rating(self, tmp_path):
+        plain = _note(tmp_path / "A.md", "1 cup rice", meal_type="dinner")
+        eligible = _note(tmp_path / "B.md", "1 cup rice", meal_type="dinner", calories=500)
+        rated = _note(
+            tmp_path / "C.md", "1 cup rice", meal_type="dinner", calories=500, rating=5
+        )
+        too_slow = _note(
+            tmp_path / "D.md", "1 cup rice", meal_type="dinner", calories=500,
+            total_time="3 hours", rating=5,
+        )
+        ranked = sorted(
+            [plain, too_slow, eligible, rated],
+            key=lambda r: haiku_parser.parse_priority(r, DEFAULTS),
+            reverse=True,
+        )
+        assert [r.name for r in ranked] == ["C", "B", "D", "A"]
+
+    def test_budget_sends_most_valuable_recipes_only(self, tmp_path, fake_claude):
+        recipes = [
+            _note(tmp_path / "A.md", "1 cup + 1 tbsp flour", meal_type="dessert"),
+            _note(tmp_path / "B.md", "1 cup + 2 tbsp flour", meal_type="lunch", calories=400),
+            _note(tmp_path / "C.md", "1 cup + 3 tbsp flour", meal_type="dinner", rating=5),
+            _note(tmp_path / "D.md", "1 cup rice", meal_type="dinner"),
+        ]
+        prompts = []
+        fake_claude(lambda prompt, timeout: prompts.append(prompt) or _answer(prompt))
+        stats = ParseStats()
+        written = haiku_parser.parse_all_ingredients(recipes, tmp_path, budget=2, stats=stats)
+
+        # D needs no Haiku; B is a planner candidate, C is rated above A
+        assert sorted(p.name for p in written) == ["B.md", "C.md", "D.md"]
+        assert stats.deferred == 1
+        assert "1 cup + 2 tbsp" in prompts[0] and "1 tbsp" not in prompts[0]
+
+
+FAKE_CLAUDE = Path(__file__).parents[1] / "benchmarks" / "fake_claude.py"
+
+
+class TestParseStats:
+    def test_counts_local_haiku_and_failed_recipes(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "A.md", ["1 cup rice"])
+        _recipe(tmp_path / "B.md", ["1 cup + 2 tbsp flour"])
+        _recipe(tmp_path / "C.md", ["1 cup + 3 tbsp flour", "POISON 1 + 1"])
+
+        def fake_haiku(prompt, timeout=120):
+            return "not json" if "POISON" in prompt else _answer(prompt)
+
+        fake_claude(fake_haiku)
+        recipes = [parse_recipe_file(tmp_path / f"{n}.md") for n in "ABC"]
+        stats = ParseStats()
+        haiku_parser.parse_all_ingredients(recipes, tmp_path, max_workers=1, stats=stats)
+
+        assert (stats.recipes, stats.local, stats.parsed, stats.failed) == (3, 1, 2, 1)
+        assert (stats.lines_sent, stats.lines_failed) == (3, 1)
+        assert (stats.batches, stats.incomplete_batches) == (1, 1)
+        # 3 lines -> 1+2 -> 1+1 after the first call
+        assert stats.bisect_calls == 4
+        assert stats.calls == 5 and stats.retries == 0
+
+
+class TestFakeClaude:
+    def _call(self, lines, monkeypatch, **env):
+        for name, value in {"LATENCY": 0, "LATENCY_PER_LINE": 0, **env}.items():
+            monkeypatch.setenv(f"FAKE_CLAUDE_{name}", str(value))
+        runner = ClaudeRunner(rate=0, max_retries=0, command=(sys.executable, str(FAKE_CLAUDE)))
+        return asyncio.run(haiku_parser._fetch_lines(runner, lines, timeout=30))
+
+    def test_answers_every_line(self, monkeypatch):
+        results = self._call(["1 cup + 2 tbsp flour", "juice of 1 lime"], monkeypatch)
+        assert results[0]["item"] == "1 cup + 2 tbsp flour"
+        assert results[1]["item"] == "juice of 1 lime"
+
+    def test_failure_knobs(self, monkeypatch):
+        assert self._call(["a", "b"], monkeypatch, FAIL_RATE=1) == {}
+        assert self._call(["a", "b"], monkeypatch, POISON_RATE=1) == {}
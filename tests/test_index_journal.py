@@ -0,0 +1,124 @@
+"""Tests for the index journal and index --resume / --retry-failed."""
+
+from meal_planner.index_journal import (
+    FAILED,
+    OK,
+    PENDING,
+    compact_journal,
+    journal_path,
+    load_journal,
+)
+from meal_planner.indexer import compute_ingredients_hash, parse_recipe_file, run_index
+
+ANSWER = '{"0": {"qty": 1.125, "unit": "cup", "item": "flour"}}'
+
+
+def _recipe(path, line="1 cup + 2 tbsp flour"):
+    path.write_text(
+        "---\ntype: recipe\nmeal_type: dinner\n---\n\n## Ingredients\n\n" f"- {line}\n"
+    )
+
+
+class TestJournal:
+    def test_attempts_count_consecutive_failures(self, tmp_path):
+        journal = load_journal(tmp_path)
+        path = tmp_path / "A.md"
+        journal.record(path, "h1", PENDING)
+        journal.record(path, "h1", FAILED)
+        journal.record(path, "h1", FAILED)
+        assert journal.get(path).attempts == 2
+        journal.record(path, "h2", FAILED)
+        assert journal.get(path).attempts == 1
+        journal.record(path, "h2", OK)
+        journal.close()
+
+        reloaded = load_journal(tmp_path).get(path)
+        assert (reloaded.path, reloaded.status, reloaded.attempts) == ("A.md", OK, 0)
+
+    def test_ok_without_history_is_not_journaled(self, tmp_path):
+        journal = load_journal(tmp_path)
+        journal.record(tmp_path / "A.md", "h", OK)
+        journal.close()
+        assert not journal_path(tmp_path).exists()
+
+    def test_compaction_keeps_latest_unfinished_records(self, tmp_path):
+        journal = load_journal(tmp_path)
+        for name in ("A.md", "B.md"):
+            journal.record(tmp_path / name, "h", PENDING)
+            journal.record(tmp_path / name, "h", FAILED)
+        journal.record(tmp_path / "A.md", "h", OK)
+        journal.close()
+
+        assert compact_journal(tmp_path) == 4
+        assert journal_path(tmp_path).read_text().count("\n") == 1
+        entry = load_journal(tmp_path).get(tmp_path / "B.md")
+        assert (entry.status, entry.attempts) == (FAILED, 1)
+        assert compact_journal(tmp_path) == 0
+
+    def test_truncated_record_is_ignored(self, tmp_path):
+        path = journal_path(tmp_path)
+        path.parent.mkdir()
+        path.write_text(
+            '{"path": "A.md", "hash": "h", "status": "failed", "attempts": 1}\n{"path": "B'
+        )
+        journal = load_journal(tmp_path)
+        assert list(journal.entries) == ["A.md"]
+
+
+class TestIndexJournal:
+    def test_gives_up_after_max_attempts(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "Odd.md")
+        calls = []
+        fake_claude(lambda prompt, timeout: calls.append(prompt))
+
+        for _ in range(3):
+            run_index(tmp_path, max_attempts=2)
+        # The batch call plus its single-line retry, for two runs only
+        assert len(calls) == 4
+        entry = load_journal(tmp_path).get(tmp_path / "Odd.md")
+        assert (entry.status, entry.attempts) == (FAILED, 2)
+
+        fake_claude(lambda prompt, timeout: ANSWER)
+        run_index(tmp_path, retry_failed=True, max_attempts=2)
+        assert parse_recipe_file(tmp_path / "Odd.md").parsed_ingredients[0].items[0].qty == 1.125
+        # Finished recipes are compacted out of the journal
+        assert load_journal(tmp_path).get(tmp_path / "Odd.md") is None
+
+    def test_journal_does_not_grow_across_runs(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "Odd.md")
+        fake_claude(lambda prompt, timeout: None)
+        run_index(tmp_path)
+        for _ in range(3):
+            run_index(tmp_path, retry_failed=True)
+        assert journal_path(tmp_path).read_text().count("\n") == 1
+        assert load_journal(tmp_path).get(tmp_path / "Odd.md").attempts == 4
+
+    def test_resume_only_parses_unfinished_recipes(self, tmp_path, fake_claude):
+        for name in ("Done", "Interrupted"):
+            _recipe(tmp_path / f"{name}.md", f"1 cup + 2 tbsp {name.lower()} flour")
+        fake_claude(lambda prompt, timeout: ANSWER)
+        run_index(tmp_path)
+
+        # As if a --force run was killed after writing "Done" only
+        journal = load_journal(tmp_path)
+        raw = parse_recipe_file(tmp_path / "Interrupted.md").raw_ingredients
+        journal.record(tmp_path / "Interrupted.md", compute_ingredients_hash(raw), PENDING)
+        journal.close()
+        (tmp_path / ".meal-planner" / "ingredient-lines.jsonl").unlink()
+
+        calls = []
+        fake_claude(lambda prompt, timeout: calls.append(prompt) or ANSWER)
+        done_mtime = (tmp_path / "Done.md").stat().st_mtime_ns
+        run_index(tmp_path, resume=True)
+
+        assert len(calls) == 1
+        assert "interrupted flour" in calls[0]
+        assert (tmp_path / "Done.md").stat().st_mtime_ns == done_mtime
+        assert load_journal(tmp_path).get(tmp_path / "Interrupted.md") is None
+
+    def test_resume_with_clean_journal_does_nothing(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "A.md")
+        calls = []
+        fake_claude(lambda prompt, timeout: calls.append(prompt) or ANSWER)
+        run_index(tmp_path, resume=True)
+        assert calls == []
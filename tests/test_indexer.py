@@ -0,0 +1,148 @@
+"""Tests for header-only frontmatter reading and lazy recipe bodies."""
+
+import frontmatter
+import pytest
+from meal_planner.indexer import (
+    extract_ingredients_section,
+    parse_recipe_file,
+    read_body,
+    read_frontmatter,
+)
+
+RECIPE_TEXT = (
+    "---\n"
+    "type: recipe\n"
+    "calories: 420\n"
+    "protein_g: 31\n"
+    "servings: Serves 4\n"
+    "total_time: 1 hour 15 minutes\n"
+    "meal_type: dinner\n"
+    "dietary_tags: gluten-free, dairy-free\n"
+    "last_made: 2026-01-05\n"
+    "---\n"
+    "\n"
+    "## Braised Beans\n"
+    "\n"
+    "### Ingredients\n"
+    "\n"
+    "- 2 cups white beans\n"
+    "- 1 onion, diced\n"
+    "\n"
+    "### Directions\n"
+    "\n"
+    "1. Simmer everything.\n"
+)
+
+
+@pytest.fixture
+def recipe_path(tmp_path):
+    path = tmp_path / "Braised Beans.md"
+    path.write_text(RECIPE_TEXT)
+    return path
+
+
+class TestReadFrontmatter:
+    def test_matches_python_frontmatter(self, recipe_path):
+        assert read_frontmatter(recipe_path) == frontmatter.load(recipe_path).metadata
+
+    def test_no_frontmatter(self, tmp_path):
+        path = tmp_path / "plain.md"
+        path.write_text("# Just a note\n")
+        assert read_frontmatter(path) == {}
+
+    def test_unterminated_frontmatter(self, tmp_path):
+        path = tmp_path / "broken.md"
+        path.write_text("---\ntype: recipe\n")
+        assert read_frontmatter(path) == {}
+
+    def test_utf8_bom(self, tmp_path):
+        path = tmp_path / "bom.md"
+        path.write_bytes(b"\xef\xbb\xbf---\ntype: recipe\n---\nBody\n")
+        assert read_frontmatter(path) == {"type": "recipe"}
+
+    def test_non_mapping_frontmatter(self, tmp_path):
+        path = tmp_path / "list.md"
+        path.write_text("---\n- a\n- b\n---\n")
+        assert read_frontmatter(path) == {}
+
+    def test_read_body_skips_header(self, recipe_path):
+        body = read_body(recipe_path)
+        assert not body.startswith("---")
+        assert "type: recipe" not in body
+        assert "### Ingredients" in body
+
+
+class TestParseRecipeFile:
+    def test_metadata_fields(self, recipe_path):
+        recipe = parse_recipe_file(recipe_path)
+        assert recipe is not None
+        assert recipe.servings == 4
+        assert recipe.total_time_min == 75
+        assert recipe.dietary_tags == ["gluten-free", "dairy-free"]
+        assert recipe.last_made == "2026-01-05"
+
+    def test_body_not_loaded_until_needed(self, recipe_path):
+        recipe = parse_recipe_file(recipe_path)
+        assert recipe.sections is None
+
+        raw = recipe.raw_ingredients
+        assert raw == extract_ingredients_section(read_body(recipe_path))
+        assert "2 cups white beans" in raw
+        assert recipe.sections is not None
+
+    def test_lazy_body_is_cached(self, recipe_path):
+        recipe = parse_recipe_file(recipe_path)
+        assert recipe.raw_ingredients is not None
+        recipe_path.unlink()
+        assert "white beans" in recipe.raw_ingredients
+
+    def test_missing_file_has_no_ingredients(self, recipe_path):
+        recipe = parse_recipe_file(recipe_path)
+        recipe_path.unlink()
+        assert recipe.raw_ingredients is None
+
+    def test_not_a_recipe(self, tmp_path):
+        path = tmp_path / "note.md"
+        path.write_text("---\ntype: note\n---\n")
+        assert parse_recipe_file(path) is None
+
+    def test_invalid_yaml(self, tmp_path):
+        path = tmp_path / "bad.md"
+        path.write_text("---\ntype: [recipe\n---\n")
+        assert parse_recipe_file(path) is None
+
+
+class TestCompactRecipes:
+    def test_models_have_no_instance_dict(self, recipe_path):
+        recipe = parse_recipe_file(recipe_path)
+        assert not hasattr(recipe, "__dict__")
+        with pytest.raises(AttributeError):
+            recipe._pending_hash = "abc"
+
+    def test_vocabulary_is_interned(self, tmp_path):
+        for name in ("One", "Two"):
+            (tmp_path / f"{name}.md").write_text(
+                "---\ntype: recipe\nmeal_type: dinner\ncuisine: Thai\n"
+                "dietary_tags: [vegan]\n"
+                "parsed_ingredients:\n"
+                "- section: null\n  items:\n  - {item: garlic, qty: 2, unit: clove}\n"
+                "---\n"
+            )
+        one = parse_recipe_file(tmp_path / "One.md")
+        two = parse_recipe_file(tmp_path / "Two.md")
+        assert one.meal_type is two.meal_type
+        assert one.cuisine is two.cuisine
+        assert one.dietary_tags[0] is two.dietary_tags[0]
+        item_one = one.parsed_ingredients[0].items[0]
+        item_two = two.parsed_ingredients[0].items[0]
+        assert item_one.item is item_two.item
+        assert item_one.unit is item_two.unit
+
+    def test_pickle_round_trip(self, recipe_path):
+        import pickle
+
+        recipe = parse_recipe_file(recipe_path)
+        recipe.pending_hash = "abc123"
+        restored = pickle.loads(pickle.dumps(recipe))
+        assert restored == recipe
+        assert restored.pending_hash == "abc123"
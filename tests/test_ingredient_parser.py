@@ -0,0 +1,277 @@
+"""Tests for the local ingredient parser and its use by index."""
+
+import json
+import re
+
+import pytest
+from meal_planner import haiku_parser
+from meal_planner.indexer import compute_ingredients_hash, parse_recipe_file, run_index
+from meal_planner.ingredient_parser import (
+    parse_ingredient_line,
+    parse_ingredient_lines,
+    parse_ingredients_locally,
+    parse_quantity,
+)
+from meal_planner.line_cache import line_cache_path, load_line_cache
+
+
+def _entry(line):
+    parsed = parse_ingredient_line(line)
+    return parsed.entry, parsed.confident
+
+
+class TestParseQuantity:
+    @pytest.mark.parametrize("text,expected", [
+        ("2", 2), ("1.5", 1.5), ("1/2", 0.5), ("1 1/2", 1.5),
+        ("½", 0.5), ("1½", 1.5), ("1 ¾", 1.75), ("1/0", None),
+    ])
+    def test_forms(self, text, expected):
+        assert parse_quantity(text) == expected
+
+
+class TestParseIngredientLine:
+    @pytest.mark.parametrize("line,qty,unit,item,notes", [
+        ("1 (13.5oz) can coconut milk", 1, "can", "coconut milk", "13.5oz"),
+        ("60 g (4 tablespoons) vegetable oil", 60, "g", "vegetable oil", "4 tablespoons"),
+        ("salt and pepper to taste", None, None, "salt and pepper", "to taste"),
+        ("Kosher salt", None, None, "kosher salt", None),
+        ("⅓ cup sugar", 0.333, "cup", "sugar", None),
+        ("1 1/2 cups milk", 1.5, "cups", "milk", None),
+        ("2 cloves garlic, minced", 2, "cloves", "garlic", "minced"),
+        ("2 large eggs", 2, None, "eggs", "large"),
+        ("1 T butter", 1, "tbsp", "butter", None),
+        ("1 lb. chicken thighs", 1, "lb", "chicken thighs", None),
+        ("3 fl oz cream", 3, "fl oz", "cream", None),
+        ("1 tomato", 1, None, "tomato", None),
+    ])
+    def test_confident(self, line, qty, unit, item, notes):
+        entry, confident = _entry(line)
+        assert confident
+        assert entry == {"qty": qty, "unit": unit, "item": item, "notes": notes}
+
+    @pytest.mark.parametrize("line,qty", [
+        ("2-3 tbsp olive oil", 3),
+        ("1 to 2 cups stock", 2),
+        ("1-1/2 cups flour", 1.5),
+        ("2 or 3 limes", 3),
+    ])
+    def test_ranges_use_upper_bound(self, line, qty):
+        assert _entry(line)[0]["qty"] == qty
+
+    @pytest.mark.parametrize("line", [
+        "Juice from 1/2 of a lemon",
+        "1 cup + 2 tbsp flour",
+        "cups flour",
+        "1 cup milk or 1/2 cup cream",
+        "a few sprigs thyme",
+        "some salt",
+        "a pinch of salt",
+    ])
+    def test_low_confidence(self, line):
+        assert _entry(line)[1] is False
+
+    def test_countless_unit_guesses_one(self):
+        entry, confident = _entry("Pinch of kosher salt")
+        assert not confident
+        assert entry == {"qty": 1, "unit": "pinch", "item": "kosher salt", "notes": None}
+
+
+class TestParseIngredientLines:
+    RAW = """\
+- 1 cup rice
+- (Optional)
+
+**For the Sauce:**
+- 2 tbsp soy sauce
+* **Crumb Mixture**
+- [ ] ½ cup panko
+Toppings (85%):
+- Scallions
+"""
+
+    def test_sections_and_optional(self):
+        sections, confident = parse_ingredients_locally(self.RAW)
+        assert confident
+        assert [s["section"] for s in sections] == [
+            None, "Sauce", "Crumb Mixture", "Toppings",
+        ]
+        assert sections[0]["items"] == [
+            {"qty": 1, "unit": "cup", "item": "rice", "notes": "optional"},
+        ]
+        assert sections[2]["items"][0]["item"] == "panko"
+
+    def test_matches_frontmatter_format(self):
+        sections, _ = parse_ingredients_locally(self.RAW)
+        formatted = haiku_parser.parsed_to_frontmatter_format(sections)
+        assert formatted[1] == {
+            "section": "Sauce",
+            "hash": sections[1]["hash"],
+            "items": [{"qty": 2, "unit": "tbsp", "item": "soy sauce"}],
+        }
+
+    def test_bold_ingredient_is_not_a_header(self):
+        lines = parse_ingredient_lines("- **2 cups flour**")
+        assert [line.entry["item"] for line in lines] == ["flour"]
+
+
+def _recipe(path, ingredients):
+    path.write_text(
+        "---\ntype: recipe\nmeal_type: dinner\n---\n\n## Ingredients\n\n"
+        + "\n".join(f"- {line}" for line in ingredients)
+        + "\n"
+    )
+
+
+class TestIndexIntegration:
+    def test_skip_api_writes_local_parse(self, tmp_path):
+        _recipe(tmp_path / "Rice.md", ["1 cup rice", "2 cups water"])
+        run_index(tmp_path, skip_api=True)
+
+        recipe = parse_recipe_file(tmp_path / "Rice.md")
+        assert [i.item for i in recipe.parsed_ingredients[0].items] == ["rice", "water"]
+        assert recipe.ingredients_hash == compute_ingredients_hash(recipe.raw_ingredients)
+
+    def test_skip_api_keeps_uncertain_lines_as_written(self, tmp_path):
+        _recipe(tmp_path / "Soup.md", ["1 cup + 2 tbsp milk", "a few sprigs thyme", "1 cup rice"])
+        run_index(tmp_path, skip_api=True)
+
+        items = parse_recipe_file(tmp_path / "Soup.md").parsed_ingredients[0].items
+        assert [(i.qty, i.unit, i.item) for i in items] == [
+            (None, None, "1 cup + 2 tbsp milk"),
+            (None, None, "a few sprigs thyme"),
+            (1, "cup", "rice"),
+        ]
+
+    def test_skip_api_marks_uncertain_recipes_for_haiku(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "Lemonade.md", ["Juice from 1/2 of a lemon", "1 cup water"])
+        run_index(tmp_path, skip_api=True)
+        recipe = parse_recipe_file(tmp_path / "Lemonade.md")
+        assert recipe.ingredients_hash.startswith(haiku_parser.LOCAL_HASH_PREFIX)
+
+        # Re-running with --skip-api leaves the note alone...
+        mtime = (tmp_path / "Lemonade.md").stat().st_mtime_ns
+        run_index(tmp_path, skip_api=True)
+        assert (tmp_path / "Lemonade.md").stat().st_mtime_ns == mtime
+
+        # ...while a Haiku run sends only the uncertain line
+        prompts = []
+
+        def fake_haiku(prompt, timeout=120):
+            prompts.append(prompt)
+            return json.dumps(
+                {"0": {"qty": 0.5, "unit": "whole", "item": "lemon", "notes": "juiced"}}
+            )
+
+        fake_claude(fake_haiku)
+        run_index(tmp_path)
+
+        assert len(prompts) == 1
+        assert prompts[0].endswith("0: Juice from 1/2 of a lemon")
+        recipe = parse_recipe_file(tmp_path / "Lemonade.md")
+        assert [(i.qty, i.item) for i in recipe.parsed_ingredients[0].items] == [
+            (0.5, "lemon"), (1, "water"),
+        ]
+        assert recipe.ingredients_hash == compute_ingredients_hash(recipe.raw_ingredients)
+
+    def test_shared_uncertain_lines_sent_once(self, tmp_path, fake_claude):
+        for name in ("A", "B"):
+            _recipe(tmp_path / f"{name}.md", ["1 cup + 2 tbsp flour"])
+        calls = []
+        fake_claude(
+            lambda prompt, timeout=120: calls.append(prompt)
+            or '{"0": {"qty": 1.125, "unit": "cup", "item": "flour"}}',
+        )
+        run_index(tmp_path)
+        assert len(calls) == 1
+        assert parse_recipe_file(tmp_path / "B.md").parsed_ingredients[0].items[0].qty == 1.125
+
+    def test_failed_lines_leave_recipe_unwritten(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "Odd.md", ["1 cup + 2 tbsp flour"])
+        fake_claude(lambda p, timeout=120: None)
+        run_index(tmp_path)
+        assert parse_recipe_file(tmp_path / "Odd.md").parsed_ingredients == []
+
+
+class TestLineCache:
+    def _fake(self, fake_claude, calls):
+        def fake_haiku(prompt, timeout=120):
+            calls.append(prompt)
+            return '{"0": {"qty": 1.125, "unit": "cup", "item": "flour"}}'
+
+        fake_claude(fake_haiku)
+
+    def test_force_rerun_uses_cache(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "A.md", ["1 cup + 2 tbsp flour"])
+        calls = []
+        self._fake(fake_claude, calls)
+        run_index(tmp_path)
+        run_index(tmp_path, force=True)
+        assert len(calls) == 1
+        assert parse_recipe_file(tmp_path / "A.md").parsed_ingredients[0].items[0].qty == 1.125
+
+    def test_new_recipe_with_known_line_needs_no_call(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "A.md", ["1 cup + 2 tbsp flour"])
+        calls = []
+        self._fake(fake_claude, calls)
+        run_index(tmp_path)
+        _recipe(tmp_path / "B.md", ["1 Cup +  2 tbsp flour", "1 cup milk"])
+        run_index(tmp_path)
+        assert len(calls) == 1
+        items = parse_recipe_file(tmp_path / "B.md").parsed_ingredients[0].items
+        assert [(i.qty, i.item) for i in items] == [(1.125, "flour"), (1, "milk")]
+
+    def test_skip_api_uses_cached_lines(self, tmp_path, fake_claude):
+        _recipe(tmp_path / "A.md", ["1 cup + 2 tbsp flour"])
+        self._fake(fake_claude, [])
+        run_index(tmp_path)
+        _recipe(tmp_path / "B.md", ["1 cup + 2 tbsp flour"])
+        run_index(tmp_path, skip_api=True)
+        recipe = parse_recipe_file(tmp_path / "B.md")
+        assert recipe.ingredients_hash == compute_ingredients_hash(recipe.raw_ingredients)
+
+    def test_truncated_record_is_ignored(self, tmp_path):
+        path = line_cache_path(tmp_path)
+        path.parent.mkdir()
+        path.write_text(
+            '{"line": "1 cup + 2 tbsp flour", "entry": null}\n{"line": "2 eg'
+        )
+        cache = load_line_cache(tmp_path)
+        assert len(cache) == 1
+        assert "1 CUP + 2 tbsp  flour" in cache
+        assert cache.get("1 cup + 2 tbsp flour") is None
+
+
+class TestSectionHashes:
+    LINES = ["1 cup + 2 tbsp flour", "**For the Sauce:**", "juice of 1 lime"]
+
+    def test_hash_covers_only_its_section(self):
+        before = parse_ingredients_locally("\n".join(self.LINES))[0]
+        edited = [self.LINES[0].replace("flour", "flours"), *self.LINES[1:]]
+        after = parse_ingredients_locally("\n".join(edited))[0]
+        assert before[0]["hash"] != after[0]["hash"]
+        assert before[1]["hash"] == after[1]["hash"]
+
+    def test_edit_re_parses_only_changed_section(self, tmp_path, fake_claude):
+        prompts = []
+
+        def fake_haiku(prompt, timeout=120):
+            prompts.append(prompt)
+            keys = re.findall(r"^(\d+): ", prompt, re.MULTILINE)
+            return json.dumps({k: {"qty": 1, "item": f"run {len(prompts)}"} for k in keys})
+
+        fake_claude(fake_haiku)
+        _recipe(tmp_path / "A.md", self.LINES)
+        run_index(tmp_path)
+
+        # Without the line cache, only the edited section goes back to Haiku
+        line_cache_path(tmp_path).unlink()
+        path = tmp_path / "A.md"
+        path.write_text(path.read_text().replace("2 tbsp flour", "3 tbsp flour"))
+        run_index(tmp_path)
+
+        assert len(prompts) == 2
+        assert prompts[1].endswith("0: 1 cup + 3 tbsp flour")
+        sections = parse_recipe_file(tmp_path / "A.md").parsed_ingredients
+        assert [(s.section, s.items[0].item) for s in sections] == [
+            (None, "run 2"), ("Sauce", "run 1"),
+        ]
@@ -0,0 +1,155 @@
+"""Tests for the sidecar parsed-ingredient store (index --sidecar)."""
+
+import json
+
+from meal_planner import indexer
+from meal_planner.catalog import open_catalog
+from meal_planner.indexer import compute_ingredients_hash, parse_recipe_file, run_index
+from meal_planner.ingredient_store import compact_store, store_path
+from meal_planner.recipe_index import load_recipes
+
+NOTE = """---
+type: recipe
+meal_type: dinner
+---
+
+## Ingredients
+
+- 1 cup rice
+- 1 cup + 2 tbsp water
+"""
+
+ANSWER = '{"0": {"qty": 1.125, "unit": "cup", "item": "water"}}'
+
+
+def _items(recipe):
+    return [(i.qty, i.item) for s in recipe.parsed_ingredients for i in s.items]
+
+
+class TestSidecar:
+    def test_notes_are_not_rewritten(self, tmp_path, fake_claude):
+        path = tmp_path / "Rice.md"
+        path.write_text(NOTE)
+        fake_claude(lambda prompt, timeout: ANSWER)
+        run_index(tmp_path, sidecar=True)
+
+        assert path.read_text() == NOTE
+        assert store_path(tmp_path).exists()
+        recipe = parse_recipe_file(path)
+        assert _items(recipe) == [(1, "rice"), (1.125, "water")]
+        assert recipe.ingredients_hash == compute_ingredients_hash(recipe.raw_ingredients)
+        # The persistent index was refreshed with the joined recipe
+        assert _items(load_recipes(tmp_path)[0]) == _items(recipe)
+
+    def test_second_run_skips_joined_recipes(self, tmp_path, fake_claude):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        calls = []
+        fake_claude(lambda prompt, timeout: calls.append(prompt) or ANSWER)
+        run_index(tmp_path, sidecar=True)
+        size = store_path(tmp_path).stat().st_size
+        run_index(tmp_path, sidecar=True)
+        assert len(calls) == 1
+        assert store_path(tmp_path).stat().st_size == size
+
+    def test_store_entry_for_current_text_wins(self, tmp_path):
+        path = tmp_path / "Rice.md"
+        path.write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+
+        # Stale frontmatter from before the switch to --sidecar
+        path.write_text(
+            NOTE.replace(
+                "meal_type: dinner\n",
+                "meal_type: dinner\nparsed_ingredients:\n- section: null\n"
+                "  items:\n  - {qty: 9, unit: null, item: old}\ningredients_hash: old\n",
+            )
+        )
+        assert _items(parse_recipe_file(path))[0] == (1, "rice")
+
+    def test_local_parse_keeps_its_prefix(self, tmp_path):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+        assert parse_recipe_file(tmp_path / "Rice.md").ingredients_hash.startswith("local:")
+
+    def test_catalog_is_resynced(self, tmp_path, fake_claude):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        fake_claude(lambda prompt, timeout: None)
+        run_index(tmp_path, sidecar=True, catalog=True)
+
+        fake_claude(lambda prompt, timeout: ANSWER)
+        run_index(tmp_path, sidecar=True)
+        catalog = open_catalog(tmp_path)
+        try:
+            assert _items(catalog.all_recipes()[0]) == [(1, "rice"), (1.125, "water")]
+        finally:
+            catalog.close()
+
+    def test_unchanged_notes_are_joined_without_reading_the_body(self, tmp_path, monkeypatch):
+        path = tmp_path / "Rice.md"
+        path.write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+
+        def fail(_path):
+            raise AssertionError("body read")
+
+        monkeypatch.setattr(indexer, "read_recipe_sections", fail)
+        assert _items(parse_recipe_file(path))[0] == (1, "rice")
+
+    def test_edited_notes_are_rehashed(self, tmp_path):
+        path = tmp_path / "Rice.md"
+        path.write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+
+        path.write_text(NOTE.replace("1 cup rice", "2 cups rice"))
+        recipe = parse_recipe_file(path)
+        assert recipe.parsed_ingredients == []
+        # Back to the text the store was written for
+        path.write_text(NOTE)
+        assert _items(parse_recipe_file(path))[0] == (1, "rice")
+
+
+class TestCompaction:
+    def test_index_keeps_latest_record_per_hash(self, tmp_path):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        (tmp_path / "Rice 2.md").write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+        path = store_path(tmp_path)
+        (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+
+        stale = dict(record, parsed_ingredients=[], files={})
+        latest = dict(record, files={})
+        with open(path, "a") as f:
+            f.write(json.dumps(stale) + "\n" + json.dumps(latest) + "\n")
+        assert compact_store(tmp_path) == 2
+
+        (compacted,) = [json.loads(line) for line in path.read_text().splitlines()]
+        assert compacted["parsed_ingredients"] == record["parsed_ingredients"]
+        # Both notes still join on their recorded hash
+        assert sorted(compacted["files"]) == sorted(record["files"])
+        assert compact_store(tmp_path) == 0
+
+    def test_run_index_compacts(self, tmp_path):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+        path = store_path(tmp_path)
+        line = path.read_text()
+        path.write_text(line * 3)
+        run_index(tmp_path, skip_api=True)
+        assert path.read_text().count("\n") == 1
+
+    def test_failed_compaction_does_not_abort_index(self, tmp_path, caplog):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        run_index(tmp_path, skip_api=True, sidecar=True)
+        path = store_path(tmp_path)
+        path.write_text(path.read_text() * 2)
+        # Something in the way of the rewrite
+        path.with_suffix(".jsonl.tmp").mkdir()
+
+        run_index(tmp_path, skip_api=True)
+        assert "Could not compact ingredient store" in caplog.text
+        assert path.read_text().count("\n") == 2
+
+    def test_no_store_is_created_without_sidecar(self, tmp_path):
+        (tmp_path / "Rice.md").write_text(NOTE)
+        run_index(tmp_path, skip_api=True)
+        assert not store_path(tmp_path).exists()
@@ -0,0 +1,90 @@
+"""Tests for the single-pass markdown section tokenizer."""
+
+from meal_planner.markdown_sections import find_section, split_sections
+
+BODY = """\
+## Chicken Fried Rice
+
+Intro paragraph.
+
+### Ingredients
+
+**For the Rice:**
+- 2 cups rice
+
+#### For the Sauce
+- 2 Tbsp soy sauce
+
+### Directions
+
+1. Cook the rice.
+2. Stir-fry.
+
+### Notes:
+
+Keeps for 3 days.
+"""
+
+
+class TestSplitSections:
+    def test_finds_all_sections(self):
+        sections = split_sections(BODY)
+        assert list(sections) == [
+            "chicken fried rice", "ingredients", "directions", "notes",
+        ]
+
+    def test_subheadings_stay_in_parent(self):
+        ingredients = split_sections(BODY)["ingredients"]
+        assert "#### For the Sauce" in ingredients
+        assert "2 Tbsp soy sauce" in ingredients
+        assert "Cook the rice" not in ingredients
+
+    def test_level_3_subsections_stay_in_level_2_section(self):
+        body = "## Directions\n1. Prep.\n### Make the Sauce\n2. Whisk.\n## Notes\nNone.\n"
+        sections = split_sections(body)
+        assert sections["directions"] == "1. Prep.\n### Make the Sauce\n2. Whisk."
+        assert sections["make the sauce"] == "2. Whisk."
+
+    def test_section_ends_at_same_level_heading(self):
+        directions = split_sections(BODY)["directions"]
+        assert directions == "1. Cook the rice.\n2. Stir-fry."
+
+    def test_trailing_colon_removed_from_key(self):
+        assert split_sections(BODY)["notes"] == "Keeps for 3 days."
+
+    def test_parent_contains_children(self):
+        title = split_sections(BODY)["chicken fried rice"]
+        assert title.startswith("Intro paragraph.")
+        assert "### Directions" in title
+
+    def test_first_duplicate_wins(self):
+        body = "## Ingredients\n- a\n## Ingredients\n- b\n"
+        assert split_sections(body)["ingredients"] == "- a"
+
+    def test_h1_and_h4_do_not_open_sections(self):
+        sections = split_sections("# Title\n#### Deep\ntext\n")
+        assert sections == {}
+
+    def test_empty_body(self):
+        assert split_sections("") == {}
+
+
+class TestFindSection:
+    def test_exact_match(self):
+        assert find_section(split_sections(BODY), "Directions").startswith("1.")
+
+    def test_prefix_match(self):
+        sections = split_sections("### Ingredients (serves 4)\n- 1 egg\n")
+        assert find_section(sections, "ingredients") == "- 1 egg"
+
+    def test_first_prefix_in_document_order(self):
+        sections = split_sections(
+            "### Ingredients for the dough\n- flour\n### Ingredients\n- egg\n"
+        )
+        assert find_section(sections, "ingredients") == "- flour"
+
+    def test_empty_section_is_none(self):
+        assert find_section(split_sections("## Directions\n\n## Notes\n"), "directions") is None
+
+    def test_missing_section(self):
+        assert find_section(split_sections(BODY), "equipment") is None
@@ -0,0 +1,202 @@
+"""Tests for the memory-mapped columnar nutrition snapshot."""
+
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from meal_planner.indexer import run_index
+from meal_planner import nutrition_snapshot
+from meal_planner.nutrition_snapshot import open_snapshot, snapshot_path
+from meal_planner.planner import macro_table, select_candidates
+from meal_planner.recipe_index import load_recipes
+from meal_planner.suggest import filter_recipes, score_recipe, suggest_recipes
+
+_recent = str(date.today() - timedelta(days=3))
+_older = str(date.today() - timedelta(days=20))
+
+RECIPES = {
+    "Breakfast Slop": dict(meal_type="breakfast", calories=400, protein_g=30,
+                           total_time="10 minutes", dietary_tags="[vegetarian]",
+                           rating=4.5, last_made=_recent),
+    "Chicken Tikka Masala": dict(meal_type="dinner", calories=550.5, protein_g=40,
+                                 total_time="45 minutes", cuisine="Indian",
+                                 dietary_tags="[gluten-free]", tried="true"),
+    "Beef Stew Recipe": dict(meal_type="Main Course", calories=480, protein_g=35,
+                             total_time="3 hours", cuisine="Irish", rating=6,
+                             favorite="true", last_made=_older),
+    "Tortilla Soup": dict(meal_type="soup", calories=300, protein_g=18,
+                          cuisine="Mexican", dietary_tags="[Gluten-Free, vegetarian]",
+                          last_made="someday"),
+    "Caesar Salad": dict(categories="[lunch, salad]", calories=350, protein_g=20,
+                         total_time="15 minutes", rating=3),
+    "Granola Bar": dict(meal_type="snack", calories=200, protein_g=0),
+    "Mystery Stew": dict(meal_type="dinner"),
+    "Protein Shake": dict(meal_type="breakfast", protein_g=45.25),
+}
+
+
+# Parsed by the local ingredient parser during `index --skip-api`
+INGREDIENTS = {"Granola Bar": "- 2 cups oats"}
+
+
+def _write(path, fields, ingredients="- 1 thing"):
+    lines = ["---", "type: recipe"]
+    lines += [f"{k}: {v}" for k, v in fields.items()]
+    lines += ["---", "", "### Ingredients", "", ingredients, ""]
+    path.write_text("\n".join(lines))
+
+
+@pytest.fixture
+def cooking_dir(tmp_path):
+    for name, fields in RECIPES.items():
+        _write(tmp_path / f"{name}.md", fields, INGREDIENTS.get(name, "- 1 thing"))
+    (tmp_path / "Not A Recipe.md").write_text("---\ntype: note\n---\n")
+    run_index(tmp_path, skip_api=True)
+    return tmp_path
+
+
+@pytest.fixture
+def snapshot(cooking_dir):
+    return open_snapshot(cooking_dir)
+
+
+@pytest.fixture
+def recipes(cooking_dir):
+    return load_recipes(cooking_dir)
+
+
+def _names(recipes):
+    return [r.name for r in recipes]
+
+
+class TestSnapshotFiles:
+    def test_index_writes_memory_mappable_columns(self, cooking_dir):
+        calories = np.load(snapshot_path(cooking_dir) / "calories.npy", mmap_mode="r")
+        assert isinstance(calories, np.memmap)
+        assert len(calories) == len(RECIPES)
+
+    def test_missing_snapshot_returns_none(self, tmp_path):
+        assert open_snapshot(tmp_path) is None
+
+    def test_columns_follow_file_order(self, snapshot):
+        assert snapshot["name"].tolist() == sorted(RECIPES)
+        assert np.isnan(snapshot["calories"][snapshot["name"] == "Mystery Stew"]).all()
+
+    def test_stale_snapshot_is_rebuilt(self, cooking_dir, snapshot):
+        path = cooking_dir / "Granola Bar.md"
+        _write(path, dict(meal_type="snack", calories=999))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        (cooking_dir / "Caesar Salad.md").unlink()
+
+        rebuilt = open_snapshot(cooking_dir)
+        assert "Caesar Salad" not in rebuilt["name"].tolist()
+        assert rebuilt["calories"][rebuilt.select(meal_type="snack")].tolist() == [999]
+
+    def test_too_many_dietary_tags_skips_snapshot(self, tmp_path):
+        tags = ", ".join(f"tag{i}" for i in range(70))
+        _write(tmp_path / "Everything.md", dict(dietary_tags=f"[{tags}]"))
+        run_index(tmp_path, skip_api=True)
+        assert not snapshot_path(tmp_path).exists()
+
+
+class TestSelect:
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"meal_type": "dinner"},
+        {"meal_type": "Lunch"},
+        {"meal_type": "breakfast", "max_time": 5},
+        {"max_time": 30},
+        {"cuisine": "ind"},
+        {"cuisine": "MEX"},
+        {"dietary_tags": ["gluten-free"]},
+        {"dietary_tags": ["Vegetarian", "gluten-free"]},
+        {"dietary_tags": ["paleo"]},
+        {"exclude": ["stew"]},
+        {"exclude": ["Soup", "bar"]},
+        {"min_protein": 30},
+        {"max_calories": 400},
+    ])
+    def test_matches_python_filter(self, snapshot, recipes, kwargs):
+        assert _names(snapshot.recipes(snapshot.select(**kwargs))) == _names(
+            filter_recipes(recipes, **kwargs)
+        )
+
+    def test_supports_only_known_meal_types(self, snapshot):
+        assert snapshot.supports("Dinner")
+        assert snapshot.supports(None)
+        assert not snapshot.supports("brunch")
+
+
+class TestSuggestFromSnapshot:
+    @pytest.mark.parametrize("targets", [
+        {},
+        {"target_calories": 500},
+        {"target_protein": 30},
+        {"target_calories": 450, "target_protein": 35},
+    ])
+    def test_matches_object_scoring(self, cooking_dir, recipes, targets):
+        expected = sorted(
+            (score_recipe(r, **targets) for r in recipes),
+            key=lambda s: s.score,
+            reverse=True,
+        )[:5]
+        got = suggest_recipes(cooking_dir, limit=5, **targets)
+        assert [(s.recipe.name, s.score, s.suggested_servings, s.breakdown)
+                for s in got] == [
+            (s.recipe.name, s.score, s.suggested_servings, s.breakdown)
+            for s in expected
+        ]
+
+    def test_pantry_items_use_object_scoring(self, cooking_dir):
+        scored = suggest_recipes(cooking_dir, available_ingredients=["oats"], limit=1)
+        assert scored[0].recipe.name == "Granola Bar"
+        assert scored[0].breakdown["pantry"] == 30.0
+
+    def test_unsupported_meal_type_falls_back(self, cooking_dir):
+        scored = suggest_recipes(cooking_dir, meal_type="salad")
+        assert _names(s.recipe for s in scored) == ["Caesar Salad"]
+
+
+class TestPlannerTables:
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"meal_type": "breakfast"},
+        {"meal_type": "dinner", "max_time": 60},
+        {"meal_type": "lunch", "exclude": ["salad"]},
+    ])
+    def test_snapshot_candidates_match_objects(self, snapshot, recipes, kwargs):
+        expected, _ = select_candidates(recipes, **kwargs)
+        got, rows = select_candidates(snapshot, **kwargs)
+        assert _names(got) == _names(expected)
+        for field in ("calories", "protein_g"):
+            assert macro_table(got, field, 10, snapshot, rows) == macro_table(
+                expected, field, 10
+            )
+
+    def test_injected_candidates_read_from_objects(self, snapshot, recipes):
+        candidates, rows = select_candidates(snapshot, meal_type="breakfast")
+        candidates.append(next(r for r in recipes if r.name == "Granola Bar"))
+        assert macro_table(candidates, "calories", 10, snapshot, rows) == [4000, 2000]
+
+    def test_candidates_come_from_snapshot_records(self, snapshot, recipes, monkeypatch):
+        def no_load(*args):
+            raise AssertionError("loaded the recipe index or a recipe file")
+
+        monkeypatch.setattr(nutrition_snapshot, "parse_recipe_file", no_load)
+        monkeypatch.setattr(nutrition_snapshot, "load_recipe_index", no_load)
+        got, _ = select_candidates(snapshot, meal_type="dinner")
+        expected, _ = select_candidates(recipes, meal_type="dinner")
+        assert got == expected
+
+    def test_unreadable_records_are_parsed(self, snapshot, recipes, monkeypatch):
+        parsed = []
+        parse = nutrition_snapshot.parse_recipe_file
+        monkeypatch.setattr(
+            nutrition_snapshot, "parse_recipe_file", lambda p: parsed.append(p) or parse(p)
+        )
+        (snapshot.path / nutrition_snapshot.RECIPES_FILE).unlink()
+        got, _ = select_candidates(snapshot, meal_type="breakfast")
+        assert _names(got) == _names(select_candidates(recipes, meal_type="breakfast")[0])
+        assert len(parsed) == len(got)
@@ -0,0 +1,105 @@
+"""Tests for cross-checking stored parses against the local parser (index --verify)."""
+
+import json
+import re
+
+import yaml
+from meal_planner.indexer import compute_ingredients_hash, parse_recipe_file, run_index
+from meal_planner.parse_verify import compare_entries, head_noun
+
+BODY = """
+## Ingredients
+
+- 1 cup water
+- 2 cups rice
+- 1 cup + 2 tbsp flour
+"""
+
+# As an older whole-recipe Haiku parse might have stored it: rice has the
+# wrong quantity, and flour reads differently from the local best guess
+STORED = [
+    {
+        "section": None,
+        "items": [
+            {"qty": 1, "unit": "cup", "item": "water"},
+            {"qty": 3, "unit": "cups", "item": "rice"},
+            {"qty": 1.125, "unit": "cup", "item": "flour"},
+        ],
+    }
+]
+
+
+def _note(path, parsed=STORED):
+    path.write_text("---\ntype: recipe\n---\n" + BODY)
+    raw = parse_recipe_file(path).raw_ingredients
+    meta = {
+        "type": "recipe",
+        "parsed_ingredients": parsed,
+        "ingredients_hash": compute_ingredients_hash(raw),
+    }
+    path.write_text("---\n" + yaml.safe_dump(meta, sort_keys=False) + "---\n" + BODY)
+
+
+def _report(capsys):
+    return json.loads(capsys.readouterr().out)["verify"]
+
+
+class TestCompare:
+    def test_head_noun(self):
+        assert head_noun("boneless chicken breasts") == "breast"
+        assert head_noun("Cherry Tomatoes") == "tomato"
+        assert head_noun("fresh berries") == "berry"
+        assert head_noun("sea salt") == head_noun("salt")
+        assert head_noun(None) == ""
+
+    def test_fields(self):
+        local = {"qty": 0.333, "unit": "tablespoons", "item": "olive oil"}
+        stored = {"qty": 1 / 3, "unit": "Tbsp", "item": "extra virgin olive oil"}
+        assert compare_entries(local, stored) == {"qty": True, "unit": True, "item": True}
+        assert compare_entries(local, {**stored, "qty": None, "unit": None}) == {
+            "qty": False, "unit": False, "item": True,
+        }
+
+
+class TestVerify:
+    def test_resends_only_confident_disagreements(self, tmp_path, fake_claude, capsys):
+        _note(tmp_path / "Rice.md")
+        prompts = []
+
+        def fake_haiku(prompt, timeout):
+            prompts.append(prompt)
+            keys = re.findall(r"^(\d+): ", prompt, re.MULTILINE)
+            return json.dumps({k: {"qty": 2, "unit": "cups", "item": "rice"} for k in keys})
+
+        fake_claude(fake_haiku)
+        run_index(tmp_path, verify=True)
+
+        assert len(prompts) == 1 and prompts[0].endswith("0: 2 cups rice")
+        items = parse_recipe_file(tmp_path / "Rice.md").parsed_ingredients[0].items
+        assert [(i.qty, i.item) for i in items] == [(1, "water"), (2, "rice"), (1.125, "flour")]
+
+        report = _report(capsys)
+        assert report["lines"] == 3 and report["disagreements"] == 2
+        assert report["agreement"] == {"qty": 0.3333, "unit": 1.0, "item": 1.0}
+        assert (report["resent"], report["changed"], report["repaired_recipes"]) == (1, 1, 1)
+
+    def test_skip_api_only_reports(self, tmp_path, fake_claude, capsys):
+        _note(tmp_path / "Rice.md")
+        before = (tmp_path / "Rice.md").read_text()
+        fake_claude(lambda prompt, timeout: 1 / 0)
+        run_index(tmp_path, verify=True, skip_api=True)
+
+        assert (tmp_path / "Rice.md").read_text() == before
+        assert _report(capsys)["disagreements"] == 2
+
+    def test_unaligned_section_is_kept(self, tmp_path, fake_claude, capsys):
+        # Haiku merged two lines into one item: the section cannot be lined up
+        parsed = [{"section": None, "items": STORED[0]["items"][:2]}]
+        _note(tmp_path / "Rice.md", parsed)
+        fake_claude(lambda prompt, timeout: 1 / 0)
+        run_index(tmp_path, verify=True)
+
+        report = _report(capsys)
+        assert report["lines"] == 0 and report["unaligned_lines"] == 3
+        items = parse_recipe_file(tmp_path / "Rice.md").parsed_ingredients[0].items
+        assert [i.qty for i in items] == [1, 3]
@@ -2,6 +2,7 @@
 
 import copy
 import json
+import re
 from pathlib import Path
 
 import pytest
@@ -9,7 +10,12 @@ from meal_planner.cli import build_parser
 from meal_planner.config import DEFAULTS
 from meal_planner.models import MealType, Recipe
 from meal_planner.pins import parse_pin
-from meal_planner.planner import build_meal_plan, format_plan_json
+from meal_planner.planner import (
+    SolveStats,
+    build_meal_plan,
+    format_plan_json,
+    prune_candidates,
+)
 from meal_planner.shopping import build_shopping_sections
 
 
@@ -391,6 +397,151 @@ class TestRequiredGroups:
         assert plan is not None
 
 
+class TestFormulations:
+    @pytest.mark.parametrize("prep", ["fresh", "leftover"])
+    def test_table_matches_element_objective(self, solver_recipes, prep):
+        """Both encodings describe the same model, so reach the same optimum."""
+        config = make_config()
+        config["prep_styles"]["breakfast"] = "batch" if prep == "leftover" else "fresh"
+        config["prep_styles"]["lunch"] = prep
+        config["prep_styles"]["dinner"] = prep
+        config["schedule"]["cook_days"] = ["monday", "wednesday"]
+        objectives = {}
+        for formulation in ("element", "table"):
+            stats = SolveStats()
+            plan = build_meal_plan(
+                cooking_path=Path("unused"),
+                config=copy.deepcopy(config),
+                recipes=solver_recipes,
+                formulation=formulation,
+                solve_stats=stats,
+            )
+            assert plan is not None
+            assert stats.formulation == formulation
+            assert stats.status == "OPTIMAL"
+            objectives[formulation] = stats.objective
+        assert objectives["table"] == objectives["element"]
+
+    def test_table_plan_respects_pins_and_servings(self, solver_recipes):
+        config = make_config()
+        config["schedule"]["meals_per_day"].append("snack")
+        config["nutrition"]["meal_allocation"]["snack"] = 0.1
+        pins = [parse_pin("tuesday:dinner:Beef Stew Recipe")]
+        plan = build_meal_plan(
+            cooking_path=Path("unused"),
+            config=config,
+            pins=pins,
+            recipes=solver_recipes,
+            formulation="table",
+        )
+        assert plan is not None
+        assert len(plan.slots) == 12
+        dinner = next(
+            s for s in plan.slots if s.day == 1 and s.meal_type == MealType.DINNER
+        )
+        assert dinner.recipe.name == "Beef Stew Recipe"
+        for slot in plan.slots:
+            assert 0.5 <= slot.servings <= 4.0
+            assert slot.calories == pytest.approx(slot.recipe.calories * slot.servings)
+
+    def test_unknown_formulation_rejected(self, solver_recipes):
+        with pytest.raises(ValueError, match="formulation"):
+            build_meal_plan(
+                cooking_path=Path("unused"),
+                config=make_config(),
+                recipes=solver_recipes,
+                formulation="lp",
+            )
+
+
+def _dish(name, calories, protein, main_ingredient=None, meal_type="dinner"):
+    return Recipe(name=name, file_path=Path(f"fake/{name}.md"), calories=calories,
+                  protein_g=protein, meal_type=meal_type, main_ingredient=main_ingredient)
+
+
+class TestPruneCandidates:
+    def test_identical_recipes_collapsed(self):
+        candidates = [
+            _dish("Big", 1500, 80),
+            _dish("Big Twin", 1500, 80),
+            _dish("Big Beef", 1500, 80, "beef"),  # different group
+            _dish("Bigger", 1600, 80),
+        ]
+        assert prune_candidates(candidates, 500, 30) == [0, 2, 3]
+        assert prune_candidates(candidates, 500, 30, min_keep=2) == [0, 1, 2, 3]
+        assert prune_candidates(candidates, 500, 30, keep={1}) == [0, 1, 2, 3]
+
+    # Per-meal target 500 kcal / 30 g protein
+    def test_top_k_keep_and_min_keep(self, caplog):
+        candidates = [_dish(f"Chicken {c}", c, 30, "chicken") for c in (200, 500, 900, 300)]
+        candidates.append(_dish("Beef", 800, 20, "beef"))
+        assert prune_candidates(candidates, 500, 30, top_k=1) == [1, 4]
+        assert prune_candidates(candidates, 500, 30, top_k=1, keep={2}) == [1, 2, 4]
+        assert "added back" not in caplog.text
+        assert prune_candidates(candidates, 500, 30, top_k=1, min_keep=3) == [0, 1, 4]
+        assert "added back 1" in caplog.text
+
+    def test_top_k_adds_back_new_groups_first(self):
+        candidates = [
+            _dish("Chicken", 500, 30, "chicken"),
+            _dish("Chicken Again", 450, 28, "chicken"),
+            _dish("Beef", 500, 30, "beef"),
+            _dish("Tofu Scramble", 900, 10, "tofu"),
+        ]
+        # Chicken Again fits better, but a third dinner needs a third group
+        assert prune_candidates(candidates, 500, 30, top_k=1, min_keep=3) == [0, 2, 3]
+
+    def test_top_k_must_be_positive(self):
+        with pytest.raises(ValueError, match="top_k"):
+            prune_candidates([_dish("Chicken", 500, 30)], 500, 30, top_k=0)
+
+    def test_plan_keeps_pins_and_required_groups(self, solver_recipes):
+        recipes = [r for r in solver_recipes if r.meal_type != "dinner"] + [
+            _dish("Chicken Tikka", 550, 40, "chicken"),
+            _dish("Chicken Parm", 600, 45, "chicken"),
+            _dish("Chicken Stir Fry", 500, 35, "chicken"),
+            _dish("Beef Stew", 480, 35, "beef"),
+            _dish("Beef Chili", 700, 50, "beef"),
+            _dish("Pasta Primavera", 500, 18, "pasta"),
+        ]
+        config = make_config()
+        config["preferences"]["required_ingredient_groups"] = ["beef"]
+        plan = build_meal_plan(
+            cooking_path=Path("unused"),
+            config=config,
+            pins=[parse_pin("monday:dinner:Chicken Parm")],
+            recipes=recipes,
+            top_k=1,
+        )
+        assert plan is not None
+        dinners = {s.day: s.recipe for s in plan.slots if s.meal_type == MealType.DINNER}
+        assert dinners[0].name == "Chicken Parm"
+        assert "beef" in {r.main_ingredient for r in dinners.values()}
+
+    def test_pruning_keeps_the_optimum(self, solver_recipes, caplog):
+        twins = [
+            _dish(f"Beef Stew {n}", 480, 35) for n in range(4)
+        ] + [_dish(f"Caesar Salad {n}", 350, 20, meal_type="lunch") for n in range(4)]
+        recipes = solver_recipes + twins
+        caplog.set_level("INFO", logger="meal_planner.planner")
+        objectives = {}
+        for prune in (True, False):
+            stats = SolveStats()
+            plan = build_meal_plan(
+                cooking_path=Path("unused"),
+                config=make_config(),
+                recipes=recipes,
+                prune=prune,
+                solve_stats=stats,
+            )
+            assert plan is not None
+            assert stats.status == "OPTIMAL"
+            objectives[prune] = stats.objective
+        assert objectives[True] == objectives[False]
+        # Beef Stew Recipe and Caesar Salad each have four twins; 3 slots need 3
+        assert "Pruned 4 of 20 candidates" in caplog.text
+
+
 class TestCLIParserFlags:
     def test_plan_parser_accepts_shopping_list(self):
         """--shopping-list flag is accepted by the plan subcommand."""
@@ -428,3 +579,25 @@ class TestCLIParserFlags:
         args = parser.parse_args(["plan", "--shopping-list", "--save-plan"])
         assert args.shopping_list is True
         assert args.save_plan == "auto"
+
+    def test_plan_parser_formulation(self):
+        parser = build_parser()
+        assert parser.parse_args(["plan"]).formulation == "element"
+        args = parser.parse_args(["plan", "--formulation", "table"])
+        assert args.formulation == "table"
+
+    def test_plan_parser_pruning(self):
+        parser = build_parser()
+        args = parser.parse_args(["plan"])
+        assert args.top_k is None
+        assert args.no_prune is False
+        args = parser.parse_args(["plan", "--top-k", "5", "--no-prune"])
+        assert args.top_k == 5
+        assert args.no_prune is True
+
+    def test_plan_parser_rejects_non_positive_top_k(self, capsys):
+        parser = build_parser()
+        for value in ("0", "-2", "two"):
+            with pytest.raises(SystemExit):
+                parser.parse_args(["plan", "--top-k", value])
+        assert "--top-k" in capsys.readouterr().err
@@ -0,0 +1,169 @@
+"""Tests for the persistent on-disk recipe index."""
+
+import os
+
+import pytest
+from meal_planner import indexer, recipe_index
+from meal_planner.recipe_index import index_path, load_recipe_index, load_recipes
+
+
+def _write_recipe(path, calories=400, item="rice"):
+    path.write_text(
+        "---\n"
+        "type: recipe\n"
+        f"calories: {calories}\n"
+        "servings: 2\n"
+        "parsed_ingredients:\n"
+        "- items:\n"
+        f"  - item: {item}\n"
+        "    qty: 1\n"
+        "    unit: cup\n"
+        "  section: null\n"
+        "---\n"
+        "\n"
+        "## Ingredients\n"
+        "\n"
+        f"- 1 cup {item}\n"
+    )
+
+
+@pytest.fixture
+def cooking_dir(tmp_path):
+    _write_recipe(tmp_path / "Alpha.md", calories=300)
+    _write_recipe(tmp_path / "Bravo.md", calories=500)
+    (tmp_path / "Notes.md").write_text("---\ntype: note\n---\n\nNot a recipe.\n")
+    return tmp_path
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    """Count calls to parse_recipe_file made through the index."""
+    calls = []
+    original = indexer.parse_recipe_file
+
+    def counting(path):
+        calls.append(path.name)
+        return original(path)
+
+    monkeypatch.setattr(indexer, "parse_recipe_file", counting)
+    return calls
+
+
+class TestLoadRecipes:
+    def test_loads_recipes_in_sorted_order(self, cooking_dir):
+        recipes = load_recipes(cooking_dir)
+        assert [r.name for r in recipes] == ["Alpha", "Bravo"]
+        assert recipes[0].parsed_ingredients[0].items[0].item == "rice"
+
+    def test_writes_index_file(self, cooking_dir):
+        load_recipes(cooking_dir)
+        assert index_path(cooking_dir).exists()
+
+    def test_warm_load_does_not_reparse(self, cooking_dir, parse_counter):
+        load_recipes(cooking_dir)
+        assert len(parse_counter) == 3
+        parse_counter.clear()
+
+        recipes = load_recipes(cooking_dir)
+        assert parse_counter == []
+        assert [r.calories for r in recipes] == [300, 500]
+
+    def test_modified_file_is_reparsed(self, cooking_dir, parse_counter):
+        load_recipes(cooking_dir)
+        parse_counter.clear()
+
+        path = cooking_dir / "Bravo.md"
+        _write_recipe(path, calories=650, item="quinoa")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        recipes = load_recipes(cooking_dir)
+        assert parse_counter == ["Bravo.md"]
+        assert recipes[1].calories == 650
+        assert recipes[1].parsed_ingredients[0].items[0].item == "quinoa"
+
+    def test_deleted_file_is_dropped(self, cooking_dir):
+        load_recipes(cooking_dir)
+        (cooking_dir / "Alpha.md").unlink()
+
+        recipes = load_recipes(cooking_dir)
+        assert [r.name for r in recipes] == ["Bravo"]
+        index = load_recipe_index(cooking_dir)
+        assert str(cooking_dir / "Alpha.md") not in index.entries
+
+    def test_new_file_is_added(self, cooking_dir):
+        load_recipes(cooking_dir)
+        _write_recipe(cooking_dir / "Charlie.md")
+        assert [r.name for r in load_recipes(cooking_dir)] == [
+            "Alpha", "Bravo", "Charlie",
+        ]
+
+    def test_limit_does_not_prune(self, cooking_dir):
+        load_recipes(cooking_dir)
+        assert [r.name for r in load_recipes(cooking_dir, limit=1)] == ["Alpha"]
+        assert len(load_recipe_index(cooking_dir).entries) == 3
+
+
+class TestIndexStaysHeaderOnly:
+    def test_loaded_bodies_are_not_saved(self, cooking_dir):
+        index = load_recipe_index(cooking_dir)
+        index.refresh(indexer.discover_recipe_files(cooking_dir))
+        recipe = index.get(cooking_dir / "Alpha.md")
+        assert recipe.raw_ingredients == "- 1 cup rice"
+        index.save()
+        assert b"1 cup rice" not in index_path(cooking_dir).read_bytes()
+        reloaded = load_recipe_index(cooking_dir).get(cooking_dir / "Alpha.md")
+        assert reloaded.sections is None
+        assert reloaded == recipe
+        assert reloaded.raw_ingredients == "- 1 cup rice"
+
+    def test_run_index_counts_ingredients_without_storing_bodies(self, cooking_dir, capsys):
+        for dry_run in (True, False):
+            indexer.run_index(cooking_dir, dry_run=dry_run, skip_api=True)
+            assert '"with_ingredients": 2' in capsys.readouterr().out
+        assert b"1 cup rice" not in index_path(cooking_dir).read_bytes()
+
+
+class TestLoadRecipeIndex:
+    def test_missing_index_is_empty(self, tmp_path):
+        assert load_recipe_index(tmp_path).entries == {}
+
+    def test_version_mismatch_discards(self, cooking_dir, monkeypatch):
+        load_recipes(cooking_dir)
+        monkeypatch.setattr(recipe_index, "INDEX_VERSION", -1)
+        assert load_recipe_index(cooking_dir).entries == {}
+
+    def test_corrupt_index_discards(self, cooking_dir):
+        path = index_path(cooking_dir)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not a pickle")
+        assert load_recipe_index(cooking_dir).entries == {}
+        assert len(load_recipes(cooking_dir)) == 2
+
+
+class TestParallelParsing:
+    def test_process_pool_preserves_sorted_order(self, tmp_path):
+        for i in range(40):
+            _write_recipe(tmp_path / f"Recipe {i:02d}.md", calories=100 + i)
+        files = indexer.discover_recipe_files(tmp_path)
+
+        serial = indexer.parse_recipe_files(files, jobs=1)
+        parallel = indexer.parse_recipe_files(files, jobs=3)
+
+        assert [r.name for r in parallel] == [r.name for r in serial]
+        assert [r.calories for r in parallel] == [100 + i for i in range(40)]
+
+    def test_load_recipes_with_jobs(self, tmp_path):
+        for i in range(40):
+            _write_recipe(tmp_path / f"Recipe {i:02d}.md")
+        (tmp_path / "Notes.md").write_text("---\ntype: note\n---\n")
+
+        recipes = load_recipes(tmp_path, jobs=2)
+        assert [r.name for r in recipes] == [f"Recipe {i:02d}" for i in range(40)]
+
+    def test_cli_accepts_jobs(self):
+        from meal_planner.cli import build_parser
+
+        parser = build_parser()
+        assert parser.parse_args(["--jobs", "8", "index"]).jobs == 8
+        assert parser.parse_args(["suggest"]).jobs == 1
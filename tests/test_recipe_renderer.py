@@ -141,6 +141,16 @@ class TestExtractDirections:
         directions = extract_directions(path)
         assert "Calories" not in directions
 
+    def test_keeps_subheadings_of_level_2_directions(self, tmp_path):
+        path = tmp_path / "Stew.md"
+        path.write_text(
+            "---\ntype: recipe\n---\n\n## Directions\n\n1. Brown the beef.\n\n"
+            "### Finish\n\n2. Simmer.\n\n## Notes\n\nFreezes well.\n"
+        )
+        directions = extract_directions(path)
+        assert "Simmer" in directions
+        assert "Freezes well" not in directions
+
     def test_returns_none_for_missing_directions(self, recipe_dir):
         path = recipe_dir / "Mystery Dish.md"
         directions = extract_directions(path)
@@ -274,3 +284,40 @@ class TestCLIRequireGroupFlag:
         parser = build_parser()
         args = parser.parse_args(["plan"])
         assert args.require_group == []
+
+
+class TestCachedSections:
+    def test_render_uses_cached_sections(self, recipe_dir):
+        from meal_planner.indexer import parse_recipe_file
+
+        path = recipe_dir / "Chicken Fried Rice.md"
+        cfr = parse_recipe_file(path)
+        assert cfr.section("directions") is not None
+
+        # Once loaded, directions come from the recipe, not the file
+        path.unlink()
+        plan = _make_plan([
+            MealSlot(day=0, day_name="Monday", meal_type=MealType.DINNER,
+                     prep_style=PrepStyle.FRESH, recipe=cfr, servings=1.0),
+        ])
+        output = render_plan_recipes(plan, recipe_dir)
+        assert "Dice the chicken" in output
+        assert "2 cloves garlic" in output
+
+    def test_index_not_loaded_when_slots_have_ingredients(self, recipe_dir, monkeypatch):
+        from meal_planner import recipe_index
+        from meal_planner.indexer import parse_recipe_file
+
+        cfr = parse_recipe_file(recipe_dir / "Chicken Fried Rice.md")
+        assert cfr.parsed_ingredients
+
+        def no_index(*args, **kwargs):
+            raise AssertionError("loaded the recipe index")
+
+        monkeypatch.setattr(recipe_index, "load_recipes", no_index)
+        plan = _make_plan([
+            MealSlot(day=d, day_name=name, meal_type=MealType.DINNER,
+                     prep_style=PrepStyle.FRESH, recipe=cfr, servings=1.0 + d)
+            for d, name in enumerate(["Monday", "Tuesday"])
+        ])
+        assert "Dice the chicken" in render_plan_recipes(plan, recipe_dir)
@@ -0,0 +1,229 @@
+"""Tests for the JSON-RPC planner service."""
+
+import io
+import json
+import socketserver
+import stat
+
+import pytest
+from meal_planner import server
+from meal_planner.server import (
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    SERVICE_ERROR,
+    PlannerService,
+    serve_stdio,
+    serve_unix,
+)
+from meal_planner.suggest import scored_to_dicts, suggest_recipes
+
+RECIPES = {
+    "Oat Bowl": ("breakfast", 400, 25, "oats"),
+    "Egg Scramble": ("breakfast", 450, 30, "eggs"),
+    "Tuna Salad": ("lunch", 600, 40, "tuna"),
+    "Lentil Soup": ("lunch", 550, 30, "lentils"),
+    "Chicken Curry": ("dinner", 700, 50, "chicken thighs"),
+    "Beef Chili": ("dinner", 750, 55, "ground beef"),
+    "Salmon Rice": ("dinner", 680, 45, "salmon"),
+}
+
+PREFERENCES = """\
+schedule:
+  plan_days: 3
+  meals_per_day: [breakfast, lunch, dinner]
+  cook_days: [monday, tuesday, wednesday]
+"""
+
+
+def _write(path, meal_type, calories, protein, item):
+    path.write_text(
+        "---\ntype: recipe\n"
+        f"meal_type: {meal_type}\ncalories: {calories}\nprotein_g: {protein}\n"
+        "servings: 4\ntotal_time: 30 minutes\n"
+        "parsed_ingredients: [{section: null, items: "
+        f"[{{item: {item}, qty: 1, unit: cup}}]}}]\n"
+        f"---\n\n### Ingredients\n\n- 1 cup {item}\n"
+    )
+
+
+@pytest.fixture
+def vault(tmp_path):
+    cooking = tmp_path / "03. Resources" / "Cooking"
+    cooking.mkdir(parents=True)
+    for name, fields in RECIPES.items():
+        _write(cooking / f"{name}.md", *fields)
+    (cooking / "meal-preferences.yaml").write_text(PREFERENCES)
+    return tmp_path
+
+
+@pytest.fixture
+def service(vault):
+    return PlannerService(vault / "03. Resources" / "Cooking", vault)
+
+
+def call(service, method, req_id=1, **params):
+    return service.handle({"jsonrpc": "2.0", "id": req_id, "method": method, "params": params})
+
+
+class TestDispatch:
+    def test_unknown_method(self, service):
+        assert call(service, "explode")["error"]["code"] == METHOD_NOT_FOUND
+
+    def test_invalid_params(self, service):
+        response = call(service, "suggest", colour="blue")
+        assert response["error"]["code"] == INVALID_PARAMS
+
+    def test_parse_error(self, service):
+        response = json.loads(service.handle_line("{not json"))
+        assert response["error"]["code"] == PARSE_ERROR
+
+    def test_notification_gets_no_response(self, service):
+        line = json.dumps({"jsonrpc": "2.0", "method": "suggest", "params": {}})
+        assert service.handle_line(line) is None
+
+    def test_batch(self, service):
+        batch = [
+            {"jsonrpc": "2.0", "id": 1, "method": "suggest", "params": {"limit": 1}},
+            {"jsonrpc": "2.0", "id": 2, "method": "nope"},
+        ]
+        responses = json.loads(service.handle_line(json.dumps(batch)))
+        assert [r["id"] for r in responses] == [1, 2]
+        assert "result" in responses[0] and "error" in responses[1]
+
+    def test_swap_before_plan_is_service_error(self, service):
+        response = call(service, "swap", day=0, meal_type="dinner", recipe="Beef Chili")
+        assert response["error"]["code"] == SERVICE_ERROR
+
+    def test_serve_stdio(self, service):
+        stdin = io.StringIO(
+            '{"jsonrpc": "2.0", "id": 7, "method": "scale", '
+            '"params": {"recipe": "oat bowl", "servings": 8}}\n\n'
+        )
+        stdout = io.StringIO()
+        serve_stdio(service, stdin, stdout)
+        response = json.loads(stdout.getvalue())
+        assert response["id"] == 7
+        assert response["result"]["name"] == "Oat Bowl"
+
+
+class TestMethods:
+    def test_suggest_matches_cli(self, service, vault):
+        cooking = vault / "03. Resources" / "Cooking"
+        expected = scored_to_dicts(
+            suggest_recipes(cooking, meal_type="dinner", target_calories=700, limit=2)
+        )
+        response = call(
+            service, "suggest", meal_type="dinner", target_calories=700, limit=2
+        )
+        assert response["result"] == expected
+
+    def test_candidates_are_cached(self, service):
+        first = service.candidates(meal_type="dinner", exclude=("Beef Chili",))
+        again = service.candidates(meal_type="dinner", exclude=("Beef Chili",))
+        assert first is again
+        assert {r.name for r in first} == {"Chicken Curry", "Salmon Rice"}
+
+    def test_recipe_edits_are_picked_up(self, service, vault):
+        cooking = vault / "03. Resources" / "Cooking"
+        _write(cooking / "Pork Tacos.md", "dinner", 650, 40, "pork")
+        names = [s["name"] for s in call(service, "suggest", meal_type="dinner")["result"]]
+        assert "Pork Tacos" in names
+
+    def test_plan_overrides_do_not_leak(self, service):
+        first = call(service, "plan", calories=1800)["result"]
+        second = call(service, "plan")["result"]
+        assert first["calories_target"] == 1800
+        assert second["calories_target"] == 2200
+        assert second["days"] == 3
+
+    def test_plan_reuses_cached_candidates(self, service, monkeypatch):
+        calls = []
+        real = server.filter_recipes
+        monkeypatch.setattr(
+            server, "filter_recipes", lambda *a, **kw: calls.append(kw) or real(*a, **kw)
+        )
+        first = call(service, "plan")["result"]
+        filtered = len(calls)
+        assert filtered > 0
+        assert call(service, "plan")["result"]["slots"] == first["slots"]
+        assert len(calls) == filtered
+
+    def test_plan_solver_options(self, service):
+        expected = call(service, "plan")["result"]
+        result = call(service, "plan", formulation="table", prune=False)["result"]
+        assert result["slots"] == expected["slots"]
+        assert "result" in call(service, "plan", top_k=1)
+        for bad in ({"formulation": "nope"}, {"top_k": 0}):
+            assert call(service, "plan", **bad)["error"]["code"] == SERVICE_ERROR
+
+    def test_swap_updates_linked_leftovers(self, service):
+        plan = call(service, "plan")["result"]
+        dinner = next(
+            s for s in plan["slots"] if s["day"] == 0 and s["meal_type"] == "dinner"
+        )
+        leftovers = [
+            (s["day"], s["meal_type"]) for s in plan["slots"]
+            if s["prep_style"] == "leftover" and s["recipe"] == dinner["recipe"]
+        ]
+        # Lunches are all leftovers, so no slot is already using this one
+        replacement = "Tuna Salad"
+
+        swapped = call(
+            service, "swap", day="monday", meal_type="dinner", recipe=replacement
+        )["result"]
+        by_slot = {(s["day"], s["meal_type"]): s for s in swapped["slots"]}
+        assert by_slot[(0, "dinner")]["recipe"] == replacement
+        for slot in leftovers:
+            assert by_slot[slot]["recipe"] == replacement
+        assert by_slot[(0, "dinner")]["calories"] == (
+            RECIPES[replacement][1] * by_slot[(0, "dinner")]["servings"]
+        )
+
+    def test_shopping_list_for_current_plan(self, service):
+        plan = call(service, "plan")["result"]
+        sections = call(service, "shopping_list")["result"]
+        items = {i["item"] for section in sections.values() for i in section}
+        planned = {RECIPES[s["recipe"]][3] for s in plan["slots"]}
+        assert items == planned
+
+    def test_scale_unknown_recipe(self, service):
+        response = call(service, "scale", recipe="zzzzzz", servings=2)
+        assert response["error"]["code"] == SERVICE_ERROR
+
+
+def test_socket_is_created_owner_only(service, tmp_path, monkeypatch):
+    modes = []
+
+    def serve_forever(self):
+        modes.append(stat.S_IMODE(socket_path.stat().st_mode))
+
+    monkeypatch.setattr(socketserver.ThreadingUnixStreamServer, "serve_forever", serve_forever)
+    socket_path = tmp_path / "mp.sock"
+    serve_unix(service, socket_path)
+    assert modes == [0o600]
+    assert not socket_path.exists()
+
+
+def test_stale_socket_is_replaced(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(socketserver.ThreadingUnixStreamServer, "serve_forever", lambda self: None)
+    socket_path = tmp_path / "mp.sock"
+    with socketserver.UnixStreamServer(str(socket_path), socketserver.StreamRequestHandler):
+        pass
+    assert socket_path.exists()
+    serve_unix(service, socket_path)
+
+
+def test_refuses_to_replace_other_files(service, tmp_path):
+    path = tmp_path / "notes.md"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError, match="not a socket"):
+        serve_unix(service, path)
+    assert path.read_text() == "keep me"
+
+
+def test_cli_serve_socket_flag():
+    from meal_planner.cli import build_parser
+
+    args = build_parser().parse_args(["serve", "--socket", "/tmp/mp.sock"])
+    assert args.socket == "/tmp/mp.sock"
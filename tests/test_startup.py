@@ -0,0 +1,82 @@
+"""Tests for lazy imports and --startup-report."""
+
+import json
+import logging
+import subprocess
+import sys
+
+import pytest
+from meal_planner.log import setup_logging
+from meal_planner.startup import format_startup_report, parse_importtime
+
+IMPORTTIME_STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:       300 |        420 |   json
+import time:      1000 |       1420 | meal_planner.scaler
+WARNING Recipe not found: nope
+"""
+
+
+def _loaded_modules(code):
+    """Run `code` in a fresh interpreter and return the modules it imported."""
+    out = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(out.split())
+
+
+class TestLazyImports:
+    @pytest.mark.parametrize(
+        "module", ["meal_planner.suggest", "meal_planner.scaler", "meal_planner.shopping"]
+    )
+    def test_light_commands_skip_heavy_imports(self, module):
+        loaded = _loaded_modules(f"import meal_planner.cli, meal_planner.log, {module}")
+        assert not {"ortools", "rich", "numpy", "yaml"} & loaded
+
+    def test_planner_defers_ortools(self):
+        assert "ortools" not in _loaded_modules("import meal_planner.planner")
+
+    def test_non_tty_logging_uses_plain_handler(self):
+        logger = logging.getLogger("meal_planner")
+        setup_logging("info")
+        try:
+            assert [type(h) for h in logger.handlers] == [logging.StreamHandler]
+        finally:
+            logger.handlers.clear()
+
+
+class TestStartupReport:
+    def test_parse_importtime(self):
+        timings, other = parse_importtime(IMPORTTIME_STDERR.splitlines())
+        assert [(t.module, t.depth) for t in timings] == [
+            ("_json", 2), ("json", 1), ("meal_planner.scaler", 0),
+        ]
+        assert timings[-1].cumulative_us == 1420
+        assert other == ["WARNING Recipe not found: nope"]
+
+    def test_format(self):
+        timings, _ = parse_importtime(IMPORTTIME_STDERR.splitlines())
+        report = format_startup_report(timings, 0.05)
+        assert report.splitlines()[0] == (
+            "Startup report: 50 ms wall, 1 ms importing 3 modules"
+        )
+        assert "      0.3       0.4    json" in report
+
+    def test_cli_flag(self, tmp_path):
+        cooking = tmp_path / "03. Resources" / "Cooking"
+        cooking.mkdir(parents=True)
+        (cooking / "Toast.md").write_text("---\ntype: recipe\nmeal_type: breakfast\n---\n")
+        proc = subprocess.run(
+            [sys.executable, "-m", "meal_planner.cli", "--vault-path", str(tmp_path),
+             "--startup-report", "suggest", "--format", "json"],
+            capture_output=True,
+            text=True,
+        )
+        assert proc.returncode == 0
+        assert [s["name"] for s in json.loads(proc.stdout)] == ["Toast"]
+        assert proc.stderr.startswith("Startup report:")
+        assert "meal_planner.suggest" in proc.stderr
@@ -0,0 +1,91 @@
+"""Tests for index --watch."""
+
+import os
+
+import pytest
+from meal_planner import indexer
+from meal_planner.catalog import open_catalog
+from meal_planner.nutrition_snapshot import load_snapshot, snapshot_path
+from meal_planner.recipe_index import load_recipe_index
+from meal_planner.watcher import RecipeWatcher, watch_recipes
+
+
+def _write(path, calories=400):
+    path.write_text(f"---\ntype: recipe\nmeal_type: dinner\ncalories: {calories}\n---\n")
+
+
+def _touch_later(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def cooking_dir(tmp_path):
+    _write(tmp_path / "Alpha.md", 300)
+    _write(tmp_path / "Bravo.md", 500)
+    indexer.run_index(tmp_path, skip_api=True, catalog=True)
+    return tmp_path
+
+
+@pytest.fixture
+def watcher(cooking_dir):
+    w = RecipeWatcher(cooking_dir)
+    yield w
+    w.close()
+
+
+class TestRecipeWatcher:
+    def test_no_changes(self, watcher):
+        assert watcher.poll() is False
+
+    def test_only_changed_files_reparsed(self, watcher, cooking_dir, monkeypatch):
+        calls = []
+        original = indexer.parse_recipe_file
+        monkeypatch.setattr(
+            indexer, "parse_recipe_file", lambda p: calls.append(p.name) or original(p)
+        )
+        _write(cooking_dir / "Bravo.md", 650)
+        _touch_later(cooking_dir / "Bravo.md")
+
+        assert watcher.poll() is True
+        assert calls == ["Bravo.md"]
+
+    def test_updates_index_catalog_and_snapshot(self, watcher, cooking_dir):
+        (cooking_dir / "Alpha.md").unlink()
+        _write(cooking_dir / "Charlie.md", 700)
+        assert watcher.poll() is True
+
+        index = load_recipe_index(cooking_dir)
+        assert sorted(os.path.basename(p) for p in index.entries) == [
+            "Bravo.md", "Charlie.md",
+        ]
+        catalog = open_catalog(cooking_dir)
+        assert catalog.names() == ["Bravo", "Charlie"]
+        catalog.close()
+        snapshot = load_snapshot(snapshot_path(cooking_dir))
+        assert snapshot["name"].tolist() == ["Bravo", "Charlie"]
+
+
+def test_watch_recipes_polls_until_limit(cooking_dir):
+    def edit_between_polls(interval):
+        _write(cooking_dir / "Delta.md")
+
+    watch_recipes(cooking_dir, max_polls=2, sleep=edit_between_polls)
+    assert str(cooking_dir / "Delta.md") in load_recipe_index(cooking_dir).entries
+
+
+def test_cli_watch_flags():
+    from meal_planner.cli import build_parser
+
+    args = build_parser().parse_args(["index", "--watch", "--interval", "0.5"])
+    assert args.watch is True
+    assert args.interval == 0.5
+
+
+def test_changes_before_start_are_applied_on_first_poll(cooking_dir):
+    _write(cooking_dir / "Echo.md", 900)
+    w = RecipeWatcher(cooking_dir)
+    assert w.poll() is True
+    w.close()
+    snapshot = load_snapshot(snapshot_path(cooking_dir))
+    assert "Echo" in snapshot["name"].tolist()